@@ -0,0 +1,67 @@
+"""artifact digest cache benchmark.
+
+Times Artifact.add_dir on an unchanged tree of small files without the digest
+cache, on the first run with it (hash and store) and on a second run (cache
+hits only).
+
+    python digest_cache_benchmark.py --files 50000 --size_kb 16
+"""
+
+import argparse
+import os
+import time
+
+from wandb.compat import tempfile
+
+parser = argparse.ArgumentParser(description="artifact digest cache benchmark")
+parser.add_argument("--files", type=int, default=50000)
+parser.add_argument("--size_kb", type=int, default=16)
+
+
+def make_tree(root, files, size):
+    # files modified in the last few seconds are never cached
+    old = time.time() - 60
+    for i in range(files):
+        dirname = os.path.join(root, "d%03d" % (i % 500))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        path = os.path.join(dirname, "f%06d.bin" % i)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        os.utime(path, (old, old))
+
+
+def measure(name, root):
+    import wandb
+
+    artifact = wandb.Artifact("bench", type="dataset")
+    start = time.time()
+    artifact.add_dir(root)
+    print("{:<24} {:>8.2f}s".format(name, time.time() - start))
+    return artifact.manifest.entries
+
+
+def main():
+    args = parser.parse_args()
+    tmpdir = tempfile.TemporaryDirectory("wandb-digest-bench")
+    os.environ["WANDB_CACHE_DIR"] = os.path.join(tmpdir.name, "cache")
+    root = os.path.join(tmpdir.name, "tree")
+    make_tree(root, args.files, args.size_kb * 1024)
+    print("{} files of {}KB".format(args.files, args.size_kb))
+
+    from wandb.lib import digest_cache
+
+    cache = digest_cache.get_digest_cache()
+    digest_cache._digest_cache = digest_cache._NoDigestCache()
+    before = measure("no cache", root)
+    digest_cache._digest_cache = cache
+    measure("cold cache", root)
+    after = measure("warm cache", root)
+    cache.flush()
+    assert dict((k, e.digest) for k, e in before.items()) == dict(
+        (k, e.digest) for k, e in after.items()
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""artifact download benchmark.
+
+Serves a file from a local http server that supports Range requests and
+downloads it the old way (one stream read in 16KB chunks, then hashed) and with
+wandb.lib.download (large chunks hashed as they arrive, several ranges at once
+for large files).  --mbps limits the bandwidth of each connection, like a
+remote object store does, which is where concurrent ranges pay off.  With
+--interrupt the new download is cut off half way and resumed.
+
+    python download_benchmark.py --size_mb 256 --mbps 400
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+import requests
+from six.moves import BaseHTTPServer, socketserver
+
+from wandb.compat import tempfile
+from wandb.lib import download
+
+parser = argparse.ArgumentParser(description="artifact download benchmark")
+parser.add_argument("--size_mb", type=int, default=256)
+parser.add_argument(
+    "--mbps", type=float, default=0, help="per connection, 0 for no limit"
+)
+parser.add_argument("--interrupt", action="store_true")
+
+BLOCK_BYTES = 64 * 1024
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def make_handler(path, mbps, stop_after):
+    size = os.path.getsize(path)
+
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            start, end = 0, size
+            rng = self.headers.get("Range")
+            if rng:
+                first, _, last = rng[len("bytes=") :].partition("-")
+                start = int(first)
+                end = int(last) + 1 if last else size
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range", "bytes %d-%d/%d" % (start, end - 1, size)
+                )
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start))
+            self.end_headers()
+            began = time.time()
+            sent = 0
+            with open(path, "rb") as f:
+                f.seek(start)
+                while sent < end - start:
+                    if stop_after[0] is not None and sent >= stop_after[0]:
+                        stop_after[0] = None
+                        self.close_connection = True
+                        return
+                    data = f.read(min(BLOCK_BYTES, end - start - sent))
+                    self.wfile.write(data)
+                    sent += len(data)
+                    if mbps:
+                        ahead = sent / (mbps * 1024 * 1024 / 8) - (time.time() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+
+    return Handler
+
+
+def old_download(session, url, path, size, md5):
+    response = session.get(url, stream=True)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        for data in response.iter_content(chunk_size=16 * 1024):
+            f.write(data)
+    hash_md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(4096), b""):
+            hash_md5.update(data)
+    assert base64.b64encode(hash_md5.digest()).decode("ascii") == md5
+
+
+def new_download(session, url, path, size, md5):
+    download.download_file(session, url, path, size=size, md5=md5)
+
+
+def measure(name, fn, *args):
+    start = time.time()
+    fn(*args)
+    elapsed = time.time() - start
+    size_mb = args[3] / 1024.0 / 1024
+    print("{:<36} {:>8.2f}s {:>8.1f}MB/s".format(name, elapsed, size_mb / elapsed))
+
+
+def main():
+    args = parser.parse_args()
+    tmpdir = tempfile.TemporaryDirectory("wandb-download-bench")
+    src = os.path.join(tmpdir.name, "src")
+    hash_md5 = hashlib.md5()
+    with open(src, "wb") as f:
+        for _ in range(args.size_mb):
+            data = os.urandom(1024 * 1024)
+            hash_md5.update(data)
+            f.write(data)
+    md5 = base64.b64encode(hash_md5.digest()).decode("ascii")
+    size = os.path.getsize(src)
+
+    stop_after = [None]
+    server = Server(("127.0.0.1", 0), make_handler(src, args.mbps, stop_after))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = "http://127.0.0.1:%d/src" % server.server_address[1]
+    session = requests.Session()
+
+    print(
+        "{}MB, {}".format(
+            args.size_mb,
+            "{}Mbps per connection".format(args.mbps) if args.mbps else "unlimited",
+        )
+    )
+    dst = os.path.join(tmpdir.name, "dst")
+    measure(
+        "  before: 16KB stream, then md5", old_download, session, url, dst, size, md5
+    )
+    os.remove(dst)
+    # no file counts as large
+    range_min = download.RANGE_MIN_BYTES
+    download.RANGE_MIN_BYTES = size + 1
+    measure("  after: streaming only", new_download, session, url, dst, size, md5)
+    download.RANGE_MIN_BYTES = range_min
+    os.remove(dst)
+    # every file counts as large
+    download.RANGE_MIN_BYTES = 0
+    measure("  after: concurrent ranges", new_download, session, url, dst, size, md5)
+    download.RANGE_MIN_BYTES = range_min
+    os.remove(dst)
+
+    if args.interrupt:
+        download.RETRY_SLEEP = 0
+        stop_after[0] = size // 2
+        measure("  after: resumed half way", new_download, session, url, dst, size, md5)
+        os.remove(dst)
+
+    server.shutdown()
+    shutil.rmtree(tmpdir.name, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
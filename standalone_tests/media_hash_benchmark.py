@@ -0,0 +1,73 @@
+"""media hashing benchmark.
+
+Compares time and peak python memory of hashing a large video file the old way
+(write it, then hashlib.sha256(f.read())) against single-pass hashing while
+writing and streaming hashes of path inputs.
+
+    python media_hash_benchmark.py --size_mb 500
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+import tracemalloc
+
+from wandb import data_types
+from wandb.compat import tempfile
+
+parser = argparse.ArgumentParser(description="media hashing benchmark")
+parser.add_argument("--size_mb", type=int, default=500)
+
+
+def old_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def old_copy(fileobj, path):
+    with open(path, "wb") as f:
+        f.write(fileobj.read())
+    return old_hash(path)
+
+
+def measure(name, fn, *args):
+    tracemalloc.start()
+    start = time.time()
+    sha256 = fn(*args)
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "{:<28} {:>8.2f}s {:>10.1f}MB peak  {}".format(
+            name, elapsed, peak / 1024.0 / 1024, sha256[:12]
+        )
+    )
+    return sha256
+
+
+def main():
+    args = parser.parse_args()
+    tmpdir = tempfile.TemporaryDirectory("wandb-media-bench")
+    src = os.path.join(tmpdir.name, "video.mp4")
+    with open(src, "wb") as f:
+        for _ in range(args.size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+    print("path input, {}MB".format(args.size_mb))
+    before = measure("  before: read + sha256", old_hash, src)
+    after = measure("  after: streaming sha256", data_types._hash_file, src)
+    assert before == after
+
+    print("file object input, {}MB".format(args.size_mb))
+    dst = os.path.join(tmpdir.name, "copy.mp4")
+    with io.open(src, "rb") as f:
+        before = measure("  before: write + re-read", old_copy, f, dst)
+    with io.open(src, "rb") as f:
+        after = measure("  after: hash while writing", data_types._copy_hashed, f, dst)
+    assert before == after
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""wandb.Table serialization benchmark.
+
+Compares building and serializing a table row by row with add_data against
+the columnar DataFrame and numpy paths.
+
+    python table_benchmark.py --rows 10000 --cols 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import wandb
+from wandb import util
+
+parser = argparse.ArgumentParser(description="wandb.Table benchmark")
+parser.add_argument("--rows", type=int, default=10000)
+parser.add_argument("--cols", type=int, default=50)
+
+
+def serialize(table):
+    # everything bind_to_run does except writing to a file
+    return util.json_dumps_safer(table._to_table_json())
+
+
+def add_data_table(df):
+    table = wandb.Table(columns=list(df.columns))
+    values = [df[col].values for col in df.columns]
+    for row in range(len(df)):
+        table.add_data(*[col[row] for col in values])
+    return table
+
+
+def measure(name, fn):
+    start = time.time()
+    size = len(fn())
+    print("{:<22} {:>8.3f}s  {} bytes".format(name, time.time() - start, size))
+
+
+def main():
+    args = parser.parse_args()
+    arr = np.random.rand(args.rows, args.cols)
+    df = pd.DataFrame(arr, columns=["c{}".format(i) for i in range(args.cols)])
+    print("{} x {} table".format(args.rows, args.cols))
+    measure("add_data", lambda: serialize(add_data_table(df)))
+    measure("dataframe", lambda: serialize(wandb.Table(dataframe=df)))
+    measure(
+        "numpy", lambda: serialize(wandb.Table(columns=list(df.columns), data=arr))
+    )
+
+
+if __name__ == "__main__":
+    main()
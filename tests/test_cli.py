@@ -771,3 +771,107 @@ def test_gc(runner):
         assert not os.path.exists(run2_dir)
         assert runner.invoke(cli.sync, ["--clean", "--clean-old-hours", "0"], input='y\n').exit_code == 0
         assert not os.path.exists(run1_dir)
+
+
+def test_sync_workers(runner, monkeypatch):
+    from wandb.sync import sync
+
+    monkeypatch.setenv("WANDB_API_KEY", DUMMY_API_KEY)
+    monkeypatch.setattr(sync, "RETRY_SLEEP", 0)
+    with runner.isolated_filesystem():
+        run_dirs = []
+        for run_id in ("abc1", "abc2", "abc3", "abc4"):
+            run_dir = "offline-run-20201010_101010-%s" % run_id
+            os.mkdir(run_dir)
+            # damaged logs fail, synced ones are skipped
+            with open(os.path.join(run_dir, "run-%s.wandb" % run_id), "w") as f:
+                f.write("garbage")
+            run_dirs.append(run_dir)
+        for run_dir in run_dirs[2:]:
+            with open(os.path.join(run_dir, "run-%s.wandb.synced" % run_dir[-4:]), "w") as f:
+                f.write("")
+        os.mkdir("empty")
+        run_dirs.append("empty")
+
+        result = runner.invoke(cli.sync, ["--workers", "2"] + run_dirs)
+        assert result.exit_code == 1
+        assert result.output.count("retrying") == 2
+        assert "5/5 runs done, 0 synced, 3 skipped, 2 failed" in result.output
+        assert "Failed to sync 2 runs" in result.output
+
+        result = runner.invoke(cli.sync, ["--workers", "2"] + run_dirs[2:4])
+        assert result.exit_code == 0
+        assert "2/2 runs done, 0 synced, 2 skipped, 0 failed" in result.output
+
+
+def test_sync_view_order(runner, monkeypatch):
+    from wandb.internal import datastore
+    from wandb.proto import wandb_internal_pb2
+
+    monkeypatch.setenv("WANDB_API_KEY", DUMMY_API_KEY)
+    monkeypatch.setattr(wandb, "_IS_INTERNAL_PROCESS", True)
+    with runner.isolated_filesystem():
+        os.mkdir("offline-run-20201010_101010-abc1")
+        ds = datastore.DataStore()
+        ds.open_for_write("offline-run-20201010_101010-abc1/run-abc1.wandb")
+        # more records than the reader thread hands over at once
+        for i in range(1000):
+            record = wandb_internal_pb2.Record()
+            if i % 3:
+                record.history.item.add(key="_step", value_json=str(i))
+            else:
+                record.stats.item.add(key="cpu", value_json=str(i))
+            ds.write(record)
+        ds.close()
+        result = runner.invoke(cli.sync, ["--view", "offline-run-20201010_101010-abc1"])
+        assert result.exit_code == 0
+        types = [line for line in result.output.splitlines() if line.startswith("Record:")]
+        assert types == ["Record: history" if i % 3 else "Record: stats" for i in range(1000)]
+
+
+def test_sync_workers_projects(runner, mock_server, monkeypatch):
+    from wandb.internal import datastore
+    from wandb.proto import wandb_internal_pb2
+
+    monkeypatch.setattr(wandb, "_IS_INTERNAL_PROCESS", True)
+    with runner.isolated_filesystem():
+        run_dirs = []
+        for i, run_id in enumerate(("abc1", "abc2", "abc3", "abc4")):
+            run_dir = "offline-run-20201010_101010-%s" % run_id
+            os.makedirs(os.path.join(run_dir, "files"))
+            with open(os.path.join(run_dir, "files", "model.txt"), "w") as f:
+                f.write(run_id)
+            ds = datastore.DataStore()
+            ds.open_for_write(os.path.join(run_dir, "run-%s.wandb" % run_id))
+            record = wandb_internal_pb2.Record()
+            record.run.run_id = run_id
+            record.run.project = "project%d" % (i % 2)
+            ds.write(record)
+            record = wandb_internal_pb2.Record()
+            record.files.files.add(path="model.txt")
+            ds.write(record)
+            ds.close()
+            run_dirs.append(run_dir)
+
+        # each run uploads its files to its own project
+        result = runner.invoke(cli.sync, ["--workers", "4"] + run_dirs)
+        assert result.exit_code == 0
+        assert set(mock_server.ctx["upload_urls"]) == {
+            ("project0", "abc1"), ("project0", "abc3"),
+            ("project1", "abc2"), ("project1", "abc4")}
+        assert "WANDB_PROJECT" not in os.environ
+
+
+def test_artifact_cache_cleanup(runner, monkeypatch):
+    from wandb.sdk import wandb_artifacts
+
+    with runner.isolated_filesystem():
+        monkeypatch.setenv("WANDB_CACHE_DIR", os.path.abspath("cache"))
+        monkeypatch.setattr(wandb_artifacts, "_artifacts_cache", None)
+        result = runner.invoke(cli.artifact, ["cache", "cleanup", "1GB"])
+        print(result.output)
+        assert result.exit_code == 0
+        assert "Reclaimed 0.0B of space" in result.output
+        result = runner.invoke(cli.artifact, ["cache", "cleanup", "lots"])
+        assert result.exit_code != 0
+        assert "Invalid size" in result.output
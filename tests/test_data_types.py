@@ -7,6 +7,8 @@ import os
 import six
 import sys
 import glob
+import hashlib
+import json
 import platform
 import pandas as pd
 from click.testing import CliRunner
@@ -422,6 +424,35 @@ def test_table_custom():
     assert table._to_table_json() == table_df._to_table_json()
 
 
+def test_table_columnar():
+    df = pd.DataFrame({
+        "int": np.arange(3),
+        "float": np.linspace(0, 1, 3),
+        "str": ["a", "b", "c"],
+        "arr": [np.zeros(2), np.ones(2), np.zeros(2)],
+    })
+    table = wandb.Table(dataframe=df)
+    assert table._column_data is not None
+    assert table._to_table_json() == {
+        "columns": ["int", "float", "str", "arr"],
+        "data": [[0, 0.0, "a", [0.0, 0.0]],
+                 [1, 0.5, "b", [1.0, 1.0]],
+                 [2, 1.0, "c", [0.0, 0.0]]],
+    }
+    table.add_data(3, 1.5, "d", np.ones(2))
+    assert table._column_data is None
+    assert len(table.data) == 4
+    assert table._to_table_json()["data"][3] == [3, 1.5, "d", [1.0, 1.0]]
+
+
+def test_table_numpy():
+    table = wandb.Table(columns=["a", "b"], data=np.arange(6).reshape(3, 2))
+    assert table._num_rows() == 3
+    assert table._to_table_json()["data"] == [[0, 1], [2, 3], [4, 5]]
+    with pytest.raises(ValueError):
+        wandb.Table(data=np.arange(6).reshape(3, 2))
+
+
 point_cloud_1 = np.array([[0, 0, 0, 1],
                           [0, 0, 1, 13],
                           [0, 1, 0, 2],
@@ -450,6 +481,46 @@ def test_object3d_numpy(mocked_run):
     assert obj3.to_json(mocked_run)["_type"] == "object3D-file"
 
 
+def test_object3d_numpy_binary():
+    obj = wandb.Object3D(point_cloud_3)
+    assert obj._path.endswith(".pts.bin")
+    columns = data_types._read_point_cloud(obj._path)
+    assert columns["position"].dtype == np.float32
+    assert columns["position"].tolist() == point_cloud_3[:, :3].tolist()
+    assert columns["color"].tolist() == point_cloud_3[:, 3:].tolist()
+
+    columns = data_types._read_point_cloud(
+        wandb.Object3D(point_cloud_1, quantize=True)._path)
+    assert columns["position"].dtype == np.float16
+    assert columns["category"].tolist() == [1, 13, 2, 4]
+
+
+def test_object3d_numpy_json():
+    obj = wandb.Object3D(point_cloud_2, point_format="json")
+    assert obj._path.endswith(".pts.json")
+    with open(obj._path) as f:
+        assert json.load(f) == point_cloud_2.tolist()
+
+
+def test_object3d_max_points():
+    points = np.random.rand(10000, 4)
+    obj = wandb.Object3D(points, max_points=1000)
+    columns = data_types._read_point_cloud(obj._path)
+    assert 500 < len(columns["position"]) <= 1000
+
+
+def test_object3d_max_points_duplicates():
+    points = np.zeros((2000, 3))
+    points[:1000] = 1
+    obj = wandb.Object3D(points, max_points=100)
+    columns = data_types._read_point_cloud(obj._path)
+    assert sorted(columns["position"].tolist()) == [[0, 0, 0], [1, 1, 1]]
+    obj = wandb.Object3D(np.ones((10, 3)), max_points=1)
+    assert len(data_types._read_point_cloud(obj._path)["position"]) == 1
+    with pytest.raises(ValueError):
+        wandb.Object3D(points, max_points=0)
+
+
 def test_object3d_obj(mocked_run):
     obj = wandb.Object3D(utils.fixture_open("cube.obj"))
     obj.bind_to_run(mocked_run, "object3D", 0)
@@ -523,6 +594,25 @@ def test_object3d_seq_to_json(mocked_run):
     ]
 
 
+def test_media_hash_matches_file(mocked_run):
+    f = utils.fixture_open("Box.gltf")
+    masked = wandb.Image(image, masks={"mask": {"mask_data": np.zeros((28, 28))}})
+    media = [
+        wandb.Image(image),
+        masked,
+        wandb.Html("<p>hashed</p>"),
+        wandb.Object3D(point_cloud_1),
+        wandb.Object3D(six.StringIO(six.u(f.read())), file_type="gltf"),
+        wandb.Video(six.BytesIO(b"fake video" * 1000), format="mp4"),
+        wandb.Table(data=[["a", "b", "c"]]),
+    ]
+    for m in media:
+        m.bind_to_run(mocked_run, "hashed", 0)
+    for m in media + [masked._masks["mask"]]:
+        with open(m._path, "rb") as f:
+            assert m._sha256 == hashlib.sha256(f.read()).hexdigest()
+
+
 def test_table_init():
     table = wandb.Table(data=[["Some awesome text", "Positive", "Negative"]])
     assert table._to_table_json() == {
@@ -549,3 +639,37 @@ def test_numpy_arrays_to_list():
     assert conv(np.array((1, 2, ))) == [1, 2]
     assert conv([np.array((1, 2, ))]) == [[1, 2]]
     assert conv(np.array(({'a': [np.array((1, 2, ))]}, 3))) == [{'a': [[1, 2]]}, 3]
+
+
+def test_deferred_image_encoding(mocked_run):
+    data_types._datatypes_set_deferred_encoding(True)
+    try:
+        wb_image = wandb.Image(image)
+    finally:
+        data_types._datatypes_set_deferred_encoding(False)
+    assert wb_image._is_encoding_deferred()
+    assert wb_image.file_is_set()
+    wb_image.bind_to_run(mocked_run, "stuff", 10)
+    assert not wb_image._is_encoding_deferred()
+    assert os.path.exists(wb_image._path)
+    assert wb_image._sha256
+
+
+def test_media_pipeline_publishes_in_order():
+    from wandb.sdk import wandb_media
+
+    published = []
+    pipeline = wandb_media.MediaPipeline(
+        lambda row, step: published.append((step, row)), workers=4)
+    data_types._datatypes_set_deferred_encoding(True)
+    try:
+        rows = [{"img": wandb.Image(image), "x": i} for i in range(10)]
+    finally:
+        data_types._datatypes_set_deferred_encoding(False)
+    for step, row in enumerate(rows):
+        pipeline.submit(row, step)
+    pipeline.join()
+    assert [step for step, _ in published] == list(range(10))
+    for _, row in published:
+        assert not row["img"]._is_encoding_deferred()
+        assert row["img"]._sha256
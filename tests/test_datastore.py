@@ -128,5 +128,163 @@ def test_data_write_fill(with_datastore):
     """Leave just room for 1 more byte, then write a 1 byte, followed by another 1 byte."""
     sizes = tuple([32768 - 7 - 7 - 8, 1, 1])
     records = 3
-    lengths = (7, 32753, 0, 0), (32760, 8, 0, 0), (32768, 8, 0, 0)
+    lengths = (7, 32753, 0, 0), (32760, 8, 1, 32768), (32768, 8, 1, 32768)
     check(with_datastore, chunk_sizes=sizes, expected_records=records, expected_record_sizes=lengths)
+
+
+def test_data_write_group_commit():
+    """Buffered records are written out by the group commit policy."""
+    try:
+        os.unlink(FNAME)
+    except FileNotFoundError:
+        pass
+    wandb._set_internal_process()
+    s = datastore.DataStore(flush_records=3)
+    s.open_for_write(FNAME)
+    assert s._write_data(b'\x01' * 10) == (7, 17, 0, 0)
+    assert s._write_data(b'\x01' * 10) == (24, 17, 0, 0)
+    assert os.stat(FNAME).st_size == 0
+    assert s._write_data(b'\x01' * 10) == (41, 17, 1, 58)
+    assert os.stat(FNAME).st_size == 58
+
+    s._write_data(b'\x01' * 10)
+    assert s.flush(fsync=True) == (2, 75)
+    assert os.stat(FNAME).st_size == 75
+    # nothing left to write
+    assert s.flush() == (2, 75)
+
+    s._flush_seconds = 0
+    s._write_data(b'\x01' * 10)
+    assert os.stat(FNAME).st_size == 92
+    s.close()
+    os.unlink(FNAME)
+
+
+def test_data_write_read_back(with_datastore):
+    """Records spanning blocks read back the way they were written."""
+    ds = with_datastore
+    records = [os.urandom(n) for n in (10, 40000, 1, 32768 - 7, 70000, 0, 5)]
+    for data in records:
+        ds._write_data(data)
+    ds.close()
+    ds = datastore.DataStore()
+    ds.open_for_scan(FNAME)
+    assert [ds.scan_data() for _ in records] == records
+    assert ds.scan_data() is None
+    ds.close()
+
+
+def test_reader(with_datastore):
+    """The memory-mapped reader reads what scan_data reads."""
+    ds = with_datastore
+    records = [os.urandom(n) for n in (10, 40000, 1, 32768 - 7, 70000, 0, 5)]
+    offsets = [ds._write_data(data)[0] for data in records]
+    ds.close()
+    with open(FNAME, "ab") as f:
+        # a record that is still being written
+        f.write(b'\x01' * 5)
+    reader = datastore.DataStoreReader(FNAME)
+    assert list(reader.records()) == list(zip(offsets, records))
+    assert reader.read(offsets[4]) == records[4]
+    assert [data for _, data in reader.records(offsets[-2])] == records[-2:]
+    reader.close()
+
+
+def test_reader_index(with_datastore):
+    """The index lists record types and steps, and follows the log as it grows."""
+    def history(step):
+        rec = wandb_internal_pb2.Record()
+        item = rec.history.item.add()
+        item.key = "_step"
+        item.value_json = json.dumps(step)
+        return rec
+
+    ds = with_datastore
+    ds.write(wandb_internal_pb2.Record(run=wandb_internal_pb2.RunRecord(run_id="r")))
+    for step in range(3):
+        ds.write(history(step))
+    ds.flush()
+    with datastore.DataStoreReader(FNAME) as reader:
+        index = reader.index()
+    assert [(e.record_type, e.step) for e in index] == [
+        ("run", -1), ("history", 0), ("history", 1), ("history", 2)]
+    assert os.path.exists(FNAME + datastore.INDEX_SUFFIX)
+
+    ds.write(history(3))
+    ds.write(wandb_internal_pb2.Record(exit=wandb_internal_pb2.RunExitRecord()))
+    ds.close()
+    with datastore.DataStoreReader(FNAME) as reader:
+        index = reader.index()
+        assert [(e.record_type, e.step) for e in index[4:]] == [
+            ("history", 3), ("exit", -1)]
+        assert index[:4] == reader.index(save=False)[:4]
+        rec = wandb_internal_pb2.Record()
+        rec.ParseFromString(reader.read(index[4].offset))
+        assert rec == history(3)
+    os.unlink(FNAME + datastore.INDEX_SUFFIX)
+
+
+def _damage(offset, data=b'\xff'):
+    with open(FNAME, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def test_reader_recover(with_datastore):
+    """Damaged records are skipped and counted as lost."""
+    ds = with_datastore
+    records = [os.urandom(n) for n in (100, 40000, 100, 100, 70000, 100, 100)]
+    offsets = [ds._write_data(data)[0] for data in records]
+    ds.close()
+    # the data of a small record, and the header of the middle of a large one
+    _damage(offsets[0] + 20)
+    _damage((offsets[4] // 32768 + 1) * 32768 + 6)
+    with open(FNAME, "ab") as f:
+        f.write(b'\x01' * 20)
+
+    reader = datastore.DataStoreReader(FNAME)
+    with pytest.raises(datastore.CorruptionError):
+        list(reader.records())
+    recovered = [data for _, data in reader.records(recover=True)]
+    assert recovered == [records[i] for i in (1, 2, 3, 5, 6)]
+    # the cut off record at the end counts too
+    assert reader.lost_records == 3
+    assert reader.skipped_bytes > 32768
+    reader.close()
+
+    ds = datastore.DataStore()
+    ds.open_for_scan(FNAME)
+    with pytest.raises(datastore.CorruptionError):
+        ds.scan_data()
+    ds.close()
+
+
+def test_open_for_append(with_datastore):
+    """Appending drops a record cut off at the end and continues the log."""
+    ds = with_datastore
+    records = [os.urandom(n) for n in (100, 40000, 100)]
+    for data in records:
+        ds._write_data(data)
+    ds.close()
+    size = os.stat(FNAME).st_size
+    with open(FNAME, "r+b") as f:
+        f.truncate(size - 50)
+
+    ds = datastore.DataStore()
+    ds.open_for_append(FNAME)
+    more = [os.urandom(n) for n in (10, 50000)]
+    for data in more:
+        ds._write_data(data)
+    ds.close()
+    with datastore.DataStoreReader(FNAME) as reader:
+        assert [data for _, data in reader.records()] == records[:2] + more
+
+    # a log killed before its header was written
+    with open(FNAME, "wb"):
+        pass
+    ds = datastore.DataStore()
+    ds.open_for_append(FNAME)
+    ds._write_data(more[0])
+    ds.close()
+    with datastore.DataStoreReader(FNAME) as reader:
+        assert [data for _, data in reader.records()] == more[:1]
@@ -1,5 +1,6 @@
 from wandb import lib
 import os
+import pytest
 
 
 def test_write_netrc():
@@ -8,4 +9,340 @@ def test_write_netrc():
     with open(os.path.expanduser("~/.netrc")) as f:
         assert f.read() == ("machine localhost\n"
                             "  login vanpelt\n"
-                            "  password %s\n" % api_key)
\ No newline at end of file
+                            "  password %s\n" % api_key)
+
+def test_ringbuffer_queue_roundtrip():
+    import multiprocessing
+    import threading
+    from wandb.lib import ringbuffer
+    from wandb.proto import wandb_internal_pb2
+
+    q = ringbuffer.RingBufferQueue(multiprocessing, size=256)
+    records = []
+    for i in range(20):
+        rec = wandb_internal_pb2.Record()
+        rec.output.line = str(i) * (i * 10)
+        records.append(rec)
+    batch = wandb_internal_pb2.RecordBatch()
+    batch.record.extend(records[:3])
+    records.append(batch)
+
+    received = []
+
+    def consume():
+        for _ in records:
+            received.append(q.get(timeout=5))
+
+    t = threading.Thread(target=consume)
+    t.start()
+    for rec in records:
+        q.put(rec)
+    t.join()
+    assert received == records
+    assert q.empty()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_ringbuffer_queue_forked_producer(monkeypatch):
+    import multiprocessing
+    import wandb
+    from wandb.lib import ringbuffer
+    from wandb.proto import wandb_internal_pb2
+
+    def record(line):
+        rec = wandb_internal_pb2.Record()
+        rec.output.line = line
+        return rec
+
+    def child(q):
+        q.put(record("from child"))
+
+    # a user process, like one forked from the script that started the run
+    monkeypatch.setattr(wandb, "_IS_INTERNAL_PROCESS", False)
+    q = ringbuffer.RingBufferQueue(multiprocessing, size=256)
+    q.put(record("from parent"))
+    p = multiprocessing.get_context("fork").Process(target=child, args=(q,))
+    p.start()
+    p.join()
+    assert p.exitcode == 0
+    lines = sorted(q.get(timeout=5).output.line for _ in range(2))
+    assert lines == ["from child", "from parent"]
+    assert q.empty()
+
+
+def test_ringbuffer_queue_full():
+    import multiprocessing
+    from six.moves import queue
+    from wandb.lib import ringbuffer
+    from wandb.proto import wandb_internal_pb2
+
+    rec = wandb_internal_pb2.Record()
+    rec.output.line = "x" * 100
+    q = ringbuffer.RingBufferQueue(multiprocessing, size=256)
+    q.put(rec)
+    q.put(rec)
+    with pytest.raises(queue.Full):
+        q.put(rec, timeout=0.05)
+    with pytest.raises(queue.Full):
+        q.put(rec, block=False)
+    # nothing of the puts that gave up is left behind
+    assert q.get(timeout=5) == rec
+    q.put(rec, block=False)
+    assert [q.get(timeout=5) for _ in range(2)] == [rec, rec]
+    assert q.empty()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_ringbuffer_queue_dead_consumer():
+    import multiprocessing
+    from wandb.lib import ringbuffer
+    from wandb.proto import wandb_internal_pb2
+
+    rec = wandb_internal_pb2.Record()
+    rec.output.line = "x" * 100
+    q = ringbuffer.RingBufferQueue(multiprocessing, size=256)
+    q.put(rec)
+    p = multiprocessing.get_context("fork").Process(target=q.get, args=(True, 5))
+    p.start()
+    p.join()
+    q.put(rec)
+    q.put(rec)
+    # the consumer is gone, a full ring buffer can't drain
+    with pytest.raises(Exception, match="backend process has shutdown"):
+        q.put(rec)
+
+
+def test_output_coalescer():
+    from wandb.lib import redirect
+
+    out = []
+    coalescer = redirect.OutputCoalescer(lambda name, data: out.append((name, data)), 60)
+    coalescer("stdout", b"epoch 1\n10%\r50%\r")
+    coalescer("stdout", b"100%\r\n")
+    coalescer("stderr", b"caf\xc3")
+    coalescer("stderr", b"\xa9\n")
+    coalescer("stdout", "unfinished\rline")
+    coalescer.flush()
+    assert out == [
+        ("stdout", "epoch 1\n100%\n"), ("stderr", u"caf\xe9\n"), ("stdout", "line")]
+    # an unfinished line is passed on again once it changed, replacing itself
+    coalescer.flush()
+    assert len(out) == 3
+    coalescer("stdout", " more\nlast")
+    coalescer.stop()
+    assert out[3:] == [("stdout", "\rline more\n"), ("stdout", "last")]
+
+
+def test_output_coalescer_rate_limit():
+    from wandb.lib import redirect
+
+    out = []
+    coalescer = redirect.OutputCoalescer(
+        lambda name, data: out.append(data), 1, max_bytes_per_second=10
+    )
+    coalescer("stdout", "short\n" + "x" * 20 + "\n" + "y\n")
+    coalescer.stop()
+    assert out == [
+        "short\nwandb: dropped 2 lines (23 bytes) of console output over the rate limit\n"
+    ]
+
+
+def test_digest_cache(tmpdir, monkeypatch):
+    import time
+    from wandb.interface.artifacts import md5_string
+    from wandb.lib import digest_cache
+
+    hashed = []
+    real_md5 = digest_cache._md5_file_b64
+    monkeypatch.setattr(
+        digest_cache, "_md5_file_b64", lambda p: hashed.append(p) or real_md5(p))
+    cache = digest_cache.DigestCache(str(tmpdir.join("cache", "digests.db")))
+    path = tmpdir.join("data", "a.txt")
+    path.write("hello", ensure=True)
+    old = time.time() - 60
+    os.utime(str(path), (old, old))
+
+    assert cache.md5_file_b64(str(path)) == md5_string("hello")
+    assert cache.md5_file_b64(str(path)) == md5_string("hello")
+    assert len(hashed) == 1
+
+    # same mtime, new contents and size
+    path.write("hello world")
+    os.utime(str(path), (old, old))
+    assert cache.md5_file_b64(str(path)) == md5_string("hello world")
+    assert len(hashed) == 2
+
+    cache.invalidate(str(tmpdir.join("data")))
+    assert cache.md5_file_b64(str(path)) == md5_string("hello world")
+    assert len(hashed) == 3
+
+    # recently modified files are not cached
+    path.write("new")
+    cache.md5_file_b64(str(path))
+    cache.md5_file_b64(str(path))
+    assert len(hashed) == 5
+
+    # a corrupt database is recreated
+    cache = digest_cache.DigestCache(str(tmpdir.join("bad.db")))
+    tmpdir.join("bad.db").write("not a database")
+    os.utime(str(path), (old, old))
+    cache.md5_file_b64(str(path))
+    cache.md5_file_b64(str(path))
+    assert len(hashed) == 6
+
+
+def test_file_hasher(tmpdir, monkeypatch):
+    import multiprocessing
+    from wandb.interface.artifacts import md5_file_b64
+    from wandb.lib import digest_cache, hashing
+
+    monkeypatch.setattr(digest_cache, "_digest_cache", digest_cache._NoDigestCache())
+    monkeypatch.setattr(hashing, "READ_BUFFER_BYTES", 1000)
+    for i, size in enumerate([0, 10, 999, 1000, 4321]):
+        tmpdir.join("tree", "d%d" % (i % 2), "f%d" % i).write_binary(
+            os.urandom(size), ensure=True)
+    if hasattr(os, "symlink"):
+        os.symlink(str(tmpdir.join("tree", "d0")), str(tmpdir.join("tree", "link")))
+    files = list(hashing.walk_files(str(tmpdir.join("tree"))))
+    names = sorted(os.path.relpath(p, str(tmpdir.join("tree"))) for p, _ in files)
+    assert names[:5] == ["d0/f0", "d0/f2", "d0/f4", "d1/f1", "d1/f3"]
+    for use_processes in (False, True):
+        hasher = hashing.FileHasher(workers=2, use_processes=use_processes)
+        digests = hasher.md5_files_b64(files)
+        assert digests == {p: md5_file_b64(p) for p, _ in files}
+        assert hasher.bytes_hashed == sum(st.st_size for _, st in files)
+
+    # picking a process pool leaves the start method to the program
+    if hasattr(multiprocessing, "get_start_method") and os.name == "posix":
+        context = multiprocessing.context._default_context
+        monkeypatch.setattr(context, "_actual_context", None)
+        monkeypatch.setattr(hashing, "PROCESS_MIN_FILES", 1)
+        hasher = hashing.FileHasher(workers=2)
+        assert hasher.md5_files_b64(files) == {p: md5_file_b64(p) for p, _ in files}
+        assert multiprocessing.get_start_method(allow_none=True) is None
+
+
+def test_copy_file(tmpdir):
+    import stat
+    from wandb.lib import filesystem
+
+    src = tmpdir.join("src")
+    src.write("hello")
+    for mode in filesystem.LINK_MODES:
+        dst = tmpdir.join("out", mode)
+        dst.write("old contents", ensure=True)
+        filesystem.copy_file(str(src), str(dst), mode)
+        assert dst.read() == "hello"
+        linked = os.stat(str(dst)).st_ino == os.stat(str(src)).st_ino
+        assert linked == (mode == "hardlink")
+    # permissions of the shared file are left alone
+    assert os.stat(str(src)).st_mode & stat.S_IWUSR
+    assert tmpdir.join("out").listdir(sort=True) == [
+        tmpdir.join("out", mode) for mode in sorted(filesystem.LINK_MODES)]
+
+    tmpdir.join("cache", "obj").write("cached", ensure=True)
+    old = os.stat(str(tmpdir.join("cache", "obj"))).st_mtime - 100
+    os.utime(str(tmpdir.join("cache", "obj")), (old, old))
+    filesystem.copy_file(str(tmpdir.join("cache", "obj")), str(src),
+                         preserve_stat=True)
+    assert src.read() == "cached"
+    assert os.stat(str(src)).st_mtime == old
+
+    with pytest.raises(ValueError):
+        filesystem.copy_file(str(src), str(dst), "symlink")
+
+    # a read-only link can't be used to change the cached object
+    obj = tmpdir.join("cache", "obj")
+    dst = tmpdir.join("out", "download")
+    filesystem.copy_file(str(obj), str(dst), "hardlink", read_only=True)
+    assert os.stat(str(dst)).st_ino == os.stat(str(obj)).st_ino
+    assert not os.stat(str(dst)).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    # copies are the caller's own
+    filesystem.copy_file(str(obj), str(dst), "copy", read_only=True)
+    assert os.stat(str(dst)).st_mode & stat.S_IWUSR
+
+
+class _RangeSession(object):
+    """Serves data like an http server, failing once after fail_after bytes."""
+
+    def __init__(self, data, ranges=True, fail_after=None):
+        self.data = data
+        self.ranges = ranges
+        self.fail_after = fail_after
+        self.requests = []
+
+    def get(self, url, stream=False, headers=None, **kwargs):
+        import io
+        import requests
+
+        rng = (headers or {}).get("Range")
+        self.requests.append(rng)
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO()
+        body = self.data
+        if rng and self.ranges:
+            start, _, end = rng[len("bytes="):].partition("-")
+            end = int(end) + 1 if end else len(self.data)
+            body = self.data[int(start):end]
+            response.status_code = 206
+
+        def iter_content(chunk_size=1):
+            for i in range(0, len(body), chunk_size):
+                if self.fail_after is not None and i >= self.fail_after:
+                    self.fail_after = None
+                    raise requests.exceptions.ConnectionError("reset")
+                yield body[i:i + chunk_size]
+        response.iter_content = iter_content
+        return response
+
+
+def test_download_file(tmpdir, monkeypatch):
+    from wandb.lib import download
+    from wandb.lib.hashing import md5_file_b64
+
+    monkeypatch.setattr(download, "MIN_CHUNK_BYTES", 10)
+    monkeypatch.setattr(download, "MAX_CHUNK_BYTES", 10)
+    monkeypatch.setattr(download, "RETRY_SLEEP", 0)
+    data = os.urandom(1000)
+    tmpdir.join("src").write_binary(data)
+    md5 = md5_file_b64(str(tmpdir.join("src")))
+    path = str(tmpdir.join("dst"))
+
+    # a dropped connection resumes where it stopped
+    session = _RangeSession(data, fail_after=500)
+    assert download.download_file(session, "url", path, len(data), md5) == path
+    assert tmpdir.join("dst").read_binary() == data
+    assert session.requests == [None, "bytes=500-"]
+    assert tmpdir.listdir(sort=True) == [tmpdir.join("dst"), tmpdir.join("src")]
+
+    # and starts over if the server ignores the range
+    os.remove(path)
+    session = _RangeSession(data, ranges=False, fail_after=500)
+    download.download_file(session, "url", path, len(data), md5)
+    assert tmpdir.join("dst").read_binary() == data
+    assert session.requests == [None, "bytes=500-"]
+
+    # a bad file is removed, not renamed into place
+    os.remove(path)
+    with pytest.raises(ValueError):
+        download.download_file(_RangeSession(data[:-1] + b"x"), "url", path,
+                               len(data), md5)
+    assert tmpdir.listdir(sort=True) == [tmpdir.join("src")]
+
+    # large files are downloaded in ranges
+    monkeypatch.setattr(download, "RANGE_MIN_BYTES", 100)
+    monkeypatch.setattr(download, "RANGE_BYTES", 300)
+    session = _RangeSession(data, fail_after=150)
+    download.download_file(session, "url", path, len(data), md5)
+    assert tmpdir.join("dst").read_binary() == data
+    assert len(session.requests) == 5
+    assert sorted(set(session.requests)) == [
+        "bytes=0-299", "bytes=300-599", "bytes=600-899", "bytes=900-999"]
+    assert tmpdir.listdir(sort=True) == [tmpdir.join("dst"), tmpdir.join("src")]
+
+    # unless the server doesn't support them
+    os.remove(path)
+    download.download_file(_RangeSession(data, ranges=False), "url", path,
+                           len(data), md5)
+    assert tmpdir.join("dst").read_binary() == data
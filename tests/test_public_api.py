@@ -338,9 +338,62 @@ def test_artifact_manual_error(runner, mock_server, api):
                     reason="Verify is broken on Windows")
 def test_artifact_verify(runner, mock_server, api):
     art = api.artifact("entity/project/mnist:v0", type="dataset")
-    art.download()
-    with pytest.raises(ValueError):
+    with runner.isolated_filesystem():
+        path = art.download()
         art.verify()
+        with open(os.path.join(path, "digits.h5"), "a") as f:
+            f.write("modified")
+        with pytest.raises(ValueError):
+            art.verify()
+
+
+def test_artifact_open(runner, mock_server, api):
+    import mmap
+    from tests.utils.mock_server import ARTIFACT_FILE
+
+    art = api.artifact("entity/project/mnist:v0", type="dataset")
+    with runner.isolated_filesystem():
+        with art.open("digits.h5") as f:
+            assert f.read() == ARTIFACT_FILE
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            assert m[:] == ARTIFACT_FILE
+            m.close()
+        assert f.name == art.cache_path("digits.h5")
+        # nothing is written outside the cache
+        assert not os.path.exists("artifacts")
+    with pytest.raises(KeyError):
+        art.open("missing.h5")
+    with pytest.raises(ValueError):
+        art.open("digits.h5", "w")
+
+
+def test_artifact_prefetcher(monkeypatch):
+    from wandb.apis import public
+
+    monkeypatch.setattr(public, "PREFETCH_FILES", 2)
+    names = ["shard-%d" % i for i in range(6)]
+    fetched = []
+
+    def fetch(name):
+        fetched.append(name)
+        return "/cache/" + name
+
+    prefetcher = public._ArtifactPrefetcher(fetch, names)
+    assert prefetcher.get("shard-3") == "/cache/shard-3"
+    assert fetched == ["shard-3"]
+    # reading in order fetches the next files ahead
+    assert prefetcher.get("shard-4") == "/cache/shard-4"
+    assert prefetcher.get("shard-5") == "/cache/shard-5"
+    assert sorted(fetched) == ["shard-3", "shard-4", "shard-5"]
+    del fetched[:]
+    prefetcher.get("shard-0")
+    assert fetched == ["shard-0"]
+    prefetcher.get("shard-1")
+    assert prefetcher.get("shard-2") == "/cache/shard-2"
+    assert sorted(prefetcher._pending) == ["shard-3", "shard-4"]
+    for result in prefetcher._pending.values():
+        result.get()
+    assert sorted(fetched) == ["shard-%d" % i for i in range(5)]
 
 
 def test_sweep(runner, mock_server, api):
@@ -1,3 +1,4 @@
+import json
 import os
 import pytest
 from six.moves import queue
@@ -7,8 +8,12 @@ import shutil
 
 from wandb.util import mkdir_exists_ok
 from wandb.internal.handler import HandleManager
+from wandb.internal import file_stream
+from wandb.lib import proto_util
+from wandb.filesync import stats, step_upload
 from wandb.internal.sender import SendManager
 from wandb.interface.interface import BackendSender
+from wandb.proto import wandb_internal_pb2
 
 
 @pytest.fixture()
@@ -419,4 +424,436 @@ def test_save_now_twice(mocked_run, mock_server, sender, start_backend, stop_bac
     assert len(mock_server.ctx["storage?file=foo/test.txt"]) == 2
 
 
+def _history_record(**row):
+    history = wandb_internal_pb2.HistoryRecord()
+    for k, v in row.items():
+        item = history.item.add()
+        item.key = k
+        item.value_json = json.dumps(v)
+    return wandb_internal_pb2.Record(history=history)
+
+
+def _drain_summaries(q):
+    summaries = []
+    while not q.empty():
+        record = q.get()
+        if record.WhichOneof("record_type") == "summary":
+            summaries.append(record.summary)
+    return summaries
+
+
+def test_summary_delta_only_changed_keys(hm, sender_q):
+    hm.handle(_history_record(loss=1.0, acc=0.5))
+    hm.handle(_history_record(loss=0.9, acc=0.5))
+    hm.handle(_history_record(acc=0.5))
+    summaries = _drain_summaries(sender_q)
+    assert len(summaries) == 2
+    assert sorted(item.key for item in summaries[0].update) == ["acc", "loss"]
+    assert [item.key for item in summaries[1].update] == ["loss"]
+
+
+def test_summary_delta_remove(hm, sender_q):
+    hm.handle(_history_record(loss=1.0, acc=0.5))
+    summary = wandb_internal_pb2.SummaryRecord()
+    summary.remove.add().key = "acc"
+    hm.handle(wandb_internal_pb2.Record(summary=summary))
+    summaries = _drain_summaries(sender_q)
+    assert [item.key for item in summaries[-1].remove] == ["acc"]
+    assert len(summaries[-1].update) == 0
+
+
+def test_summary_coalesced_write(sm, test_settings):
+    sm.SUMMARY_FLUSH_SECONDS = 60
+    mkdir_exists_ok(test_settings.files_dir)
+    summary_path = os.path.join(test_settings.files_dir, "wandb-summary.json")
+    for i in range(5):
+        summary = wandb_internal_pb2.SummaryRecord()
+        item = summary.update.add()
+        item.key = "k%d" % i
+        item.value_json = json.dumps(i)
+        sm.send(wandb_internal_pb2.Record(summary=summary))
+    with open(summary_path) as f:
+        assert json.load(f) == {"k0": 0}
+    sm.finish()
+    with open(summary_path) as f:
+        assert json.load(f) == {"k0": 0, "k1": 1, "k2": 2, "k3": 3, "k4": 4}
+
+
+def test_record_batch_size(record_q):
+    interface = BackendSender(record_q=record_q, batch_size=3, batch_seconds=60)
+    for i in range(4):
+        interface.publish_stats({"cpu": i})
+    batch = record_q.get(timeout=1)
+    assert isinstance(batch, wandb_internal_pb2.RecordBatch)
+    assert [json.loads(r.stats.item[0].value_json) for r in batch.record] == [0, 1, 2]
+    assert record_q.empty()
+    interface._batcher.join()
+    batch = record_q.get(timeout=1)
+    assert len(batch.record) == 1
+
+
+def test_record_batch_timeout(record_q):
+    interface = BackendSender(record_q=record_q, batch_size=100, batch_seconds=0.1)
+    interface.publish_stats({"cpu": 1})
+    batch = record_q.get(timeout=5)
+    assert len(batch.record) == 1
+    interface._batcher.join()
+
+
 # TODO: test other sender methods
+
+
+def test_file_stream_gzip(sm, mock_server):
+    fs = file_stream.FileStreamApi(sm._api, "test", time.time())
+    fs.set_file_policy("wandb-history.jsonl", file_stream.JsonlFilePolicy())
+    fs.start()
+    for i in range(200):
+        fs.push("wandb-history.jsonl", json.dumps({"_step": i, "loss": 1.0 / (i + 1)}))
+    fs.finish(0)
+    assert mock_server.ctx["file_stream_gzip"] > 0
+    history = []
+    for post in mock_server.ctx["file_stream"]:
+        if post and "files" in post:
+            history.extend(post["files"]["wandb-history.jsonl"]["content"])
+    assert [json.loads(line)["_step"] for line in history] == list(range(200))
+    stats = fs.stats()
+    assert stats["chunks"] == 200
+    assert stats["sent_bytes"] < stats["raw_bytes"]
+
+
+def test_send_history_batch(sm, mock_server):
+    fs = file_stream.FileStreamApi(sm._api, "test", time.time())
+    fs.set_file_policy("wandb-history.jsonl", file_stream.JsonlFilePolicy())
+    fs.start()
+    sm._fs = fs
+    rows = [{"_step": i, "loss": 1.0 / (i + 1), "name": u"r\u00e9sum\u00e9"} for i in range(300)]
+    sm.send_history_batch([_history_record(**row) for row in rows[:250]])
+    sm.send_history(_history_record(**rows[250]))
+    sm.send_history_batch([_history_record(**row) for row in rows[251:]])
+    fs.finish(0)
+    lines = {}
+    for post in mock_server.ctx["file_stream"]:
+        if post and "files" in post:
+            fpost = post["files"]["wandb-history.jsonl"]
+            for i, line in enumerate(fpost["content"]):
+                lines[fpost["offset"] + i] = json.loads(line)
+    assert lines == dict(enumerate(rows))
+    assert fs.stats()["chunks"] == 300
+
+    # a key that appears twice keeps its last value, like a dict does
+    history = _history_record(loss=1.0).history
+    item = history.item.add()
+    item.key = "loss"
+    item.value_json = "2.0"
+    assert json.loads(proto_util.json_from_proto_list(history.item)) == {"loss": 2.0}
+
+
+def test_file_stream_adaptive_batch(sm, mock_server):
+    fs = file_stream.FileStreamApi(sm._api, "test", time.time())
+    fs._max_items = 1000
+    fs._adapt(0.1, 1000)
+    assert fs._max_items == 2000
+    fs._adapt(0.1, 10)
+    assert fs._max_items == 2000
+    fs._adapt(30, 2000)
+    assert fs._max_items == 1000
+
+
+def test_file_stream_pipelined(sm, mock_server):
+    mock_server.ctx["file_stream_latency"] = 0.2
+
+    def stream(max_inflight):
+        mock_server.ctx["file_stream"] = []
+        fs = file_stream.FileStreamApi(
+            sm._api, "test", time.time(), max_inflight=max_inflight
+        )
+        fs._max_items = fs.MAX_ITEMS_PER_PUSH_LIMIT = 49
+        fs.set_file_policy("wandb-history.jsonl", file_stream.JsonlFilePolicy())
+        for i in range(500):
+            fs.push("wandb-history.jsonl", json.dumps({"_step": i}))
+        start = time.time()
+        fs.start()
+        fs.finish(0)
+        elapsed = time.time() - start
+        lines = {}
+        for post in mock_server.ctx["file_stream"]:
+            fpost = (post or {}).get("files", {}).get("wandb-history.jsonl")
+            if fpost:
+                for i, line in enumerate(fpost["content"]):
+                    lines[fpost["offset"] + i] = json.loads(line)["_step"]
+        assert lines == {i: i for i in range(500)}
+        return elapsed
+
+    # 10 posts at 200ms each, posts of the same file overlap
+    serial = stream(1)
+    pipelined = stream(8)
+    assert serial > 2
+    assert pipelined < serial / 2
+
+
+def test_file_stream_summary_ordered(sm, mock_server):
+    mock_server.ctx["file_stream"] = []
+    mock_server.ctx["file_stream_first_latency"] = 0.5
+    fs = file_stream.FileStreamApi(sm._api, "test", time.time(), max_inflight=4)
+    fs.set_file_policy("wandb-history.jsonl", file_stream.JsonlFilePolicy())
+    fs.set_file_policy("wandb-summary.json", file_stream.SummaryFilePolicy())
+    # posts of 10 chunks
+    fs._max_items = fs.MAX_ITEMS_PER_PUSH_LIMIT = 9
+    for i in range(10):
+        fs.push("wandb-summary.json", json.dumps({"acc": i}))
+    for i in range(10):
+        fs.push("wandb-history.jsonl", json.dumps({"_step": i}))
+    for i in range(10, 20):
+        fs.push("wandb-summary.json", json.dumps({"acc": i}))
+    fs.start()
+    fs.finish(0)
+
+    posts = [p["files"] for p in mock_server.ctx["file_stream"] if p and p.get("files")]
+    # history doesn't wait for the slow summary post
+    assert list(posts[0]) == ["wandb-history.jsonl"]
+    # the summary is posted on its own, a newer one after the older one
+    summaries = [p["wandb-summary.json"]["content"] for p in posts
+                 if "wandb-summary.json" in p]
+    assert all(list(p) == ["wandb-summary.json"] for p in posts[1:])
+    assert summaries == [[json.dumps({"acc": 9})], [json.dumps({"acc": 19})]]
+
+
+def test_send_output_unfinished_line(sm):
+    fs = file_stream.FileStreamApi(sm._api, "test", time.time())
+    sm._fs = fs
+    for line in ["epoch 1\n50%", "\r100%\n", "done\n"]:
+        record = wandb_internal_pb2.Record()
+        record.output.output_type = wandb_internal_pb2.OutputRecord.OutputType.STDOUT
+        record.output.line = line
+        sm.send_output(record)
+    chunks = [fs._queue.get() for _ in range(3)]
+
+    # the unfinished line is sent, then written over once it's done
+    policy = file_stream.CRDedupeFilePolicy()
+    first = policy.process_chunks(chunks[:1])
+    assert first["offset"] == 0
+    assert [line.split(" ", 1)[1] for line in first["content"]] == ["epoch 1\n", "50%\n"]
+    rest = policy.process_chunks(chunks[1:])
+    assert rest["offset"] == 1
+    assert [line.split(" ", 1)[1] for line in rest["content"]] == ["100%\n", "done\n"]
+    assert policy._chunk_id == 3
+
+
+def test_step_upload_worker_pool(tmpdir):
+    event_queue = queue.Queue()
+    started = []
+    running = []
+    max_running = [0]
+    lock = threading.Lock()
+
+    def save_fn(name):
+        def fn(progress):
+            with lock:
+                started.append(name)
+                running.append(name)
+                max_running[0] = max(max_running[0], len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+            return False
+        return fn
+
+    def request(name, artifact_id=None):
+        path = str(tmpdir.join(name.replace("/", "_")))
+        return step_upload.RequestUpload(
+            path, name, artifact_id, None, False, save_fn(name), None)
+
+    upload = step_upload.StepUpload(None, stats.Stats(), event_queue, 2)
+    for i in range(8):
+        event_queue.put(request("artifact/%d" % i, artifact_id="art"))
+    for i in range(3):
+        event_queue.put(request("wandb-summary.json"))
+    event_queue.put(request("wandb-metadata.json"))
+    upload.start()
+    event_queue.put(step_upload.RequestFinish())
+    upload._thread.join()
+
+    assert len(upload._workers) == 2
+    assert max_running[0] == 2
+    assert started.count("wandb-summary.json") == 3
+    # run files jump the queue of artifact files
+    assert started.index("wandb-metadata.json") < started.index("artifact/7")
+    assert not any(w.is_alive() for w in upload._workers)
+
+
+def test_upload_session_per_host(sm, mock_server, tmpdir):
+    path = tmpdir.join("file.txt")
+    path.write("data")
+    for _ in range(2):
+        with open(str(path), "rb") as f:
+            sm._api.upload_file(
+                "https://storage.example.com/storage?file=file.txt", f)
+    assert list(sm._api._upload_sessions) == ["storage.example.com"]
+
+
+def test_upload_file_parts(sm, mock_server, tmpdir, monkeypatch):
+    monkeypatch.setenv("WANDB_UPLOAD_PART_SIZE", "1000")
+    data = os.urandom(4500)
+    path = tmpdir.join("model.bin")
+    path.write_binary(data)
+    url = "https://api.wandb.ai/storage?file=model.bin"
+    api = sm._api
+    api.UPLOAD_PART_ALIGN = 1
+    api.UPLOAD_PART_RETRIES = 0
+    api.UPLOAD_PART_RETRY_SLEEP = 0
+
+    # the third part fails without retries, the upload stops
+    mock_server.ctx["fail_part_at"] = 2000
+    with open(str(path), "rb") as f:
+        with pytest.raises(Exception):
+            api.upload_file(url, f)
+    state_path = api._upload_state_path(url, str(path), 4500, 1000)
+    with open(state_path) as f:
+        state = f.read()
+
+    # resuming asks the session where to continue and sends the rest in order
+    mock_server.ctx["storage_ranges"] = []
+    totals = []
+    with open(str(path), "rb") as f:
+        response = api.upload_file(url, f, lambda _, t: totals.append(t))
+    assert response.status_code == 200
+    assert mock_server.ctx["storage_ranges"] == [
+        "*/4500", "2000-2999/4500", "3000-3999/4500", "4000-4499/4500"]
+    assert totals == [3000, 4000, 4500]
+    assert mock_server.ctx["storage_uploads"]["model.bin"] == data
+    assert not os.path.exists(state_path)
+
+    # a finished session isn't uploaded again
+    with open(state_path, "w") as f:
+        f.write(state)
+    mock_server.ctx["storage_ranges"] = []
+    with open(str(path), "rb") as f:
+        response = api.upload_file(url, f)
+    assert response.status_code == 200
+    assert mock_server.ctx["storage_ranges"] == ["*/4500"]
+    assert not os.path.exists(state_path)
+
+    # parts are retried on their own
+    del mock_server.ctx["storage_uploads"]
+    mock_server.ctx["fail_part_at"] = 3000
+    api.UPLOAD_PART_RETRIES = 2
+    with open(str(path), "rb") as f:
+        api.upload_file(url, f)
+    assert mock_server.ctx["storage_uploads"]["model.bin"] == data
+
+    # urls that won't start a resumable session get the whole file in one PUT
+    mock_server.ctx["storage_resumable_forbidden"] = True
+    mock_server.ctx["storage_ranges"] = []
+    with open(str(path), "rb") as f:
+        response = api.upload_file(url, f)
+    assert response.status_code == 200
+    assert mock_server.ctx["storage_ranges"] == []
+    assert mock_server.ctx["storage"]["unknown"] == ["model.bin"]
+
+
+def test_artifact_saver_reuses_latest_entries(sm, mock_server, tmpdir, monkeypatch):
+    from wandb.internal import artifacts
+
+    api = sm._api
+    monkeypatch.setattr(api, "create_artifact", lambda *args, **kwargs: (
+        {"id": "2", "state": "PENDING"}, {"id": "1", "versionIndex": 0}))
+    monkeypatch.setattr(api, "create_artifact_manifest", lambda *args, **kwargs: {})
+    stored = []
+
+    class FilePusher(object):
+        def store_manifest_files(self, manifest, artifact_id, save_fn, entries=None):
+            stored.extend(entry.path for entry in entries)
+
+        def commit_artifact(self, artifact_id, before_commit=None, on_commit=None):
+            pass
+
+    contents = {
+        # the same file as in the latest version, stored under a new name
+        "data/digits.h5": {"digest": "7o5yq3tZSJ+9zdQ2UnClYQ==", "size": 95},
+        "new.txt": {"digest": "XUFAKrxLKna5cZ2REBfFkg==", "size": 5},
+    }
+    for path, content in contents.items():
+        content["local_path"] = str(tmpdir.join(path))
+    manifest_json = {
+        "version": 1,
+        "storagePolicy": "wandb-storage-policy-v1",
+        "storagePolicyConfig": {},
+        "contents": contents,
+    }
+    saver = artifacts.ArtifactSaver(api, "abc", manifest_json, FilePusher())
+    saver.save("dataset", "mnist")
+    assert stored == ["new.txt"]
+    entries = saver._manifest.entries
+    assert entries["data/digits.h5"].birth_artifact_id == "1"
+    assert entries["new.txt"].birth_artifact_id is None
+
+
+def test_artifact_saver_manifest_file(interface, sm, tmpdir, monkeypatch):
+    import wandb
+    from wandb.interface import interface as interface_module
+    from wandb.internal import artifacts
+
+    artifact = wandb.Artifact("mnist", type="dataset")
+    for name in ["b.txt", "a.txt", "c.txt"]:
+        tmpdir.join("data", name).write(name, ensure=True)
+    artifact.add_dir(str(tmpdir.join("data")))
+    monkeypatch.setattr(interface_module, "MANIFEST_FILE_ENTRIES", 2)
+    proto = interface._make_artifact(artifact, sync_dir=str(tmpdir))
+    # the entries aren't in the record, the file is in the sync directory
+    assert not proto.manifest.contents
+    assert not os.path.isabs(proto.manifest.manifest_file_path)
+    manifest_file_path = str(tmpdir.join(proto.manifest.manifest_file_path))
+    with open(manifest_file_path) as f:
+        assert [json.loads(line)["path"] for line in f] == [
+            "a.txt", "b.txt", "c.txt"]
+
+    api = sm._api
+    monkeypatch.setattr(api, "create_artifact", lambda *args, **kwargs: (
+        {"id": "2", "state": "PENDING"}, None))
+    monkeypatch.setattr(api, "create_artifact_manifest", lambda *args, **kwargs: {
+        "uploadUrl": "https://api.wandb.ai/storage?file=wandb_manifest.json",
+        "uploadHeaders": []})
+    uploaded = []
+    monkeypatch.setattr(api, "upload_file_retry", lambda url, fp, **kwargs: (
+        uploaded.append(json.loads(fp.read().decode("utf-8")))))
+
+    class FilePusher(object):
+        def store_manifest_files(self, manifest, artifact_id, save_fn, entries=None):
+            for entry in entries:
+                save_fn(entry, None)
+
+        def commit_artifact(self, artifact_id, before_commit=None, on_commit=None):
+            before_commit()
+            on_commit()
+
+    saver = artifacts.ArtifactSaver(
+        api, proto.digest,
+        artifacts._manifest_json_from_proto(proto.manifest), FilePusher(),
+        manifest_file_path=manifest_file_path)
+
+    def store_file(artifact_id, entry, preparer, progress_callback=None):
+        entry.birth_artifact_id = artifact_id
+        return False
+
+    monkeypatch.setattr(saver._manifest.storage_policy, "store_file", store_file)
+    saver.save("dataset", "mnist")
+    expected = artifact.manifest.to_manifest_json()
+    for content in expected["contents"].values():
+        content["birthArtifactID"] = "2"
+    assert uploaded == [expected]
+    # syncing the run again needs the file until it is marked synced
+    assert os.path.exists(manifest_file_path)
+    artifacts.remove_manifest_files(str(tmpdir))
+    assert not os.path.exists(manifest_file_path)
+    assert tmpdir.join("data", "a.txt").check()
+
+
+def test_send_artifact_missing_manifest_file(interface, sm):
+    import wandb
+
+    artifact = wandb.Artifact("mnist", type="dataset")
+    proto = interface._make_artifact(artifact)
+    proto.manifest.manifest_file_path = os.path.join("artifacts", "missing.jsonl")
+    record = wandb_internal_pb2.Record(artifact=proto)
+    with pytest.raises(Exception, match="missing.jsonl"):
+        sm.send(record)
@@ -6,6 +6,7 @@ import sys
 from datetime import datetime, timedelta
 import json
 import yaml
+import zlib
 # HACK: restore first two entries of sys path after wandb load
 save_path = sys.path[:2]
 import wandb
@@ -13,6 +14,7 @@ sys.path[0:0] = save_path
 import logging
 from six.moves import urllib
 import threading
+import time
 from tests.utils.mock_requests import RequestsMock
 
 
@@ -115,6 +117,10 @@ def run(ctx):
     }
 
 
+# digits.h5, the only file of the artifact
+ARTIFACT_FILE = b"ARTIFACT digits.h5\n" * 5
+
+
 def artifact(ctx, collection_name="mnist"):
     return {
         "id": ctx["page_count"],
@@ -262,6 +268,8 @@ def create_app(user_ctx=None):
             ctx["current_run"] = body["variables"]["run"]
         if body["variables"].get("files"):
             ctx["requested_file"] = body["variables"]["files"][0]
+            ctx.setdefault("upload_urls", []).append(
+                (body["variables"].get("name"), ctx["current_run"]))
             url = request.url_root + "/storage?file={}&run={}".format(urllib.parse.quote(ctx["requested_file"]), ctx["current_run"])
             return json.dumps(
                 {
@@ -467,7 +475,7 @@ def create_app(user_ctx=None):
                                 "name": body["variables"].get("name", "abc123"),
                                 "displayName": "lovely-dawn-32",
                                 "project": {
-                                    "name": "test",
+                                    "name": body["variables"].get("project") or "test",
                                     "entity": {"name": "mock_server_entity"},
                                 },
                             },
@@ -597,6 +605,15 @@ def create_app(user_ctx=None):
                 },
             }
             return {"data": {"project": {"artifact": art}}}
+        if "query ArtifactManifestByID(" in body["query"]:
+            manifest = {
+                "id": 1,
+                "file": {
+                    "id": 1,
+                    "directUrl": request.url_root + "/storage?file=wandb_manifest.json",
+                },
+            }
+            return {"data": {"artifact": {"currentManifest": manifest}}}
         if "stopped" in body["query"]:
             return json.dumps(
                 {
@@ -611,7 +628,7 @@ def create_app(user_ctx=None):
         error = {"message": "Not implemented in tests/mock_server.py", "body": body}
         return json.dumps({"errors": [error]})
 
-    @app.route("/storage", methods=["PUT", "GET"])
+    @app.route("/storage", methods=["PUT", "GET", "POST"])
     def storage():
         ctx = get_ctx()
         if "fail_storage_times" in ctx:
@@ -620,6 +637,38 @@ def create_app(user_ctx=None):
                 return json.dumps({"errors": ["Server down"]}), 500
         file = request.args.get("file")
         run = request.args.get("run", "unknown")
+        if request.headers.get("x-goog-resumable") == "start":
+            if ctx.get("storage_resumable_forbidden"):
+                return json.dumps({"errors": ["Forbidden"]}), 403
+            # start a resumable upload session, like google cloud storage
+            sessions = ctx.setdefault("storage_sessions", {})
+            upload_id = str(len(sessions))
+            sessions[upload_id] = b""
+            location = request.base_url + "?file=%s&upload_id=%s" % (file, upload_id)
+            return "", 201, {"Location": location}
+        if request.args.get("upload_id"):
+            upload_id = request.args["upload_id"]
+            if upload_id not in ctx.get("storage_sessions", {}):
+                return "", 404
+            content_range = request.headers["Content-Range"].split()[1]
+            ctx.setdefault("storage_ranges", []).append(content_range)
+            received = ctx["storage_sessions"][upload_id]
+            byte_range, total = content_range.split("/")
+            start = byte_range.split("-")[0]
+            total = int(total)
+            if start != "*":
+                if ctx.get("fail_part_at") == int(start):
+                    del ctx["fail_part_at"]
+                    return json.dumps({"errors": ["Server down"]}), 500
+                if int(start) != len(received):
+                    return json.dumps({"errors": ["Bad offset"]}), 400
+                received += request.get_data()
+                ctx["storage_sessions"][upload_id] = received
+            if len(received) == total:
+                ctx.setdefault("storage_uploads", {})[file] = received
+                return "", 200
+            headers = {"Range": "bytes=0-%d" % (len(received) - 1)} if received else {}
+            return "", 308, headers
         ctx["storage"] = ctx.get("storage", {})
         ctx["storage"][run] = ctx["storage"].get(run, [])
         ctx["storage"][run].append(request.args.get("file"))
@@ -634,7 +683,11 @@ def create_app(user_ctx=None):
                 "storagePolicy": "wandb-storage-policy-v1",
                 "storagePolicyConfig": {},
                 "contents": {
-                    "digits.h5": {"digest": "TeSJ4xxXg0ohuL5xEdq2Ew==", "size": 81299},
+                    "digits.h5": {
+                        "digest": "7o5yq3tZSJ+9zdQ2UnClYQ==",
+                        "birthArtifactID": "1",
+                        "size": len(ARTIFACT_FILE),
+                    },
                 },
             }
         elif file == "wandb-metadata.json":
@@ -662,13 +715,24 @@ index 30d74d2..9a2c773 100644
 
     @app.route("/artifacts/<entity>/<digest>", methods=["GET", "POST"])
     def artifact_file(entity, digest):
-        return "ARTIFACT %s" % digest, 200
+        return ARTIFACT_FILE, 200
 
     @app.route("/files/<entity>/<project>/<run>/file_stream", methods=["POST"])
     def file_stream(entity, project, run):
         ctx = get_ctx()
+        if ctx.get("file_stream_latency"):
+            time.sleep(ctx["file_stream_latency"])
+        # delays only the first post, later ones may overtake it
+        first_latency = ctx.pop("file_stream_first_latency", None)
+        if first_latency:
+            time.sleep(first_latency)
         ctx["file_stream"] = ctx.get("file_stream", [])
-        ctx["file_stream"].append(request.get_json())
+        if request.headers.get("Content-Encoding") == "gzip":
+            ctx["file_stream_gzip"] = ctx.get("file_stream_gzip", 0) + 1
+            body = zlib.decompress(request.get_data(), 16 + zlib.MAX_WBITS)
+            ctx["file_stream"].append(json.loads(body.decode("utf-8")))
+        else:
+            ctx["file_stream"].append(request.get_json())
         return json.dumps({"exitcode": None, "limits": {}})
 
     @app.route("/api/v1/namespaces/default/pods/test")
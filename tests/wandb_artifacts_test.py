@@ -348,3 +348,69 @@ def test_add_reference_unknown_handler(runner):
         manifest = artifact.manifest.to_manifest_json()
         assert manifest['contents']['ref'] == {
             'digest': 'ref://example.com/somefile.txt', 'ref': 'ref://example.com/somefile.txt'}
+
+
+def test_artifacts_cache_lru(tmpdir):
+    import base64
+    import time
+    from wandb.sdk import wandb_artifacts
+
+    cache = wandb_artifacts.ArtifactsCache(str(tmpdir.join("cache")))
+
+    def put(i):
+        digest = base64.b64encode(("%016d" % i).encode()).decode("ascii")
+        path, hit = cache.check_md5_obj_path(digest, 100)
+        if not hit:
+            with open(path, "wb") as f:
+                f.write(os.urandom(100))
+        return path, hit
+
+    paths = [put(i)[0] for i in range(10)]
+    # touch the first object again, the second is now least recently used
+    assert put(0)[1]
+    past = time.time() - 3600
+    for path in paths:
+        os.utime(path, (past, past))
+    assert cache.size() == 1000
+    assert cache.cleanup(750, min_age=0) == 300
+    assert [os.path.exists(p) for p in paths] == [True] + [False] * 3 + [True] * 6
+    assert cache.size() == 700
+
+    # a new process finds the same index
+    cache = wandb_artifacts.ArtifactsCache(str(tmpdir.join("cache")))
+    assert cache.size() == 700
+    # objects used recently are kept
+    assert cache.cleanup(0) == 0
+
+
+def test_artifacts_cache_max_size(tmpdir):
+    import base64
+    from wandb.sdk import wandb_artifacts
+
+    cache = wandb_artifacts.ArtifactsCache(str(tmpdir.join("cache")), max_size=1000)
+    cache.MIN_EVICT_AGE_SECONDS = 0
+    for i in range(30):
+        digest = base64.b64encode(("%016d" % i).encode()).decode("ascii")
+        path, hit = cache.check_md5_obj_path(digest, 100)
+        with open(path, "wb") as f:
+            f.write(os.urandom(100))
+        os.utime(path, (0, 0))
+    assert cache.size() <= 1000 + 100
+
+
+def test_artifacts_cache_hardlink_mode(tmpdir):
+    import base64
+    from wandb.sdk import wandb_artifacts
+
+    cache = wandb_artifacts.ArtifactsCache(
+        str(tmpdir.join("cache")), link_mode="hardlink")
+    src = tmpdir.join("model.bin")
+    src.write("weights")
+    digest = base64.b64encode(b"0" * 16).decode("ascii")
+    path, _ = cache.check_md5_obj_path(digest, 7)
+    cache.add_file(str(src), path)
+    # the user's file isn't linked into the cache, editing it is safe
+    assert os.stat(path).st_ino != os.stat(str(src)).st_ino
+    src.write("changed")
+    with open(path) as f:
+        assert f.read() == "weights"
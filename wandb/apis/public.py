@@ -1,3 +1,4 @@
+import atexit
 import datetime
 from functools import partial
 import json
@@ -5,8 +6,8 @@ import logging
 import os
 import platform
 import re
-import shutil
 import tempfile
+import threading
 import time
 
 from gql import Client, gql
@@ -21,6 +22,7 @@ from wandb.apis.internal import Api as InternalApi
 from wandb.apis.normalize import normalize_exceptions
 from wandb.errors.term import termlog
 from wandb.interface import artifacts
+from wandb.lib import filesystem
 from wandb.old.retry import retriable
 from wandb.old.summary import HTTPSummary
 import yaml
@@ -29,6 +31,9 @@ logger = logging.getLogger(__name__)
 
 # Only retry requests for 20 seconds in the public api
 RETRY_TIMEDELTA = datetime.timedelta(seconds=20)
+# artifact files opened in order fetch this many of the next ones in the background
+PREFETCH_FILES = 4
+PREFETCH_WORKERS = 8
 WANDB_INTERNAL_KEYS = {"_wandb", "wandb_version"}
 PROJECT_FRAGMENT = """fragment ProjectFragment on Project {
     id
@@ -2359,6 +2364,55 @@ class ArtifactCollection(object):
         return "<ArtifactCollection {} ({})>".format(self.name, self.type)
 
 
+_prefetch_pool = None
+
+
+class _ArtifactPrefetcher(object):
+    """Fetches the files that follow the ones read in order.
+
+    Arguments:
+        fetch: function from a file name to its path in the cache.
+        names: the names of the files, in the order they are expected to be read.
+    """
+
+    def __init__(self, fetch, names):
+        self._fetch = fetch
+        self._names = list(names)
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._pending = {}
+        self._last = None
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Returns the path of name in the cache, fetching it if needed."""
+        with self._lock:
+            result = self._pending.pop(name, None)
+            index = self._index[name]
+            if self._last is not None and index == self._last + 1:
+                start = index + 1
+                stop = start + PREFETCH_FILES
+                self._prefetch(self._names[start:stop])
+            self._last = index
+        if result is not None:
+            try:
+                return result.get()
+            except Exception:
+                # fetch it again below, so the error is raised here
+                logger.info("Prefetching %s failed", name, exc_info=True)
+        return self._fetch(name)
+
+    def _prefetch(self, names):
+        global _prefetch_pool
+        if _prefetch_pool is None:
+            import multiprocessing.dummy  # this uses threads
+
+            _prefetch_pool = multiprocessing.dummy.Pool(PREFETCH_WORKERS)
+            atexit.register(_prefetch_pool.terminate)
+        for name in names:
+            if name not in self._pending:
+                self._pending[name] = _prefetch_pool.apply_async(self._fetch, (name,))
+
+
 class Artifact(object):
     def __init__(self, client, entity, project, name, attrs=None):
         self.client = client
@@ -2380,6 +2434,7 @@ class Artifact(object):
         ]
         self._manifest = None
         self._is_downloaded = False
+        self._prefetcher = None
 
     @property
     def id(self):
@@ -2499,9 +2554,17 @@ class Artifact(object):
                 )
                 if need_copy:
                     util.mkdir_exists_ok(os.path.dirname(target_path))
-                    # We use copy2, which preserves file metadata including modified
-                    # time (which we use above to check whether we should do the copy).
-                    shutil.copy2(cache_path, target_path)
+                    # Preserve file metadata including modified time (which we
+                    # use above to check whether we should do the copy).  A
+                    # hardlink to the cache object is made read-only, so
+                    # editing the download can't change the cache.
+                    filesystem.copy_file(
+                        cache_path,
+                        target_path,
+                        env.get_artifact_cache_link(),
+                        preserve_stat=True,
+                        read_only=True,
+                    )
                 return target_path
 
             @staticmethod
@@ -2527,6 +2590,52 @@ class Artifact(object):
 
         return ArtifactEntry()
 
+    def open(self, name, mode="rb"):
+        """Open a file of the artifact without downloading the rest of it.
+
+        The file is fetched into the artifacts cache the first time it's
+        opened. When files are opened in order, the next few are fetched in
+        the background.
+
+        Args:
+            name (str): the name of the file in the artifact.
+            mode (str, optional): "rb" or "r".
+
+        Returns:
+            A file object reading the cached file.
+        """
+        if mode not in ("r", "rb"):
+            raise ValueError("Artifact files can only be opened for reading")
+        return open(self.cache_path(name), mode)
+
+    def cache_path(self, name):
+        """Fetch a file of the artifact into the artifacts cache.
+
+        The cached file must not be modified, it can be memory-mapped with
+        `mmap` or `numpy.load(path, mmap_mode="r")`.
+
+        Args:
+            name (str): the name of the file in the artifact.
+
+        Returns:
+            The path of the file in the cache.
+        """
+        manifest = self._load_manifest()
+        if name not in manifest.entries:
+            raise KeyError("Path not contained in artifact: %s" % name)
+        if self._prefetcher is None:
+            self._prefetcher = _ArtifactPrefetcher(
+                self._fetch_file, sorted(manifest.entries)
+            )
+        return self._prefetcher.get(name)
+
+    def _fetch_file(self, name):
+        manifest = self._load_manifest()
+        entry = manifest.entries[name]
+        if entry.ref is not None:
+            return manifest.storage_policy.load_reference(self, name, entry, local=True)
+        return manifest.storage_policy.load_file(self, name, entry)
+
     def download(self, root=None):
         """Download the artifact to dir specified by the <root>
 
@@ -12,6 +12,7 @@ import sys
 import wandb
 from wandb.interface import interface
 from wandb.internal.internal import wandb_internal
+from wandb.lib import ringbuffer
 
 logger = logging.getLogger("wandb")
 
@@ -47,7 +48,7 @@ class Backend(object):
         if "_early_logger" in settings:
             del settings["_early_logger"]
 
-        self.record_q = self._wl._multiprocessing.Queue()
+        self.record_q = self._make_record_queue(settings)
         self.result_q = self._wl._multiprocessing.Queue()
         self.wandb_process = self._wl._multiprocessing.Process(
             target=wandb_internal,
@@ -87,9 +88,23 @@ class Backend(object):
             main_module.__file__ = save_mod_path
 
         self.interface = interface.BackendSender(
-            process=self.wandb_process, record_q=self.record_q, result_q=self.result_q,
+            process=self.wandb_process,
+            record_q=self.record_q,
+            result_q=self.result_q,
+            batch_size=settings.get("_internal_batch_size"),
+            batch_seconds=settings.get("_internal_batch_seconds"),
         )
 
+    def _make_record_queue(self, settings):
+        if settings.get("_internal_transport") == "shm":
+            try:
+                return ringbuffer.RingBufferQueue(
+                    self._wl._multiprocessing, size=settings.get("_internal_shm_size")
+                )
+            except Exception as e:
+                logger.warning("Shared memory transport unavailable: %s", e)
+        return self._wl._multiprocessing.Queue()
+
     def server_connect(self):
         """Connect to server."""
         pass
@@ -387,6 +387,15 @@ def init(ctx, project, entity, reset):
 @click.argument("path", nargs=-1, type=click.Path(exists=True))
 @click.option("--view", is_flag=True, default=False, help="View runs", hidden=True)
 @click.option("--verbose", is_flag=True, default=False, help="Verbose", hidden=True)
+@click.option(
+    "--view-type", help="With --view, only view records of this type", hidden=True
+)
+@click.option(
+    "--view-last",
+    type=int,
+    help="With --view, only view the last N records",
+    hidden=True,
+)
 @click.option("--id", "run_id", help="The run you want to upload to.")
 @click.option("--project", "-p", help="The project you want to upload to.")
 @click.option("--entity", "-e", help="The entity to scope to.")
@@ -432,12 +441,24 @@ def init(ctx, project, entity, reset):
 )
 @click.option("--ignore", hidden=True)
 @click.option("--show", default=5, help="Number of runs to show")
+@click.option("--workers", default=1, type=int, help="Number of runs to sync at once.")
+@click.option(
+    "--use-processes",
+    is_flag=True,
+    default=False,
+    help="Sync every run in its own process instead of a thread.",
+)
+@click.option(
+    "--retries", default=1, type=int, help="Times to retry a run that fails to sync."
+)
 @display_error
 def sync(
     ctx,
     path=None,
     view=None,
     verbose=None,
+    view_type=None,
+    view_last=None,
     run_id=None,
     project=None,
     entity=None,
@@ -453,6 +474,9 @@ def sync(
     clean=None,
     clean_old_hours=24,
     clean_force=None,
+    workers=1,
+    use_processes=None,
+    retries=1,
 ):
     api = _get_cling_api()
     if api.api_key is None:
@@ -521,13 +545,27 @@ def sync(
             app_url=api.app_url,
             view=view,
             verbose=verbose,
+            view_type=view_type,
+            view_last=view_last,
+            workers=workers,
+            use_processes=use_processes,
+            retries=retries,
+            skip_synced=not include_synced,
         )
         for p in path:
             sm.add(p)
         sm.start()
         while not sm.is_done():
             _ = sm.poll()
-            # print(status)
+        if len(path) > 1:
+            wandb.termlog(sm.status())
+        if sm.failures:
+            wandb.termerror(
+                "Failed to sync {} runs: {}".format(
+                    len(sm.failures), ", ".join(f for f, _ in sm.failures)
+                )
+            )
+            sys.exit(1)
 
     def _sync_all():
         sync_items = get_runs(
@@ -1225,6 +1263,31 @@ def ls(path, type):
             )
 
 
+@artifact.group(help="Commands for interacting with the artifact cache")
+def cache():
+    pass
+
+
+@cache.command(
+    context_settings=CONTEXT,
+    help="Clean up less frequently used files from the artifacts cache",
+)
+@click.argument("target_size")
+@display_error
+def cleanup(target_size):
+    try:
+        target_size = util.from_human_size(target_size)
+    except ValueError as e:
+        raise ClickException(str(e))
+    cache = wandb_sdk.wandb_artifacts.get_artifacts_cache()
+    reclaimed_bytes = cache.cleanup(target_size)
+    wandb.termlog(
+        "Reclaimed {} of space, the cache now holds {}".format(
+            util.sizeof_fmt(reclaimed_bytes), util.sizeof_fmt(cache.size())
+        )
+    )
+
+
 @cli.command(context_settings=CONTEXT, help="Pull files from Weights & Biases")
 @click.argument("run", envvar=env.RUN_ID)
 @click.option(
@@ -13,6 +13,7 @@ import json
 import pprint
 import shutil
 from six.moves import queue
+import struct
 import warnings
 
 import numbers
@@ -51,6 +52,81 @@ def _datatypes_callback(fname):
         _glob_datatypes_callback(fname)
 # cling above
 
+# When set, expensive media encoding is deferred until the object is bound to a
+# run (or picked up by the run's media pipeline) instead of done in __init__
+_glob_deferred_encoding = False
+def _datatypes_set_deferred_encoding(deferred):
+    global _glob_deferred_encoding
+    _glob_deferred_encoding = deferred
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _HashingWriter(object):
+    """Binary file wrapper hashing everything written through it.
+
+    It deliberately has no fileno() so writers like PIL go through write().
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self._sha256.update(data)
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+
+def _write_hashed(path, write_fn, encoding=None):
+    """Create path by calling write_fn(f) and return the sha256 of the bytes written.
+
+    f is a text stream when encoding is given, a binary one otherwise.
+    """
+    with open(path, 'wb') as f:
+        writer = _HashingWriter(f)
+        write_fn(codecs.getwriter(encoding)(writer) if encoding else writer)
+    return writer.hexdigest()
+
+
+def _copy_hashed(fileobj, path):
+    """Stream a text or binary file object into path and return its sha256."""
+    chunk = fileobj.read(HASH_CHUNK_SIZE)
+
+    def copy(f):
+        f.write(chunk)
+        shutil.copyfileobj(fileobj, f, HASH_CHUNK_SIZE)
+    encoding = 'utf-8' if isinstance(chunk, six.text_type) else None
+    return _write_hashed(path, copy, encoding=encoding)
+
+
+def _hash_file(path):
+    """sha256 of the file at path, read in bounded chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _encode_media_file(encode_fn, args, path):
+    """Run a media encoder writing to path and return the file's sha256.
+
+    Encoders that write through _write_hashed return the sha256 themselves,
+    otherwise the file is hashed after the fact.  This is a module level
+    function so it can be run in a worker process.
+    """
+    sha256 = encode_fn(*(tuple(args) + (path,)))
+    if sha256 is None:
+        sha256 = _hash_file(path)
+    return sha256
+
 def wb_filename(key, step, id, extension):
     return  '{}_{}_{}{}'.format(key, step, id, extension)
 
@@ -147,18 +223,43 @@ class Media(WBValue):
         # The run under which this object is bound, if any.
         self._run = None
         self._caption = caption
+        self._encoder = None
 
-    def _set_file(self, path, is_tmp=False, extension=None):
+    def _set_file(self, path, is_tmp=False, extension=None, sha256=None):
         self._path = path
         self._is_tmp = is_tmp
         self._extension = extension
         if extension is not None and not path.endswith(extension):
             raise ValueError('Media file extension "{}" must occur at the end of path "{}".'.format(extension, path))
 
-        with open(self._path, 'rb') as f:
-            self._sha256 = hashlib.sha256(f.read()).hexdigest()
+        if sha256 is None:
+            sha256 = _hash_file(self._path)
+        self._sha256 = sha256
         self._size = os.path.getsize(self._path)
 
+    def _set_encoded_file(self, encode_fn, args, path, extension=None):
+        """Write the media file with encode_fn(*args, path), possibly later.
+
+        With deferred encoding enabled the encoder is only stored and run by
+        the media pipeline or, at the latest, when the object is bound to a run.
+        """
+        self._encoder = (encode_fn, tuple(args), path, extension)
+        if not _glob_deferred_encoding:
+            self._encode()
+
+    def _encode(self, sha256=None):
+        """Finish a pending encode, sha256 is passed if a worker already ran it."""
+        if self._encoder is None:
+            return
+        encode_fn, args, path, extension = self._encoder
+        if sha256 is None:
+            sha256 = _encode_media_file(encode_fn, args, path)
+        self._encoder = None
+        self._set_file(path, is_tmp=True, extension=extension, sha256=sha256)
+
+    def _is_encoding_deferred(self):
+        return self._encoder is not None
+
     @classmethod
     def get_media_subdir(cls):
         raise NotImplementedError
@@ -174,7 +275,7 @@ class Media(WBValue):
         return self._run is not None
 
     def file_is_set(self):
-        return self._path is not None
+        return self._path is not None or self._encoder is not None
 
     def bind_to_run(self, run, key, step, id_=None):
         """Bind this object to a particular Run.
@@ -183,6 +284,7 @@ class Media(WBValue):
         put the file associated with this object, from which other Runs can
         refer to it.
         """
+        self._encode()
         if not self.file_is_set():
             raise AssertionError('bind_to_run called before _set_file')
         if run is None:
@@ -268,13 +370,38 @@ class Table(Media):
         """
         super(Table, self).__init__()
         self.columns = columns
-        self.data = list(rows or data or [])
+        # DataFrames and 2D numpy arrays are kept as one array per column and
+        # only turned into rows if the rows are accessed
+        self._column_data = None
+        self._data = None
         if dataframe is not None:
             assert util.is_pandas_data_frame(dataframe), 'dataframe argument expects a `Dataframe` object'
             self.columns = list(dataframe.columns)
-            self.data = []
-            for row in range(len(dataframe)):
-                self.add_data(*tuple(dataframe[col].values[row] for col in self.columns))
+            self._column_data = [dataframe[col].values for col in self.columns]
+        elif util.is_numpy_array(data) and data.ndim == 2:
+            if data.shape[1] != len(self.columns):
+                raise ValueError("This table expects {} columns: {}".format(
+                    len(self.columns), self.columns))
+            self._column_data = [data[:, i] for i in range(data.shape[1])]
+        else:
+            self._data = list(rows or data or [])
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = [list(row) for row in zip(*self._column_data)]
+            self._column_data = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = list(data)
+        self._column_data = None
+
+    def _num_rows(self):
+        if self._column_data is not None:
+            return len(self._column_data[0]) if self._column_data else 0
+        return len(self._data)
 
     def add_row(self, *row):
         logging.warning("add_row is deprecated, use add_data")
@@ -288,16 +415,21 @@ class Table(Media):
 
     def _to_table_json(self):
         # seperate method for testing
-        if len(self.data) > Table.MAX_ROWS:
+        if self._num_rows() > Table.MAX_ROWS:
             logging.warn("Truncating wandb.Table object to %i rows." % Table.MAX_ROWS)
-        return {"columns": self.columns, "data": self.data[:Table.MAX_ROWS]}
+        if self._column_data is not None:
+            columns = [_column_to_list(col[:Table.MAX_ROWS]) for col in self._column_data]
+            data = [list(row) for row in zip(*columns)]
+        else:
+            data = numpy_arrays_to_lists(self._data[:Table.MAX_ROWS])
+        return {"columns": self.columns, "data": data}
 
     def bind_to_run(self, *args, **kwargs):
         data = self._to_table_json()
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.table.json')
-        data = numpy_arrays_to_lists(data)
-        util.json_dump_safer(data, codecs.open(tmp_path, 'w', encoding='utf-8'))
-        self._set_file(tmp_path, is_tmp=True, extension='.table.json')
+        sha256 = _write_hashed(
+            tmp_path, lambda f: util.json_dump_safer(data, f), encoding='utf-8')
+        self._set_file(tmp_path, is_tmp=True, extension='.table.json', sha256=sha256)
         super(Table, self).bind_to_run(*args, **kwargs)
 
     @classmethod
@@ -308,10 +440,18 @@ class Table(Media):
         json_dict = super(Table, self).to_json(run)
         json_dict['_type'] = 'table-file'
         json_dict['ncols'] = len(self.columns)
-        json_dict['nrows'] = len(self.data)
+        json_dict['nrows'] = self._num_rows()
         return json_dict
 
 
+def _column_to_list(column):
+    """Convert a numpy column to python values with a single tolist() when the
+    dtype allows it, falling back to converting each cell."""
+    if column.dtype.kind in 'biufU':
+        return column.tolist()
+    return numpy_arrays_to_lists(list(column))
+
+
 class Audio(BatchableMedia):
     """
         Wandb class for audio clips.
@@ -342,6 +482,8 @@ class Audio(BatchableMedia):
                 "soundfile", required='Raw audio requires the soundfile package. To get it, run "pip install soundfile"')
 
             tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.wav')
+            # soundfile seeks back to patch the header, so the file is
+            # hashed in chunks after it is written
             soundfile.write(tmp_path, data_or_path, sample_rate)
             self._duration = len(data_or_path) / float(sample_rate)
 
@@ -408,6 +550,106 @@ def is_numpy_array(data):
     return isinstance(data, np.ndarray)
 
 
+# Binary point clouds (.pts.bin) start with POINT_CLOUD_MAGIC, the uint32 length of
+# a JSON header describing the columns, padding to 8 bytes, then one contiguous
+# little-endian block per column in header order.
+POINT_CLOUD_MAGIC = b'WBPC'
+POINT_CLOUD_VERSION = 1
+_POINT_CLOUD_ALIGN = 8
+
+
+def _point_cloud_columns(data, quantize=False):
+    """Split an nx3, nx4 or nx6 point array into (name, contiguous array) columns."""
+    np = util.get_module("numpy")
+    columns = [('position', np.ascontiguousarray(data[:, :3], dtype='<f2' if quantize else '<f4'))]
+    if data.shape[1] == 4:
+        columns.append(('category', np.ascontiguousarray(data[:, 3], dtype='u1')))
+    elif data.shape[1] == 6:
+        columns.append(('color', np.ascontiguousarray(data[:, 3:], dtype='u1')))
+    return columns
+
+
+def _write_point_cloud(data, path, quantize=False):
+    """Write a numpy point cloud in the binary format, returning its sha256."""
+    columns = _point_cloud_columns(data, quantize)
+    header = json.dumps({
+        'version': POINT_CLOUD_VERSION,
+        'points': len(data),
+        'columns': [{'name': name, 'dtype': arr.dtype.str, 'width': 1 if arr.ndim == 1 else arr.shape[1]}
+                    for name, arr in columns],
+    }, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    prefix = POINT_CLOUD_MAGIC + struct.pack('<I', len(header)) + header
+    prefix += b' ' * (-len(prefix) % _POINT_CLOUD_ALIGN)
+
+    def write(f):
+        f.write(prefix)
+        for _, arr in columns:
+            f.write(arr.data)
+    return _write_hashed(path, write)
+
+
+def _read_point_cloud(path):
+    """Read a binary point cloud back into a dict of column name to numpy array."""
+    np = util.get_module("numpy")
+    with open(path, 'rb') as f:
+        if f.read(len(POINT_CLOUD_MAGIC)) != POINT_CLOUD_MAGIC:
+            raise ValueError('{} is not a binary point cloud'.format(path))
+        header_len, = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        f.seek(-(len(POINT_CLOUD_MAGIC) + 4 + header_len) % _POINT_CLOUD_ALIGN, os.SEEK_CUR)
+        columns = {}
+        for column in header['columns']:
+            count = header['points'] * column['width']
+            arr = np.fromfile(f, dtype=column['dtype'], count=count)
+            columns[column['name']] = arr.reshape(-1, column['width']) if column['width'] > 1 else arr
+    return columns
+
+
+def _voxel_downsample(data, max_points, iterations=6):
+    """Keep the first point of every occupied voxel, with the voxel size chosen
+    so that at most max_points (but as close to it as possible) remain."""
+    np = util.get_module("numpy")
+    if len(data) <= max_points:
+        return data
+    xyz = data[:, :3].astype('float64')
+    lo = xyz.min(axis=0)
+    extent = xyz.max(axis=0) - lo
+
+    def sample(voxel):
+        cells = np.floor((xyz - lo) / voxel).astype('int64')
+        dims = cells.max(axis=0) + 1
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        return np.sort(np.unique(keys, return_index=True)[1])
+
+    # start from max_points cubic voxels over the largest extent and bracket
+    # the voxel size between one too small and one small enough
+    size = max(float(extent.max()), 1e-9)
+    high = size / max_points ** (1.0 / 3)
+    keep = sample(high)
+    while len(keep) > max_points:
+        high *= 2
+        keep = sample(high)
+    # clouds with max_points or fewer distinct locations never get too many
+    # points, so stop halving before the voxel keys can overflow
+    min_voxel = size / 2 ** 20
+    while True:
+        if high / 2 < min_voxel:
+            return data[keep]
+        candidate = sample(high / 2)
+        if len(candidate) > max_points:
+            break
+        high, keep = high / 2, candidate
+    low = high / 2
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        candidate = sample(mid)
+        if len(candidate) > max_points:
+            low = mid
+        else:
+            high, keep = mid, candidate
+    return data[keep]
+
+
 class Object3D(BatchableMedia):
     """
         Wandb class for 3D point clouds.
@@ -426,6 +668,12 @@ class Object3D(BatchableMedia):
                 [x y z r g b], ...] nx4 where is rgb is color
                 ```
 
+                Numpy arrays are stored in a compact binary format (float32 positions
+                and uint8 categories or colors).  These keyword arguments apply to them:
+                    point_format: "binary" (default) or "json" for the older `.pts.json` files.
+                    quantize: store binary positions as float16.
+                    max_points: voxel downsample clouds with more points than this.
+
     """
 
     SUPPORTED_TYPES = set(['obj', 'gltf', 'babylon', 'stl'])
@@ -440,7 +688,6 @@ class Object3D(BatchableMedia):
         if hasattr(data_or_path, 'read'):
             if hasattr(data_or_path, 'seek'):
                 data_or_path.seek(0)
-            object3D = data_or_path.read()
 
             extension = kwargs.pop("file_type", None)
             if extension == None:
@@ -451,10 +698,9 @@ class Object3D(BatchableMedia):
                                  ", ".join(Object3D.SUPPORTED_TYPES))
 
             tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.' + extension)
-            with open(tmp_path, "w") as f:
-                f.write(object3D)
+            sha256 = _copy_hashed(data_or_path, tmp_path)
 
-            self._set_file(tmp_path, is_tmp=True)
+            self._set_file(tmp_path, is_tmp=True, sha256=sha256)
         elif isinstance(data_or_path, six.string_types):
             path = data_or_path
             try:
@@ -480,9 +726,11 @@ class Object3D(BatchableMedia):
                 raise ValueError("Type not supported, only 'lidar/beta' is currently supported")
 
             tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.pts.json')
-            json.dump(data, codecs.open(tmp_path, 'w', encoding='utf-8'),
-                      separators=(',', ':'), sort_keys=True, indent=4)
-            self._set_file(tmp_path, is_tmp=True, extension='.pts.json')
+            sha256 = _write_hashed(
+                tmp_path,
+                lambda f: json.dump(data, f, separators=(',', ':'), sort_keys=True, indent=4),
+                encoding='utf-8')
+            self._set_file(tmp_path, is_tmp=True, extension='.pts.json', sha256=sha256)
         elif is_numpy_array(data_or_path):
             data = data_or_path
 
@@ -492,11 +740,24 @@ class Object3D(BatchableMedia):
                                      [x y z c],     ...] nx4 where c is a category with supported range [1, 14]
                                      [x y z r g b], ...] nx4 where is rgb is color""")
 
-            data = data.tolist()
-            tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.pts.json')
-            json.dump(data, codecs.open(tmp_path, 'w', encoding='utf-8'),
-                      separators=(',', ':'), sort_keys=True, indent=4)
-            self._set_file(tmp_path, is_tmp=True, extension='.pts.json')
+            max_points = kwargs.pop("max_points", None)
+            if max_points is not None:
+                if max_points < 1:
+                    raise ValueError("max_points must be at least 1")
+                data = _voxel_downsample(data, max_points)
+
+            if kwargs.pop("point_format", "binary") == "json":
+                data = data.tolist()
+                tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.pts.json')
+                sha256 = _write_hashed(
+                    tmp_path,
+                    lambda f: json.dump(data, f, separators=(',', ':'), sort_keys=True, indent=4),
+                    encoding='utf-8')
+                self._set_file(tmp_path, is_tmp=True, extension='.pts.json', sha256=sha256)
+            else:
+                tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.pts.bin')
+                sha256 = _write_point_cloud(data, tmp_path, quantize=kwargs.pop("quantize", False))
+                self._set_file(tmp_path, is_tmp=True, extension='.pts.bin', sha256=sha256)
         else:
             raise ValueError("data must be a numpy array, dict or a file object")
 
@@ -550,7 +811,6 @@ class Molecule(BatchableMedia):
         if hasattr(data_or_path, 'read'):
             if hasattr(data_or_path, 'seek'):
                 data_or_path.seek(0)
-            molecule = data_or_path.read()
 
             extension = kwargs.pop("file_type", None)
             if extension == None:
@@ -561,10 +821,9 @@ class Molecule(BatchableMedia):
                                  ", ".join(Molecule.SUPPORTED_TYPES))
 
             tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.' + extension)
-            with open(tmp_path, "w") as f:
-                f.write(molecule)
+            sha256 = _copy_hashed(data_or_path, tmp_path)
 
-            self._set_file(tmp_path, is_tmp=True)
+            self._set_file(tmp_path, is_tmp=True, sha256=sha256)
         elif isinstance(data_or_path, six.string_types):
             path = data_or_path
             try:
@@ -636,10 +895,10 @@ class Html(BatchableMedia):
             self.inject_head()
 
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.html')
-        with open(tmp_path, 'w') as out:
-            print(self.html, file=out)
+        sha256 = _write_hashed(
+            tmp_path, lambda out: print(self.html, file=out), encoding='utf-8')
 
-        self._set_file(tmp_path, is_tmp=True)
+        self._set_file(tmp_path, is_tmp=True, sha256=sha256)
 
     def inject_head(self):
         join = ""
@@ -713,9 +972,8 @@ class Video(BatchableMedia):
 
         if isinstance(data_or_path, six.BytesIO):
             filename = os.path.join(MEDIA_TMP.name, util.generate_id() + '.'+ self._format)
-            with open(filename, "wb") as f:
-                f.write(data_or_path.read())
-            self._set_file(filename, is_tmp=True)
+            sha256 = _copy_hashed(data_or_path, filename)
+            self._set_file(filename, is_tmp=True, sha256=sha256)
         elif isinstance(data_or_path, six.string_types):
             _, ext = os.path.splitext(data_or_path)
             ext = ext[1:].lower()
@@ -733,26 +991,13 @@ class Video(BatchableMedia):
             self.encode()
 
     def encode(self):
-        mpy = util.get_module(
+        util.get_module(
             "moviepy.editor", required='wandb.Video requires moviepy and imageio when passing raw data.  Install with "pip install moviepy imageio"')
         tensor = self._prepare_video(self.data)
         _, self._height, self._width, self._channels = tensor.shape
 
-        # encode sequence of images into gif string
-        clip = mpy.ImageSequenceClip(list(tensor), fps=self._fps)
-
         filename = os.path.join(MEDIA_TMP.name, util.generate_id() + '.'+ self._format)
-        try:  # older version of moviepy does not support progress_bar argument.
-            if self._format == "gif":
-                clip.write_gif(filename, verbose=False, progress_bar=False)
-            else:
-                clip.write_videofile(filename, verbose=False, progress_bar=False)
-        except TypeError:
-            if self._format == "gif":
-                clip.write_gif(filename, verbose=False)
-            else:
-                clip.write_videofile(filename, verbose=False)
-        self._set_file(filename, is_tmp=True)
+        self._set_encoded_file(_write_video, (tensor, self._fps, self._format), filename)
 
     @classmethod
     def get_media_subdir(cls):
@@ -823,6 +1068,29 @@ class Video(BatchableMedia):
             return False
 
 
+def _write_video(tensor, fps, format, filename):
+    mpy = util.get_module("moviepy.editor")
+
+    # encode sequence of images into gif string
+    clip = mpy.ImageSequenceClip(list(tensor), fps=fps)
+
+    try:  # older version of moviepy does not support progress_bar argument.
+        if format == "gif":
+            clip.write_gif(filename, verbose=False, progress_bar=False)
+        else:
+            clip.write_videofile(filename, verbose=False, progress_bar=False)
+    except TypeError:
+        if format == "gif":
+            clip.write_gif(filename, verbose=False)
+        else:
+            clip.write_videofile(filename, verbose=False)
+
+
+def _write_image(image, filename):
+    return _write_hashed(
+        filename, lambda f: image.save(f, format='PNG', transparency=None))
+
+
 class Image(BatchableMedia):
     """
         Wandb class for images.
@@ -907,8 +1175,7 @@ class Image(BatchableMedia):
             tmp_path = os.path.join(
                 MEDIA_TMP.name, util.generate_id() + '.png')
             self.format = "png"
-            self._image.save(tmp_path, transparency=None)
-            self._set_file(tmp_path, is_tmp=True)
+            self._set_encoded_file(_write_image, (self._image,), tmp_path)
 
         self._width, self._height = self._image.size
 
@@ -1095,8 +1362,9 @@ class JSONMetadata(Media):
 
         ext = "." + self.type_name() + ".json"
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + ext)
-        util.json_dump_uncompressed(self._val, codecs.open(tmp_path, 'w', encoding='utf-8'))
-        self._set_file(tmp_path, is_tmp=True, extension=ext)
+        sha256 = _write_hashed(
+            tmp_path, lambda f: util.json_dump_uncompressed(self._val, f), encoding='utf-8')
+        self._set_file(tmp_path, is_tmp=True, extension=ext, sha256=sha256)
 
     def get_media_subdir(self):
         return os.path.join('media', 'metadata', self.type_name())
@@ -1219,8 +1487,8 @@ class ImageMask(Media):
             "PIL.Image", required='wandb.Image needs the PIL package. To get it, run "pip install pillow".')
         image = PILImage.fromarray(val["mask_data"].astype(np.int8), mode="L")
 
-        image.save(tmp_path, transparency=None)
-        self._set_file(tmp_path, is_tmp=True, extension=ext)
+        sha256 = _write_image(image, tmp_path)
+        self._set_file(tmp_path, is_tmp=True, extension=ext, sha256=sha256)
 
     def bind_to_run(self, run, key, step, id_=None):
         # bind_to_run key argument is the Image parent key
@@ -1295,8 +1563,9 @@ class Plotly(Media):
 
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.plotly.json')
         val = numpy_arrays_to_lists(val.to_plotly_json())
-        util.json_dump_safer(val, codecs.open(tmp_path, 'w', encoding='utf-8'))
-        self._set_file(tmp_path, is_tmp=True, extension='.plotly.json')
+        sha256 = _write_hashed(
+            tmp_path, lambda f: util.json_dump_safer(val, f), encoding='utf-8')
+        self._set_file(tmp_path, is_tmp=True, extension='.plotly.json', sha256=sha256)
 
     def get_media_subdir(self):
         return os.path.join('media', 'plotly')
@@ -1351,8 +1620,9 @@ class Graph(Media):
         data = self._to_graph_json()
         tmp_path = os.path.join(MEDIA_TMP.name, util.generate_id() + '.graph.json')
         data = numpy_arrays_to_lists(data)
-        util.json_dump_safer(data, codecs.open(tmp_path, 'w', encoding='utf-8'))
-        self._set_file(tmp_path, is_tmp=True, extension='.graph.json')
+        sha256 = _write_hashed(
+            tmp_path, lambda f: util.json_dump_safer(data, f), encoding='utf-8')
+        self._set_file(tmp_path, is_tmp=True, extension='.graph.json', sha256=sha256)
         if self.is_bound():
             return
         super(Graph, self).bind_to_run(*args, **kwargs)
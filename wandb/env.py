@@ -42,6 +42,7 @@ RUN_GROUP = 'WANDB_RUN_GROUP'
 RUN_DIR = 'WANDB_RUN_DIR'
 SWEEP_ID = 'WANDB_SWEEP_ID'
 HTTP_TIMEOUT = 'WANDB_HTTP_TIMEOUT'
+UPLOAD_PART_SIZE = 'WANDB_UPLOAD_PART_SIZE'
 API_KEY = 'WANDB_API_KEY'
 JOB_TYPE = 'WANDB_JOB_TYPE'
 DISABLE_CODE = 'WANDB_DISABLE_CODE'
@@ -60,6 +61,8 @@ ANONYMOUS = 'WANDB_ANONYMOUS'
 JUPYTER = 'WANDB_JUPYTER'
 CONFIG_DIR = 'WANDB_CONFIG_DIR'
 CACHE_DIR = 'WANDB_CACHE_DIR'
+ARTIFACT_CACHE_MAX_SIZE = 'WANDB_ARTIFACT_CACHE_MAX_SIZE'
+ARTIFACT_CACHE_LINK = 'WANDB_ARTIFACT_CACHE_LINK'
 
 # For testing, to be removed in future version
 USE_V1_ARTIFACTS = '_WANDB_USE_V1_ARTIFACTS'
@@ -133,6 +136,14 @@ def get_http_timeout(default=10, env=None):
     return int(env.get(HTTP_TIMEOUT, default))
 
 
+def get_upload_part_size(default=None, env=None):
+    if env is None:
+        env = os.environ
+
+    val = env.get(UPLOAD_PART_SIZE, default)
+    return int(val) if val else None
+
+
 def get_ignore(default=None, env=None):
     if env is None:
         env = os.environ
@@ -259,6 +270,18 @@ def get_cache_dir(env=None):
     return val
 
 
+def get_artifact_cache_max_size(default=None, env=None):
+    if env is None:
+        env = os.environ
+    return env.get(ARTIFACT_CACHE_MAX_SIZE, default)
+
+
+def get_artifact_cache_link(default="reflink", env=None):
+    if env is None:
+        env = os.environ
+    return env.get(ARTIFACT_CACHE_LINK, default)
+
+
 def get_use_v1_artifacts(env=None):
     if env is None:
         env = os.environ
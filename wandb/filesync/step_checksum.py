@@ -7,16 +7,21 @@ import threading
 import wandb.util
 
 from wandb.filesync import step_upload
+from wandb.lib import digest_cache
 
 
 RequestUpload = collections.namedtuple(
     'RequestUpload', ('path', 'save_name', 'artifact_id', 'copy', 'use_prepare_flow', 'save_fn', 'digest'))
 RequestStoreManifestFiles = collections.namedtuple(
-    'RequestStoreManifestFiles', ('manifest', 'artifact_id', 'save_fn'))
+    'RequestStoreManifestFiles', ('manifest', 'artifact_id', 'save_fn', 'entries'))
 RequestCommitArtifact = collections.namedtuple(
     'RequestCommitArtifact', ('artifact_id', 'before_commit', 'on_commit'))
 RequestFinish = collections.namedtuple('RequestFinish', ())
 
+# Manifest entries are read as they are queued for upload, at most this many
+# wait for an upload at a time.
+MAX_PENDING_MANIFEST_FILES = 10000
+
     
 class StepChecksum(object):
     def __init__(self, api, tempdir, request_queue, output_queue, stats):
@@ -25,6 +30,7 @@ class StepChecksum(object):
         self._request_queue = request_queue
         self._output_queue = output_queue
         self._stats = stats
+        self._manifest_file_slots = threading.Semaphore(MAX_PENDING_MANIFEST_FILES)
 
         self._thread = threading.Thread(target=self._thread_body)
         self._thread.daemon = True
@@ -46,18 +52,31 @@ class StepChecksum(object):
                     # "prepare" file upload flow, in which we prepare the files in
                     # the database before uploading them. This is currently only
                     # used for artifact manifests
-                    checksum = wandb.util.md5_file(path)
+                    if req.copy:
+                        # a fresh copy, the digest cache can't know it
+                        checksum = wandb.util.md5_file(path)
+                    else:
+                        checksum = digest_cache.md5_file_b64(path)
                 self._stats.init_file(req.save_name, os.path.getsize(path))
                 self._output_queue.put(
                     step_upload.RequestUpload(
                         path, req.save_name, req.artifact_id, checksum, req.copy,
                         req.save_fn, req.digest))
             elif isinstance(req, RequestStoreManifestFiles):
-                for entry in req.manifest.entries.values():
+                entries = req.entries
+                if entries is None:
+                    entries = req.manifest.entries.values()
+                for entry in entries:
                     if entry.local_path:
+                        self._manifest_file_slots.acquire()
                         # This stupid thing is needed so the closure works correctly.
                         def make_save_fn_with_entry(save_fn, entry):
-                            return lambda progress_callback: save_fn(entry, progress_callback)
+                            def fn(progress_callback):
+                                try:
+                                    return save_fn(entry, progress_callback)
+                                finally:
+                                    self._manifest_file_slots.release()
+                            return fn
                         self._stats.init_file(entry.local_path, entry.size, is_artifact_file=True)
                         self._output_queue.put(
                             step_upload.RequestUpload(
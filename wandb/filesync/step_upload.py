@@ -1,6 +1,7 @@
 """Batching file prepare requests to our API."""
 
 import collections
+import logging
 import threading
 from six.moves import queue
 
@@ -16,6 +17,16 @@ RequestCommitArtifact = collections.namedtuple(
 RequestFinish = collections.namedtuple('RequestFinish', ())
 
 
+# While both lanes have pending uploads, every BULK_INTERVAL'th upload started
+# comes from the bulk lane so it is never starved.
+BULK_INTERVAL = 4
+
+LANE_PRIORITY = 0
+LANE_BULK = 1
+
+logger = logging.getLogger(__name__)
+
+
 class StepUpload(object):
     def __init__(self, api, stats, event_queue, max_jobs):
         self._api = api
@@ -26,9 +37,18 @@ class StepUpload(object):
         self._thread = threading.Thread(target=self._thread_body)
         self._thread.daemon = True
 
+        # Worker threads are started as needed, up to max_jobs, and pull
+        # upload jobs from the job queue until they get None.
+        self._workers = []
+        self._job_queue = queue.Queue()
+
         # Indexed by files' `save_name`'s, which are their ID's in the Run.
         self._running_jobs = {}
-        self._pending_jobs = []
+        # Uploads waiting for a free worker, one deque per lane.
+        self._pending_jobs = (collections.deque(), collections.deque())
+        # Uploads waiting for an upload of the same file to finish.
+        self._blocked_jobs = {}
+        self._started_count = 0
 
         self._artifacts = {}
 
@@ -61,10 +81,25 @@ class StepUpload(object):
                 # Queue was empty and no jobs left.
                 break
 
+        for _ in self._workers:
+            self._job_queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _worker_body(self):
+        while True:
+            job = self._job_queue.get()
+            if job is None:
+                break
+            try:
+                job.run()
+            except Exception:
+                # The job has already reported itself done
+                logger.exception("Upload job failed: %s", job.save_path)
+
     def _handle_event(self, event):
         if isinstance(event, upload_job.EventJobDone):
             job = event.job
-            job.join()
             if job.artifact_id:
                 if event.success:
                     self._artifacts[job.artifact_id]['pending_count'] -= 1
@@ -72,10 +107,14 @@ class StepUpload(object):
                 else:
                     termerror('Uploading artifact file failed. Artifact won\'t be committed.')
             self._running_jobs.pop(job.save_name)
-            # If we have any pending jobs, start one now
-            if self._pending_jobs:
-                event = self._pending_jobs.pop(0)
+            # The next upload of this file takes over the worker
+            blocked = self._blocked_jobs.get(job.save_name)
+            if blocked:
+                event = blocked.popleft()
+                if not blocked:
+                    del self._blocked_jobs[job.save_name]
                 self._start_upload_job(event)
+            self._start_pending_jobs()
         elif isinstance(event, RequestCommitArtifact):
             if event.artifact_id not in self._artifacts:
                 self._init_artifact(event.artifact_id)
@@ -90,22 +129,48 @@ class StepUpload(object):
                 if event.artifact_id not in self._artifacts:
                     self._init_artifact(event.artifact_id)
                 self._artifacts[event.artifact_id]['pending_count'] += 1
-            if len(self._running_jobs) == self._max_jobs:
-                self._pending_jobs.append(event)
-            else:
-                self._start_upload_job(event)
+            self._lane(event).append(event)
+            self._start_pending_jobs()
         else:
             raise Exception('Programming error: unhandled event: %s' % str(event))
 
+    def _lane(self, event):
+        # Run files (wandb metadata, config, summary, user files) go in the
+        # priority lane so they aren't stuck behind large artifact uploads.
+        # All uploads of a file share a lane, which keeps them in order.
+        if event.artifact_id is None:
+            return self._pending_jobs[LANE_PRIORITY]
+        return self._pending_jobs[LANE_BULK]
+
+    def _next_pending_job(self):
+        priority, bulk = self._pending_jobs
+        if bulk and (not priority or
+                     self._started_count % BULK_INTERVAL == BULK_INTERVAL - 1):
+            lane = bulk
+        elif priority:
+            lane = priority
+        else:
+            return None
+        self._started_count += 1
+        return lane.popleft()
+
+    def _start_pending_jobs(self):
+        while len(self._running_jobs) < self._max_jobs:
+            event = self._next_pending_job()
+            if event is None:
+                break
+            self._start_upload_job(event)
+
     def _start_upload_job(self, event):
         if not isinstance(event, RequestUpload):
             raise Exception('Programming error: invalid event')
 
         # Operations on a single backend file must be serialized. if
-        # we're already uploading this file, put the event on the
-        # end of the queue
+        # we're already uploading this file, hold the event until that
+        # upload is done
         if event.save_name in self._running_jobs:
-            self._pending_jobs.append(event)
+            self._blocked_jobs.setdefault(
+                event.save_name, collections.deque()).append(event)
             return
 
         # Start it.
@@ -114,7 +179,13 @@ class StepUpload(object):
             event.save_name, event.path, event.artifact_id, event.md5, event.copied,
             event.save_fn, event.digest)
         self._running_jobs[event.save_name] = job
-        job.start()
+        if len(self._workers) < len(self._running_jobs):
+            worker = threading.Thread(target=self._worker_body)
+            worker.name = 'UploadWorker-%d' % len(self._workers)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+        self._job_queue.put(job)
 
     def _init_artifact(self, artifact_id):
         self._artifacts[artifact_id] = {
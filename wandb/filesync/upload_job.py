@@ -1,7 +1,6 @@
 import collections
 import os
 import logging
-import threading
 
 import wandb
 
@@ -9,9 +8,9 @@ EventJobDone = collections.namedtuple('EventJobDone', ('job', 'success'))
 logger = logging.getLogger(__file__)
 
 
-class UploadJob(threading.Thread):
+class UploadJob(object):
     def __init__(self, done_queue, stats, api, save_name, path, artifact_id, md5, copied, save_fn, digest):
-        """A file upload thread.
+        """A file upload, run by one of StepUpload's worker threads.
 
         Arguments:
             done_queue: queue.Queue in which to put an EventJobDone event when
@@ -32,7 +31,6 @@ class UploadJob(threading.Thread):
         self.copied = copied
         self.save_fn = save_fn
         self.digest = digest
-        super(UploadJob, self).__init__()
 
     def run(self):
         success = False
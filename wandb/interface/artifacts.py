@@ -50,9 +50,19 @@ class ArtifactManifest(object):
         self.storage_policy = storage_policy
         self.entries = entries or {}
 
+    @classmethod
+    def read_contents(cls, path):
+        raise NotImplementedError()
+
     def to_manifest_json(self):
         raise NotImplementedError()
 
+    def write_manifest_json(self, fp, entries=None):
+        raise NotImplementedError()
+
+    def write_contents(self, fp):
+        raise NotImplementedError()
+
     def digest(self):
         raise NotImplementedError()
 
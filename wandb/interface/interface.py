@@ -7,7 +7,9 @@ Manage backend sender.
 
 import json
 import logging
+import os
 import threading
+import time
 import uuid
 
 import six
@@ -21,11 +23,18 @@ from wandb.util import (
     json_dumps_safer_history,
     json_friendly,
     maybe_compress_summary,
+    mkdir_exists_ok,
     WandBJSONEncoderOld,
 )
 
 logger = logging.getLogger("wandb")
 
+# Artifact manifests with more entries than this are written to a file in
+# MANIFEST_FILE_DIR of the run's sync directory, which is passed to the
+# internal process instead of the entries
+MANIFEST_FILE_ENTRIES = 10000
+MANIFEST_FILE_DIR = "artifacts"
+
 
 def file_policy_to_enum(policy):
     if policy == "now":
@@ -110,21 +119,95 @@ class MessageRouter(object):
         future._set_object(msg)
 
 
+class RecordBatcher(object):
+    """Coalesce records into RecordBatch messages before queueing them.
+
+    Each put on a multiprocessing queue costs a pickle, a pipe write and a
+    feeder thread wakeup, so records are accumulated and sent together once
+    the batch is full (by count or size) or max_seconds have passed.
+    """
+
+    MAX_BYTES = 1024 * 1024
+
+    def __init__(self, record_q, max_records, max_seconds):
+        self._record_q = record_q
+        self._max_records = max_records
+        self._max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._batch = wandb_internal_pb2.RecordBatch()
+        self._batch_bytes = 0
+        self._batch_time = None
+
+        self._join_event = threading.Event()
+        self._thread = threading.Thread(target=self.flush_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, record):
+        with self._lock:
+            if not self._batch.record:
+                self._batch_time = time.time()
+            self._batch.record.add().CopyFrom(record)
+            self._batch_bytes += record.ByteSize()
+            if (
+                len(self._batch.record) >= self._max_records
+                or self._batch_bytes >= self.MAX_BYTES
+            ):
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch.record:
+            return
+        batch = self._batch
+        self._batch = wandb_internal_pb2.RecordBatch()
+        self._batch_bytes = 0
+        self._batch_time = None
+        self._record_q.put(batch)
+
+    def flush_loop(self):
+        while not self._join_event.wait(self._max_seconds):
+            with self._lock:
+                if (
+                    self._batch_time is not None
+                    and time.time() - self._batch_time >= self._max_seconds
+                ):
+                    self._flush()
+
+    def join(self):
+        self._join_event.set()
+        self._thread.join()
+        self.flush()
+
+
 class BackendSender(object):
     class ExceptionTimeout(Exception):
         pass
 
     def __init__(
-        self, record_q=None, result_q=None, process=None,
+        self,
+        record_q=None,
+        result_q=None,
+        process=None,
+        batch_size=None,
+        batch_seconds=None,
     ):
         self.record_q = record_q
         self.result_q = result_q
         self._process = process
         self._run = None
         self._router = None
+        self._batcher = None
 
         if record_q and result_q:
             self._router = MessageRouter(record_q, result_q)
+        if record_q and batch_size and batch_size > 1:
+            self._batcher = RecordBatcher(
+                record_q, max_records=batch_size, max_seconds=batch_seconds or 0.25
+            )
 
     def _hack_set_run(self, run):
         self._run = run
@@ -180,7 +263,7 @@ class BackendSender(object):
             self._make_config(config_dict, obj=proto_run.config)
         return proto_run
 
-    def _make_artifact(self, artifact):
+    def _make_artifact(self, artifact, sync_dir=None):
         proto_artifact = wandb_internal_pb2.ArtifactRecord()
         proto_artifact.type = artifact.type
         proto_artifact.name = artifact.name
@@ -189,10 +272,12 @@ class BackendSender(object):
             proto_artifact.description = artifact.description
         if artifact.metadata:
             proto_artifact.metadata = json.dumps(artifact.metadata)
-        self._make_artifact_manifest(artifact.manifest, obj=proto_artifact.manifest)
+        self._make_artifact_manifest(
+            artifact.manifest, obj=proto_artifact.manifest, sync_dir=sync_dir
+        )
         return proto_artifact
 
-    def _make_artifact_manifest(self, artifact_manifest, obj=None):
+    def _make_artifact_manifest(self, artifact_manifest, obj=None, sync_dir=None):
         proto_manifest = obj or wandb_internal_pb2.ArtifactManifest()
         proto_manifest.version = artifact_manifest.version()
         proto_manifest.storage_policy = artifact_manifest.storage_policy.name()
@@ -202,6 +287,19 @@ class BackendSender(object):
             cfg.key = k
             cfg.value_json = json.dumps(v)
 
+        if (
+            sync_dir is not None
+            and len(artifact_manifest.entries) > MANIFEST_FILE_ENTRIES
+        ):
+            # relative to the sync directory, which may be moved before the
+            # run is synced
+            path = os.path.join(MANIFEST_FILE_DIR, "%s.jsonl" % uuid.uuid4().hex)
+            mkdir_exists_ok(os.path.join(sync_dir, MANIFEST_FILE_DIR))
+            with open(os.path.join(sync_dir, path), "w") as f:
+                artifact_manifest.write_contents(f)
+            proto_manifest.manifest_file_path = path
+            return proto_manifest
+
         for entry in sorted(artifact_manifest.entries.values(), key=lambda k: k.path):
             proto_entry = proto_manifest.contents.add()
             proto_entry.path = entry.path
@@ -429,10 +527,16 @@ class BackendSender(object):
             raise Exception("The wandb backend process has shutdown")
         if local:
             record.control.local = local
+        if self._batcher:
+            self._batcher.put(record)
+            return
         self.record_q.put(record)
 
     def _communicate(self, rec, timeout=5, local=None):
         assert self._router
+        # requests bypass the batcher, make sure earlier records go first
+        if self._batcher:
+            self._batcher.flush()
         future = self._router.send_and_receive(rec, local=local)
         return future.get(timeout)
 
@@ -546,7 +650,7 @@ class BackendSender(object):
         self, run, artifact, aliases, is_user_created=False, use_after_commit=False
     ):
         proto_run = self._make_run(run)
-        proto_artifact = self._make_artifact(artifact)
+        proto_artifact = self._make_artifact(artifact, sync_dir=run._settings._sync_dir)
         proto_artifact.run_id = proto_run.run_id
         proto_artifact.project = proto_run.project
         proto_artifact.entity = proto_run.entity
@@ -632,5 +736,7 @@ class BackendSender(object):
         record = self._make_record(request=request)
         _ = self._communicate(record)
 
+        if self._batcher:
+            self._batcher.join()
         if self._router:
             self._router.join()
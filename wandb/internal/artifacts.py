@@ -1,11 +1,17 @@
 import json
+import logging
 import os
 import tempfile
 
+import wandb
 from wandb.interface.artifacts import ArtifactManifest
+from wandb.interface.interface import MANIFEST_FILE_DIR
 import wandb.filesync.step_prepare
 
 
+logger = logging.getLogger(__name__)
+
+
 def _manifest_json_from_proto(manifest):
     if manifest.version == 1:
         contents = {
@@ -39,14 +45,48 @@ def _manifest_json_from_proto(manifest):
     }
 
 
+def remove_manifest_files(sync_dir):
+    """Removes the manifest files passed to the internal process by a run.
+
+    Only call this once the run is synced, syncing it again needs them.
+    """
+    manifest_dir = os.path.join(sync_dir, MANIFEST_FILE_DIR)
+    if not os.path.isdir(manifest_dir):
+        return
+    for name in os.listdir(manifest_dir):
+        if name.endswith(".jsonl"):
+            try:
+                os.remove(os.path.join(manifest_dir, name))
+            except OSError:
+                pass
+
+
 class ArtifactSaver(object):
-    def __init__(self, api, digest, manifest_json, file_pusher, is_user_created=False):
+    def __init__(
+        self,
+        api,
+        digest,
+        manifest_json,
+        file_pusher,
+        is_user_created=False,
+        manifest_file_path=None,
+    ):
+        """Saves an artifact.
+
+        The entries of large manifests are read from manifest_file_path, a file
+        written by ArtifactManifest.write_contents, one at a time as they are
+        stored instead of from the contents of manifest_json.
+        """
         self._api = api
         self._file_pusher = file_pusher
         self._digest = digest
         self._manifest = ArtifactManifest.from_manifest_json(None, manifest_json)
+        self._manifest_file_path = manifest_file_path
         self._is_user_created = is_user_created
         self._server_artifact = None
+        # the birth artifacts of stored files are kept in memory, one per
+        # file, the manifest file is read again to write the manifest
+        self._birth_artifact_ids = {}
 
     def save(
         self,
@@ -122,19 +162,29 @@ class ArtifactSaver(object):
         )  # TODO: params
         step_prepare.start()
 
-        # Upload Artifact "L1" files, the actual artifact contents
-        self._file_pusher.store_manifest_files(
-            self._manifest,
-            artifact_id,
-            lambda entry, progress_callback: self._manifest.storage_policy.store_file(
+        entries = self._entries()
+        if latest_artifact_id is not None and latest_artifact_id != artifact_id:
+            births = self._latest_birth_artifact_ids(name, latest_artifact_id)
+            if births:
+                entries = self._reuse_entries(name, entries, births)
+
+        def store_file(entry, progress_callback):
+            exists = self._manifest.storage_policy.store_file(
                 artifact_id, entry, step_prepare, progress_callback=progress_callback
-            ),
+            )
+            self._birth_artifact_ids[entry.path] = entry.birth_artifact_id
+            return exists
+
+        # Upload Artifact "L1" files, the actual artifact contents. The entries
+        # are read as the file pusher gets to them.
+        self._file_pusher.store_manifest_files(
+            self._manifest, artifact_id, store_file, entries=entries
         )
 
         def before_commit():
             with tempfile.NamedTemporaryFile("w+", suffix=".json", delete=False) as fp:
                 path = os.path.abspath(fp.name)
-                json.dump(self._manifest.to_manifest_json(), fp, indent=4)
+                self._manifest.write_manifest_json(fp, entries=self._entries())
             digest = wandb.util.md5_file(path)
             # We're duplicating the file upload logic a little, which isn't great.
             resp = self._api.create_artifact_manifest(
@@ -162,3 +212,70 @@ class ArtifactSaver(object):
             artifact_id, before_commit=before_commit, on_commit=on_commit
         )
         return self._server_artifact
+
+    def _entries(self):
+        """Yields the manifest entries sorted by path, with the birth artifacts
+        of the files stored so far."""
+        if self._manifest_file_path is None:
+            entries = sorted(self._manifest.entries.values(), key=lambda k: k.path)
+        else:
+            entries = self._manifest.read_contents(self._manifest_file_path)
+        for entry in entries:
+            entry.birth_artifact_id = self._birth_artifact_ids.get(
+                entry.path, entry.birth_artifact_id
+            )
+            yield entry
+
+    def _latest_birth_artifact_ids(self, name, latest_artifact_id):
+        """Returns the birth artifacts of the files in the latest version by
+        digest, or None if its files can't be reused."""
+        try:
+            latest_manifest = self._api.artifact_manifest_json(latest_artifact_id)
+        except Exception as e:
+            # we can always store every file
+            logger.warning("failed to fetch the latest manifest of %s: %s", name, e)
+            return None
+        policy = self._manifest.storage_policy
+        if (
+            not latest_manifest
+            or latest_manifest.get("storagePolicy") != policy.name()
+            or latest_manifest.get("storagePolicyConfig", {}) != (policy.config() or {})
+        ):
+            return None
+
+        births = {}
+        for content in latest_manifest["contents"].values():
+            if content.get("birthArtifactID") and not content.get("ref"):
+                births[content["digest"]] = content["birthArtifactID"]
+        return births
+
+    def _reuse_entries(self, name, entries, births):
+        """Yields the entries that weren't already stored for the latest version.
+
+        Files whose digest is in the manifest of the latest version were
+        uploaded then, so they keep its birth artifact instead of being
+        prepared and uploaded again.
+        """
+        reused = stored = 0
+        for entry in entries:
+            if not entry.local_path:
+                continue
+            birth_artifact_id = births.get(entry.digest)
+            if birth_artifact_id:
+                entry.birth_artifact_id = birth_artifact_id
+                self._birth_artifact_ids[entry.path] = birth_artifact_id
+                reused += 1
+            else:
+                stored += 1
+                yield entry
+        logger.info(
+            "artifact %s: reusing %d files of the latest version, storing %d",
+            name,
+            reused,
+            stored,
+        )
+        if reused:
+            wandb.termlog(
+                "Artifact %s: %d files unchanged since the latest version, "
+                "uploading %d" % (name, reused, stored)
+            )
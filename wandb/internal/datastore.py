@@ -14,16 +14,26 @@ header :=
   ident: char[4]
   magic: uint16
   version: uint8
+
+Records are assembled a block at a time in a preallocated buffer, which is
+written out when the block is full, and on the group commit policy given to
+the DataStore: after a number of records or seconds, or when flush() is called.
 """
 from __future__ import print_function
 
+import collections
+import io
 import logging
+import mmap
 import os
 import struct
 import sys
+import time
 import zlib
 
 import wandb
+from wandb.lib import filesystem
+from wandb.proto import wandb_internal_pb2  # type: ignore
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +54,24 @@ LEVELDBLOG_HEADER_MAGIC = (
 )
 LEVELDBLOG_HEADER_VERSION = 0
 
+_HEADER = struct.Struct("<IHB")
+_FILE_HEADER = struct.Struct("<4sHB")
+
+INDEX_SUFFIX = ".idx"
+INDEX_IDENT = b"WBIX"
+INDEX_VERSION = 1
+# ident, version, size of the log the index covers
+_INDEX_HEADER = struct.Struct("<4sHQ")
+# record offset, record type field number, step (-1 if none)
+_INDEX_ENTRY = struct.Struct("<QHq")
+
+
+class CorruptionError(Exception):
+    """A record of a log is damaged."""
+
+
+IndexEntry = collections.namedtuple("IndexEntry", ("offset", "record_type", "step"))
+
 try:
     bytes("", "ascii")
 
@@ -60,11 +88,28 @@ except Exception:
 
 
 class DataStore(object):
-    def __init__(self):
+    """leveldb log reader and writer.
+
+    Arguments:
+        flush_seconds: write out buffered records at least this often.
+        flush_records: write out buffered records once there are this many.
+    """
+
+    def __init__(self, flush_seconds=None, flush_records=None):
         self._opened_for_scan = False
         self._fp = None
         self._index = 0
 
+        self._buf = bytearray(LEVELDBLOG_BLOCK_LEN)
+        self._buf_view = memoryview(self._buf)
+        self._buf_len = 0
+        self._flush_seconds = flush_seconds
+        self._flush_records = flush_records
+        self._flush_index = 0
+        self._flush_offset = 0
+        self._flush_time = time.time()
+        self._unflushed_records = 0
+
         self._crc = [0] * (LEVELDBLOG_LAST + 1)
         for x in range(1, LEVELDBLOG_LAST + 1):
             self._crc[x] = zlib.crc32(strtobytes(chr(x))) & 0xFFFFFFFF
@@ -79,15 +124,37 @@ class DataStore(object):
             open_flags = "wb"
             if os.path.exists(fname):
                 raise IOError("File exists: {}".format(fname))
-        self._fp = open(fname, open_flags)
+        # unbuffered, the block buffer replaces the file's own buffering
+        self._fp = io.open(fname, open_flags, buffering=0)
         self._write_header()
 
     def open_for_append(self, fname):
-        # TODO: implement
+        """Open an existing log to add records at its end.
+
+        A record cut off at the end of the log, by a process that was killed
+        while writing it, is truncated away.  The writer doesn't use this yet:
+        an offline run resumed with the same id starts a new run directory and
+        log rather than continuing the old one.
+        """
         self._fname = fname
-        logger.info("open: %s", fname)
-        self._fp = open(fname, "wb")
-        # do something with _index
+        logger.info("open for append: %s", fname)
+        if os.path.getsize(fname) < LEVELDBLOG_HEADER_LEN:
+            # killed before the header was written
+            self._fp = io.open(fname, "wb", buffering=0)
+            self._write_header()
+            return
+        with DataStoreReader(fname) as reader:
+            for _ in reader.records(recover=True):
+                pass
+            end = reader.end_offset
+            if reader.lost_records:
+                logger.warning(
+                    "Appending to %s, %d records were lost", fname, reader.lost_records
+                )
+        self._fp = io.open(fname, "r+b", buffering=0)
+        self._fp.seek(end)
+        self._fp.truncate()
+        self._index = self._flush_offset = end
 
     def open_for_scan(self, fname):
         self._fname = fname
@@ -104,19 +171,27 @@ class DataStore(object):
         header = self._fp.read(LEVELDBLOG_HEADER_LEN)
         if len(header) == 0:
             return None
-        assert len(header) == LEVELDBLOG_HEADER_LEN
+        if len(header) != LEVELDBLOG_HEADER_LEN:
+            raise CorruptionError("Short record header in %s" % self._fname)
         fields = struct.unpack("<IHB", header)
         checksum, dlength, dtype = fields
+        if not LEVELDBLOG_FULL <= dtype <= LEVELDBLOG_LAST:
+            raise CorruptionError("Unknown record type %d in %s" % (dtype, self._fname))
         # check len, better fit in the block
         self._index += LEVELDBLOG_HEADER_LEN
         data = self._fp.read(dlength)
         checksum_computed = zlib.crc32(data, self._crc[dtype]) & 0xFFFFFFFF
-        assert checksum == checksum_computed
+        if checksum != checksum_computed:
+            raise CorruptionError("Checksum mismatch in %s" % self._fname)
         self._index += dlength
         return dtype, data
 
     def scan_data(self):
-        # TODO(jhr): handle some assertions as file corruption issues
+        """Returns the data of the next record, or None at the end of the file.
+
+        A damaged record raises CorruptionError, DataStoreReader can recover
+        from those.
+        """
         # how much left in the block.  if less than header len, read as pad,
         offset = self._index % LEVELDBLOG_BLOCK_LEN
         space_left = LEVELDBLOG_BLOCK_LEN - offset
@@ -124,7 +199,8 @@ class DataStore(object):
             pad_check = strtobytes("\x00" * space_left)
             pad = self._fp.read(space_left)
             # verify they are zero
-            assert pad == pad_check
+            if pad != pad_check:
+                raise CorruptionError("Invalid block padding in %s" % self._fname)
             self._index += space_left
 
         record = self.scan_record()
@@ -134,19 +210,23 @@ class DataStore(object):
         if dtype == LEVELDBLOG_FULL:
             return data
 
-        assert dtype == LEVELDBLOG_FIRST
+        if dtype != LEVELDBLOG_FIRST:
+            raise CorruptionError("Fragment without a first in %s" % self._fname)
+        parts = [data]
         while True:
             offset = self._index % LEVELDBLOG_BLOCK_LEN
             record = self.scan_record()
             if record is None:  # eof
                 return None
             dtype, new_data = record
+            parts.append(new_data)
             if dtype == LEVELDBLOG_LAST:
-                data += new_data
                 break
-            assert dtype == LEVELDBLOG_MIDDLE
-            data += new_data
-        return data
+            if dtype != LEVELDBLOG_MIDDLE:
+                raise CorruptionError(
+                    "Record is missing its last fragment in %s" % self._fname
+                )
+        return b"".join(parts)
 
     def _write_header(self):
         data = struct.pack(
@@ -156,8 +236,7 @@ class DataStore(object):
             LEVELDBLOG_HEADER_VERSION,
         )
         assert len(data) == 7
-        self._fp.write(data)
-        self._index += len(data)
+        self._append(data)
 
     def _read_header(self):
         header_length = 7
@@ -186,15 +265,51 @@ class DataStore(object):
         checksum = zlib.crc32(s, self._crc[dtype]) & 0xFFFFFFFF
         # logger.info("write_record: index=%d len=%d dtype=%d",
         #     self._index, dlength, dtype)
-        self._fp.write(struct.pack("<IHB", checksum, dlength, dtype))
-        if dlength:
-            self._fp.write(s)
-        self._index += LEVELDBLOG_HEADER_LEN + len(s)
+        buf_len = self._buf_len
+        start = buf_len + LEVELDBLOG_HEADER_LEN
+        end = start + dlength
+        _HEADER.pack_into(self._buf, buf_len, checksum, dlength, dtype)
+        self._buf[start:end] = s
+        self._buf_len = end
+        self._index += end - buf_len
+        if not self._index % LEVELDBLOG_BLOCK_LEN:
+            self._flush_buffer()
+
+    def _append(self, data):
+        """Add data, which must fit in the current block, to the buffer."""
+        n = len(data)
+        self._buf[self._buf_len : self._buf_len + n] = data  # noqa: E203
+        self._buf_len += n
+        self._index += n
+        if n and self._index % LEVELDBLOG_BLOCK_LEN == 0:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        """Write the buffered part of the current block to the file."""
+        self._unflushed_records = 0
+        self._flush_time = time.time()
+        if not self._buf_len:
+            return
+        data = self._buf_view[: self._buf_len]
+        while len(data):
+            data = data[self._fp.write(data) :]  # noqa: E203
+        self._flush_offset += self._buf_len
+        self._flush_index += 1
+        self._buf_len = 0
+
+    def _maybe_flush(self):
+        """Write buffered records out if the group commit policy says so."""
+        if not self._buf_len:
+            return
+        if self._flush_records and self._unflushed_records >= self._flush_records:
+            self._flush_buffer()
+        elif self._flush_seconds is not None and (
+            time.time() - self._flush_time >= self._flush_seconds
+        ):
+            self._flush_buffer()
 
     def _write_data(self, s):
         file_offset = self._index
-        flush_index = 0
-        flush_offset = 0
 
         offset = self._index % LEVELDBLOG_BLOCK_LEN
         space_left = LEVELDBLOG_BLOCK_LEN - offset
@@ -204,8 +319,7 @@ class DataStore(object):
         #     self._index, offset, data_left)
         if space_left < LEVELDBLOG_HEADER_LEN:
             pad = "\x00" * space_left
-            self._fp.write(strtobytes(pad))
-            self._index += space_left
+            self._append(strtobytes(pad))
             offset = 0
             space_left = LEVELDBLOG_BLOCK_LEN
 
@@ -233,7 +347,15 @@ class DataStore(object):
             # write last
             self._write_record(s[data_used:], LEVELDBLOG_LAST)
 
-        return file_offset, self._index - file_offset, flush_index, flush_offset
+        self._unflushed_records += 1
+        if self._flush_records or self._flush_seconds is not None:
+            self._maybe_flush()
+        return (
+            file_offset,
+            self._index - file_offset,
+            self._flush_index,
+            self._flush_offset,
+        )
 
     def write(self, obj):
         """Write a protocol buffer.
@@ -243,7 +365,8 @@ class DataStore(object):
 
         Returns:
             (file_offset, length, flush_index, flush_offset) if successful,
-            None otherwise
+            None otherwise.  flush_index counts the writes to the file so far,
+            the first flush_offset bytes of the file have been written.
 
         """
         raw_size = obj.ByteSize()
@@ -252,7 +375,273 @@ class DataStore(object):
         ret = self._write_data(s)
         return ret
 
+    def debounce(self):
+        """Apply the group commit policy while no records are written."""
+        self._maybe_flush()
+
+    def flush(self, fsync=False):
+        """Write out buffered records, and sync them to disk if fsync is set.
+
+        Returns:
+            (flush_index, flush_offset)
+        """
+        self._flush_buffer()
+        if fsync:
+            os.fsync(self._fp.fileno())
+        return self._flush_index, self._flush_offset
+
     def close(self):
         if self._fp is not None:
             logger.info("close: %s", self._fname)
+            if not self._opened_for_scan:
+                self._flush_buffer()
             self._fp.close()
+
+
+def _record_step(pb):
+    if pb.WhichOneof("record_type") == "history":
+        for item in pb.history.item:
+            if item.key == "_step":
+                return int(item.value_json)
+    return -1
+
+
+class DataStoreReader(object):
+    """Reads records from a memory-mapped leveldb log.
+
+    Records are read straight from the mapping, fragments of records that span
+    blocks are joined once.  A record that is still being written at the end
+    of the file ends the scan.  index() lists the records with their types and
+    steps, and keeps that list in a sidecar file next to the log, so tools
+    can jump to the last records or the records of one type.
+
+    Arguments:
+        fname: the log to read.
+    """
+
+    def __init__(self, fname):
+        self._fname = fname
+        self._crc = [0] * (LEVELDBLOG_LAST + 1)
+        for x in range(1, LEVELDBLOG_LAST + 1):
+            self._crc[x] = zlib.crc32(strtobytes(chr(x))) & 0xFFFFFFFF
+        logger.info("open for read: %s", fname)
+        with open(fname, "rb") as f:
+            self._size = os.fstat(f.fileno()).st_size
+            if self._size < LEVELDBLOG_HEADER_LEN:
+                raise Exception("Invalid header")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm) if PY3 else self._mm
+        self.end_offset = LEVELDBLOG_HEADER_LEN
+        self.lost_records = 0
+        self.skipped_bytes = 0
+        ident, magic, version = _FILE_HEADER.unpack_from(self._buf, 0)
+        if (
+            ident != strtobytes(LEVELDBLOG_HEADER_IDENT)
+            or magic != LEVELDBLOG_HEADER_MAGIC
+            or version != LEVELDBLOG_HEADER_VERSION
+        ):
+            self.close()
+            raise Exception("Invalid header")
+
+    @property
+    def size(self):
+        return self._size
+
+    def records(self, offset=LEVELDBLOG_HEADER_LEN, recover=False):
+        """Yields (offset, data) for each record, starting at offset.
+
+        A damaged record raises CorruptionError, unless recover is set.  Then
+        the scan resumes after the record, or at the next block if its header
+        is damaged.  lost_records counts the records that were dropped,
+        including one cut off at the end of the file, and skipped_bytes the
+        damaged bytes.  Records in a skipped block can't be counted.  The
+        offset after the last record yielded is kept in end_offset.
+        """
+        buf = self._buf
+        size = self._size
+        unpack_from = _HEADER.unpack_from
+        read_data = self._read_data
+        parts = []
+        start = None
+        # the rest of a record that was lost is dropped silently
+        skipping = False
+        while True:
+            block_left = LEVELDBLOG_BLOCK_LEN - offset % LEVELDBLOG_BLOCK_LEN
+            if block_left < LEVELDBLOG_HEADER_LEN:
+                offset += block_left
+                block_left = LEVELDBLOG_BLOCK_LEN
+            if offset + LEVELDBLOG_HEADER_LEN > size:
+                break
+            checksum, dlength, dtype = unpack_from(buf, offset)
+            data_end = offset + LEVELDBLOG_HEADER_LEN + dlength
+            if data_end > size:
+                break
+
+            data, error = read_data(offset, block_left, checksum, dlength, dtype)
+            if error is not None:
+                self._check_recover(recover, error, offset)
+                offset, skipping = self._skip_damaged(
+                    offset, error, bool(parts), dtype, data, block_left
+                )
+                parts = []
+                continue
+
+            if dtype in (LEVELDBLOG_FULL, LEVELDBLOG_FIRST):
+                skipping = False
+                if parts:
+                    error = "record is missing its last fragment"
+                    self._check_recover(recover, error, offset)
+                    self._lost(start, error)
+                    parts = []
+            elif not parts:
+                error = "fragment without a first fragment"
+                self._check_recover(recover, error, offset)
+                if not skipping:
+                    self._lost(offset, error)
+                skipping = dtype == LEVELDBLOG_MIDDLE
+                offset = data_end
+                continue
+
+            if dtype == LEVELDBLOG_FULL:
+                self.end_offset = data_end
+                yield offset, data
+            else:
+                if dtype == LEVELDBLOG_FIRST:
+                    start = offset
+                parts.append(data)
+                if dtype == LEVELDBLOG_LAST:
+                    data = b"".join(parts)
+                    parts = []
+                    self.end_offset = data_end
+                    yield start, data
+            offset = data_end
+
+        if recover and (parts or (offset < size and not skipping)):
+            self._lost(offset, "record cut off at the end of the file")
+
+    def _read_data(self, offset, block_left, checksum, dlength, dtype):
+        """Returns the data of the record with this header and what is wrong
+        with it, if anything.  The data is None if the header is damaged."""
+        if LEVELDBLOG_HEADER_LEN + dlength > block_left:
+            return None, "record crosses a block boundary"
+        if not LEVELDBLOG_FULL <= dtype <= LEVELDBLOG_LAST:
+            return None, "unknown record type %d" % dtype
+        data_start = offset + LEVELDBLOG_HEADER_LEN
+        # a copy, no views of the mapping are held while suspended
+        if dtype == LEVELDBLOG_FULL:
+            data = self._mm[data_start : data_start + dlength]  # noqa: E203
+        else:
+            data = self._buf[data_start : data_start + dlength]  # noqa: E203
+        if checksum != zlib.crc32(data, self._crc[dtype]) & 0xFFFFFFFF:
+            return data, "checksum mismatch"
+        return data, None
+
+    def _check_recover(self, recover, error, offset):
+        if not recover:
+            raise CorruptionError(
+                "%s at offset %d of %s" % (error, offset, self._fname)
+            )
+
+    def _skip_damaged(self, offset, error, in_record, dtype, data, block_left):
+        """Counts a damaged record as lost, data is None if its header is.
+
+        Returns:
+            The offset to resume the scan at, and whether the fragments that
+            follow belong to the lost record.
+        """
+        if in_record and dtype in (LEVELDBLOG_FULL, LEVELDBLOG_FIRST):
+            self._lost(offset, "record is missing its last fragment")
+        self._lost(offset, error)
+        skipping = dtype not in (LEVELDBLOG_FULL, LEVELDBLOG_LAST)
+        if data is None:
+            # the rest of the block can't be trusted
+            self.skipped_bytes += block_left
+            return offset + block_left, skipping
+        # only the data is damaged, the next header is checked on its own
+        skipped = LEVELDBLOG_HEADER_LEN + len(data)
+        self.skipped_bytes += skipped
+        return offset + skipped, skipping
+
+    def _lost(self, offset, error):
+        self.lost_records += 1
+        logger.info("Lost a record at offset %d of %s: %s", offset, self._fname, error)
+
+    def read(self, offset):
+        """Returns the data of the record at offset."""
+        for _, data in self.records(offset):
+            return data
+        raise ValueError("No record at offset %d of %s" % (offset, self._fname))
+
+    def index(self, save=True):
+        """Returns an IndexEntry for each record.
+
+        The entries are read from the sidecar index of the log, records added
+        since it was written are parsed and appended to it if save is set.
+        """
+        index_fname = self._fname + INDEX_SUFFIX
+        entries, indexed = self._load_index(index_fname)
+        numbers = wandb_internal_pb2.Record.DESCRIPTOR.fields_by_name
+        new_entries = []
+        indexed = indexed or LEVELDBLOG_HEADER_LEN
+        for offset, data in self.records(indexed, recover=True):
+            pb = wandb_internal_pb2.Record()
+            pb.ParseFromString(data)
+            record_type = pb.WhichOneof("record_type")
+            new_entries.append(
+                IndexEntry(offset, numbers[record_type].number, _record_step(pb))
+            )
+            indexed = self.end_offset
+        entries.extend(new_entries)
+        if save and (new_entries or not os.path.exists(index_fname)):
+            self._save_index(index_fname, entries, indexed)
+        names = wandb_internal_pb2.Record.DESCRIPTOR.fields_by_number
+        return [
+            IndexEntry(e.offset, names[e.record_type].name, e.step) for e in entries
+        ]
+
+    def _load_index(self, index_fname):
+        try:
+            with open(index_fname, "rb") as f:
+                data = f.read()
+        except (IOError, OSError):
+            return [], None
+        if len(data) < _INDEX_HEADER.size:
+            return [], None
+        ident, version, indexed = _INDEX_HEADER.unpack_from(data, 0)
+        count = (len(data) - _INDEX_HEADER.size) // _INDEX_ENTRY.size
+        if ident != INDEX_IDENT or version != INDEX_VERSION or indexed > self._size:
+            logger.info("Rebuilding index %s", index_fname)
+            return [], None
+        entries = [
+            IndexEntry(
+                *_INDEX_ENTRY.unpack_from(
+                    data, _INDEX_HEADER.size + i * _INDEX_ENTRY.size
+                )
+            )
+            for i in range(count)
+        ]
+        return entries, indexed
+
+    def _save_index(self, index_fname, entries, indexed):
+        tmp = index_fname + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_INDEX_HEADER.pack(INDEX_IDENT, INDEX_VERSION, indexed))
+                f.write(b"".join(_INDEX_ENTRY.pack(*e) for e in entries))
+            filesystem.replace_file(tmp, index_fname)
+        except (IOError, OSError) as e:
+            logger.warning("Could not write index %s: %s", index_fname, e)
+
+    def close(self):
+        if self._mm is not None:
+            if PY3:
+                self._buf.release()
+            self._buf = None
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
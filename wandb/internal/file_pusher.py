@@ -147,8 +147,11 @@ class FilePusher(object):
         )
         self._incoming_queue.put(event)
 
-    def store_manifest_files(self, manifest, artifact_id, save_fn):
-        event = step_checksum.RequestStoreManifestFiles(manifest, artifact_id, save_fn)
+    def store_manifest_files(self, manifest, artifact_id, save_fn, entries=None):
+        """Store the files of manifest, or only the given entries of it."""
+        event = step_checksum.RequestStoreManifestFiles(
+            manifest, artifact_id, save_fn, entries
+        )
         self._incoming_queue.put(event)
 
     def named_temp_file(self, mode="w+b"):
@@ -1,7 +1,9 @@
 import base64
 import binascii
 import collections
+import json
 import logging
+from multiprocessing.pool import ThreadPool
 import threading
 import requests
 import time
@@ -10,7 +12,9 @@ import itertools
 from six.moves import queue
 from wandb import util
 from wandb import env
+from wandb.lib import redirect
 import os
+import zlib
 
 
 MAX_LINE_SIZE = 4 * 1024 * 1024 - 100 * 1024  # imposed by back end
@@ -18,9 +22,14 @@ MAX_LINE_SIZE = 4 * 1024 * 1024 - 100 * 1024  # imposed by back end
 logger = logging.getLogger(__name__)
 
 Chunk = collections.namedtuple("Chunk", ("filename", "data"))
+# consecutive chunks of a file, queued as one item
+Chunks = collections.namedtuple("Chunks", ("filename", "lines"))
 
 
 class DefaultFilePolicy(object):
+    # whether a post can replace what an earlier post of the file sent
+    overwrites = False
+
     def __init__(self, start_chunk_id=0):
         self._chunk_id = start_chunk_id
 
@@ -52,6 +61,8 @@ class JsonlFilePolicy(DefaultFilePolicy):
 
 
 class SummaryFilePolicy(DefaultFilePolicy):
+    overwrites = True
+
     def process_chunks(self, chunks):
         data = chunks[-1].data
         if len(data) > MAX_LINE_SIZE:
@@ -71,12 +82,21 @@ class CRDedupeFilePolicy(DefaultFilePolicy):
     This is what a terminal does. We use it for console output to reduce the
     amount of data we need to send over the network (eg. for progress bars),
     while preserving the output's appearance in the web app.
+
+    The last line of a chunk without a line ending isn't finished, it is sent
+    but the next chunk is written over it.
     """
 
+    overwrites = True
+
     def process_chunks(self, chunks):
         ret = []
         flag = False  # whether the cursor can be moved up
+        unfinished = False  # whether the last line of ret is unfinished
         for c in chunks:
+            if unfinished:
+                ret.pop()
+                unfinished = False
             # Line has two possible formats:
             # 1) "2020-08-25T20:38:36.895321 this is my line of text"
             # 2) "ERROR 2020-08-25T20:38:36.895321 this is my line of text"
@@ -88,8 +108,8 @@ class CRDedupeFilePolicy(DefaultFilePolicy):
             prefix += token + " "
 
             lines = rest.split(os.linesep)
-            for line in lines:
-                line = line.split("\r")[-1]
+            for i, line in enumerate(lines):
+                line = redirect.erase_carriage_returns(line).rstrip("\r")
                 if line:
                     # check for cursor up control character
                     if line.endswith("\x1b\x5b\x41"):
@@ -99,8 +119,12 @@ class CRDedupeFilePolicy(DefaultFilePolicy):
                     else:
                         ret.append(prefix + line + os.linesep)
                         flag = True
+                        unfinished = i == len(lines) - 1
         chunk_id = self._chunk_id
         self._chunk_id += len(ret)
+        if unfinished:
+            # sent again at the same offset once it changes
+            self._chunk_id -= 1
         return {"offset": chunk_id, "content": ret}
 
 
@@ -116,8 +140,9 @@ class BinaryFilePolicy(DefaultFilePolicy):
 class FileStreamApi(object):
     """Pushes chunks of files to our streaming endpoint.
 
-    This class is used as a singleton. It has a thread that serializes access to
-    the streaming endpoint and performs rate-limiting and batching.
+    This class is used as a singleton. It has a thread that performs rate-limiting
+    and batching, assigning file offsets in order, and hands the posts to a small
+    pool so that up to max_inflight posts can be waiting on the server at once.
 
     TODO: Differentiate between binary/text encoding.
     """
@@ -125,9 +150,19 @@ class FileStreamApi(object):
     Finish = collections.namedtuple("Finish", ("exitcode"))
 
     HTTP_TIMEOUT = env.get_http_timeout(10)
+    # The number of chunks per post adapts between these bounds: it doubles
+    # while posts are fast and chunks are backing up and halves when posts
+    # take longer than TARGET_POST_SECONDS.
     MAX_ITEMS_PER_PUSH = 10000
-
-    def __init__(self, api, run_id, start_time, settings=None):
+    MIN_ITEMS_PER_PUSH = 100
+    MAX_ITEMS_PER_PUSH_LIMIT = 160000
+    MAX_BYTES_PER_PUSH = 16 * 1024 * 1024
+    TARGET_POST_SECONDS = 2.0
+    MAX_QUEUE_SIZE = 500000
+    GZIP_MIN_BYTES = 1024
+    MAX_INFLIGHT = 4
+
+    def __init__(self, api, run_id, start_time, settings=None, max_inflight=None):
         if settings is None:
             settings = dict()
         self._settings = settings
@@ -145,7 +180,25 @@ class FileStreamApi(object):
             }
         )
         self._file_policies = {}
-        self._queue = queue.Queue()
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUE_SIZE)
+        self._compress = True
+        self._max_items = self.MAX_ITEMS_PER_PUSH
+        self._latency = None
+        self._stats = dict(
+            posts=0,
+            chunks=0,
+            raw_bytes=0,
+            sent_bytes=0,
+            max_queue_depth=0,
+            max_items_per_push=self._max_items,
+        )
+        self._lock = threading.Lock()
+        self._max_inflight = max_inflight or self.MAX_INFLIGHT
+        self._pool = None
+        self._inflight = collections.deque()
+        self._inflight_slots = threading.Semaphore(self._max_inflight)
+        # filename -> event set once the last post overwriting the file is done
+        self._overwrite_posts = {}
         self._thread = threading.Thread(target=self._thread_body)
         # It seems we need to make this a daemon thread to get sync.py's atexit handler to run, which
         # cleans this thread up.
@@ -164,6 +217,9 @@ class FileStreamApi(object):
 
     def start(self):
         self._init_endpoint()
+        # one worker more than posts allowed in flight keeps heartbeats from
+        # queueing behind slow data posts
+        self._pool = ThreadPool(self._max_inflight + 1)
         self._thread.start()
 
     def set_default_file_policy(self, filename, file_policy):
@@ -189,6 +245,13 @@ class FileStreamApi(object):
         else:
             return max(5, self.heartbeat_seconds)
 
+    def stats(self):
+        """Counters for the posts made so far and the deepest the queue got."""
+        stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["latency"] = self._latency
+        return stats
+
     def _read_queue(self):
         # called from the push thread (_thread_body), this does an initial read
         # that'll block for up to rate_limit_seconds. Then it tries to read
@@ -197,10 +260,11 @@ class FileStreamApi(object):
         # our rate limit. So next time we get a chance to read the queue we want
         # read all the stuff that queue'd up since last time.
         #
-        # If we have more than MAX_ITEMS_PER_PUSH in the queue then the push thread
-        # will get behind and data will buffer up in the queue.
+        # If we have more than _max_items in the queue then the push thread
+        # posts right away instead of waiting out the rate limit, and grows
+        # _max_items as long as the server keeps up.
         return util.read_many_from_queue(
-            self._queue, self.MAX_ITEMS_PER_PUSH, self.rate_limit_seconds()
+            self._queue, self._max_items, self.rate_limit_seconds()
         )
 
     def _thread_body(self):
@@ -213,6 +277,10 @@ class FileStreamApi(object):
             for item in items:
                 if isinstance(item, self.Finish):
                     finished = item
+                elif isinstance(item, Chunks):
+                    ready_chunks.extend(
+                        Chunk(item.filename, data) for data in item.lines
+                    )
                 else:
                     # item is Chunk
                     ready_chunks.append(item)
@@ -220,7 +288,10 @@ class FileStreamApi(object):
             cur_time = time.time()
 
             if ready_chunks and (
-                finished or cur_time - posted_data_time > self.rate_limit_seconds()
+                finished
+                or cur_time - posted_data_time > self.rate_limit_seconds()
+                or self._queue.qsize() >= self._max_items
+                or len(ready_chunks) >= self._max_items
             ):
                 posted_data_time = cur_time
                 posted_anything_time = cur_time
@@ -229,19 +300,23 @@ class FileStreamApi(object):
 
             if cur_time - posted_anything_time > self.heartbeat_seconds:
                 posted_anything_time = cur_time
-                self._handle_response(
-                    util.request_with_retry(
-                        self._client.post,
-                        self._endpoint,
-                        json={"complete": False, "failed": False},
+                self._inflight.append(
+                    self._pool.apply_async(
+                        self._post_and_handle, ({"complete": False, "failed": False},)
                     )
                 )
+            self._reap()
+        self._reap(block=True)
+        self._pool.close()
+        self._pool.join()
         # post the final close message. (item is self.Finish instance now)
-        util.request_with_retry(
-            self._client.post,
-            self._endpoint,
-            json={"complete": True, "exitcode": int(finished.exitcode)},
-        )
+        self._post({"complete": True, "exitcode": int(finished.exitcode)})
+        logger.info("file stream stats: %s", self.stats())
+
+    def _reap(self, block=False):
+        # surface errors from finished posts in the stream thread
+        while self._inflight and (block or self._inflight[0].ready()):
+            self._inflight.popleft().get()
 
     def _handle_response(self, response):
         """Logs dropped chunks and updates dynamic settings"""
@@ -253,26 +328,144 @@ class FileStreamApi(object):
             parsed = response.json()
             self._api.dynamic_settings.update(parsed["limits"])
 
+    def _post(self, payload):
+        """Post a json payload, gzipped when it is large enough to be worth it."""
+        body = json.dumps(payload).encode("utf-8")
+        with self._lock:
+            self._stats["posts"] += 1
+            self._stats["raw_bytes"] += len(body)
+        if self._compress and len(body) >= self.GZIP_MIN_BYTES:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            data = compressor.compress(body) + compressor.flush()
+            response = util.request_with_retry(
+                self._client.post,
+                self._endpoint,
+                data=data,
+                headers={
+                    "Content-Encoding": "gzip",
+                    "Content-Type": "application/json",
+                },
+            )
+            if not (
+                isinstance(response, requests.HTTPError)
+                and response.response.status_code in (400, 415)
+            ):
+                with self._lock:
+                    self._stats["sent_bytes"] += len(data)
+                return response
+            logger.warning("file stream rejected gzip content, disabling compression")
+            self._compress = False
+        with self._lock:
+            self._stats["sent_bytes"] += len(body)
+        return util.request_with_retry(
+            self._client.post,
+            self._endpoint,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _adapt(self, latency, num_chunks):
+        """Resize batches based on how long the last post took."""
+        with self._lock:
+            self._adapt_locked(latency, num_chunks)
+
+    def _adapt_locked(self, latency, num_chunks):
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency = 0.7 * self._latency + 0.3 * latency
+        if self._latency > self.TARGET_POST_SECONDS:
+            self._max_items = max(self.MIN_ITEMS_PER_PUSH, self._max_items // 2)
+        elif num_chunks >= self._max_items or self._queue.qsize() >= self._max_items:
+            self._max_items = min(self.MAX_ITEMS_PER_PUSH_LIMIT, self._max_items * 2)
+        self._stats["max_items_per_push"] = max(
+            self._stats["max_items_per_push"], self._max_items
+        )
+
     def _send(self, chunks):
+        # split into posts of at most MAX_BYTES_PER_PUSH, keeping chunk order
+        batch = []
+        batch_bytes = 0
+        for chunk in chunks:
+            if batch and batch_bytes + len(chunk.data) > self.MAX_BYTES_PER_PUSH:
+                self._send_batch(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(chunk)
+            batch_bytes += len(chunk.data)
+        if batch:
+            self._send_batch(batch)
+
+    def _send_batch(self, chunks):
         # create files dict. dict of <filename: chunks> pairs where chunks is a list of
         # [chunk_id, chunk_data] tuples (as lists since this will be json).
         files = {}
+        overwritten = []
+        num_chunks = len(chunks)
         # Groupby needs group keys to be consecutive, so sort first.
         chunks.sort(key=lambda c: c.filename)
         for filename, file_chunks in itertools.groupby(chunks, lambda c: c.filename):
             file_chunks = list(file_chunks)  # groupby returns iterator
             # Specific file policies are set by internal/sender.py
             self.set_default_file_policy(filename, DefaultFilePolicy())
-            files[filename] = self._file_policies[filename].process_chunks(file_chunks)
-            if not files[filename]:
-                del files[filename]
+            policy = self._file_policies[filename]
+            content = policy.process_chunks(file_chunks)
+            if not content:
+                num_chunks -= len(file_chunks)
+            elif policy.overwrites and self._pool is not None:
+                overwritten.append((filename, content, len(file_chunks)))
+                num_chunks -= len(file_chunks)
+            else:
+                files[filename] = content
+
+        if self._pool is None:
+            self._post_files({"files": files}, num_chunks)
+            return
+        # content sent at an offset lands in place whichever post arrives
+        # first, so those posts overlap freely
+        if files:
+            self._post_files_async({"files": files}, num_chunks)
+        # a file whose posts replace what earlier ones sent gets posts of its
+        # own, which wait for its previous post so an older version can't win
+        for filename, content, file_chunks in overwritten:
+            wait = self._overwrite_posts.get(filename)
+            done = threading.Event()
+            self._overwrite_posts[filename] = done
+            self._post_files_async(
+                {"files": {filename: content}}, file_chunks, wait, done
+            )
 
-        self._handle_response(
-            util.request_with_retry(
-                self._client.post, self._endpoint, json={"files": files}
+    def _post_files_async(self, payload, num_chunks, wait=None, done=None):
+        # blocks while max_inflight posts are outstanding, chunks keep
+        # queueing up and go out in bigger batches
+        self._inflight_slots.acquire()
+        self._inflight.append(
+            self._pool.apply_async(
+                self._post_files_inflight, (payload, num_chunks, wait, done)
             )
         )
 
+    def _post_files_inflight(self, payload, num_chunks, wait, done):
+        try:
+            if wait:
+                wait.wait()
+            self._post_files(payload, num_chunks)
+        finally:
+            if done:
+                done.set()
+            self._inflight_slots.release()
+
+    def _post_files(self, payload, num_chunks):
+        start = time.time()
+        response = self._post(payload)
+        with self._lock:
+            self._stats["chunks"] += num_chunks
+        self._adapt(time.time() - start, num_chunks)
+        self._handle_response(response)
+
+    def _post_and_handle(self, payload):
+        self._handle_response(self._post(payload))
+
     def stream_file(self, path):
         name = path.split("/")[-1]
         with open(path) as f:
@@ -287,6 +480,22 @@ class FileStreamApi(object):
             chunk: File data.
         """
         self._queue.put(Chunk(filename, data))
+        depth = self._queue.qsize()
+        if depth > self._stats["max_queue_depth"]:
+            self._stats["max_queue_depth"] = depth
+
+    def push_many(self, filename, lines):
+        """Push consecutive chunks of a file at once.
+
+        Cheaper than pushing the lines one by one when there are many of them,
+        like when an offline run is synced.
+        """
+        if not lines:
+            return
+        self._queue.put(Chunks(filename, lines))
+        depth = self._queue.qsize()
+        if depth > self._stats["max_queue_depth"]:
+            self._stats["max_queue_depth"] = depth
 
     def finish(self, exitcode):
         """Cleans up.
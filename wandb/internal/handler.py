@@ -82,6 +82,8 @@ class HandleManager(object):
 
         # defer is used to drive the sender finish state machine
         self._dispatch_record(record, always_send=True)
+        # and commits what the writer has buffered
+        self._writer_q.put(record)
 
     def handle_request_login(self, record):
         self._dispatch_record(record)
@@ -104,12 +106,22 @@ class HandleManager(object):
     def handle_artifact(self, record):
         self._dispatch_record(record)
 
-    def _save_summary(self, summary_dict, flush=False):
+    def _save_summary(self, summary_dict, flush=False, removed=()):
+        """Send summary keys to the sender.
+
+        Only the keys in summary_dict (and removed) are sent, the sender keeps
+        its own consolidated copy and applies these records as deltas.
+        """
         summary = wandb_internal_pb2.SummaryRecord()
         for k, v in six.iteritems(summary_dict):
             update = summary.update.add()
             update.key = k
             update.value_json = json.dumps(v)
+        for k in removed:
+            remove = summary.remove.add()
+            remove.key = k
+        if not flush and not summary.update and not summary.remove:
+            return
         record = wandb_internal_pb2.Record(summary=summary)
         if flush:
             self._dispatch_record(record)
@@ -129,12 +141,23 @@ class HandleManager(object):
         self._dispatch_record(record)
         self._save_history(record)
         history_dict = proto_util.dict_from_proto_list(record.history.item)
-        self._consolidated_summary.update(history_dict)
-        self._save_summary(self._consolidated_summary)
+        changed = dict()
+        for k, v in six.iteritems(history_dict):
+            if (
+                k not in self._consolidated_summary
+                or self._consolidated_summary[k] != v
+            ):
+                changed[k] = v
+        self._consolidated_summary.update(changed)
+        self._save_summary(changed)
 
     def handle_summary(self, record):
         summary = record.summary
 
+        # top level keys touched by this record, sent to the sender as a delta
+        updated = set()
+        removed = set()
+
         for item in summary.update:
             if len(item.nested_key) > 0:
                 # we use either key or nested_key -- not both
@@ -153,6 +176,8 @@ class HandleManager(object):
 
             # use the last element of the key to write the leaf:
             target[key[-1]] = json.loads(item.value_json)
+            updated.add(key[0])
+            removed.discard(key[0])
 
         for item in summary.remove:
             if len(item.nested_key) > 0:
@@ -172,8 +197,14 @@ class HandleManager(object):
 
             # use the last element of the key to erase the leaf:
             del target[key[-1]]
+            if len(key) > 1:
+                updated.add(key[0])
+            else:
+                updated.discard(key[0])
+                removed.add(key[0])
 
-        self._save_summary(self._consolidated_summary)
+        changed = dict((k, self._consolidated_summary[k]) for k in updated)
+        self._save_summary(changed, removed=sorted(removed))
 
     def handle_exit(self, record):
         self._dispatch_record(record, always_send=True)
@@ -26,11 +26,13 @@ import psutil  # type: ignore
 from six.moves import queue
 import wandb
 from wandb.interface import interface
+from wandb.internal import artifacts
 from wandb.internal import handler
 from wandb.internal import internal_util
 from wandb.internal import sender
 from wandb.internal import settings_static
 from wandb.internal import writer
+from wandb.proto import wandb_internal_pb2  # type: ignore
 from wandb.util import sentry_exc
 
 
@@ -199,6 +201,10 @@ class HandlerThread(internal_util.RecordLoopThread):
         )
 
     def _process(self, record):
+        if isinstance(record, wandb_internal_pb2.RecordBatch):
+            for batched_record in record.record:
+                self._hm.handle(batched_record)
+            return
         self._hm.handle(record)
 
     def _finish(self):
@@ -231,8 +237,15 @@ class SenderThread(internal_util.RecordLoopThread):
     def _process(self, record):
         self._sm.send(record)
 
+    def _debounce(self):
+        self._sm.debounce()
+
     def _finish(self):
         self._sm.finish()
+        if not self._settings._offline:
+            # online runs are synced, offline runs keep their manifest files
+            # until wandb sync is done with them
+            artifacts.remove_manifest_files(self._settings._sync_dir)
 
 
 class WriterThread(internal_util.RecordLoopThread):
@@ -255,6 +268,9 @@ class WriterThread(internal_util.RecordLoopThread):
     def _process(self, record):
         self._wm.write(record)
 
+    def _debounce(self):
+        self._wm.debounce()
+
     def _finish(self):
         self._wm.finish()
 
@@ -2,6 +2,7 @@ from gql import Client, gql  # type: ignore
 from gql.client import RetryError  # type: ignore
 from gql.transport.requests import RequestsHTTPTransport  # type: ignore
 import datetime
+import hashlib
 import os
 import ast
 import os
@@ -15,6 +16,7 @@ import socket
 import time
 import sys
 import random
+import threading
 import traceback
 
 if os.name == "posix" and sys.version_info[0] < 3:
@@ -35,10 +37,11 @@ from wandb import util
 from wandb.apis.normalize import normalize_exceptions
 from wandb.errors.error import CommError, UsageError
 from wandb.lib.filenames import DIFF_FNAME, METADATA_FNAME
+from wandb.lib import digest_cache
 from wandb.lib.git import GitRepo
 
 from .file_stream import FileStreamApi
-from .progress import Progress
+from .progress import Progress, PartProgress
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +62,11 @@ class Api(object):
     """
 
     HTTP_TIMEOUT = env.get_http_timeout(10)
+    # Connections kept alive per storage host, matches FilePusher.MAX_UPLOAD_JOBS
+    UPLOAD_POOL_MAXSIZE = 64
+    UPLOAD_PART_ALIGN = 256 * 1024
+    UPLOAD_PART_RETRIES = 5
+    UPLOAD_PART_RETRY_SLEEP = 1
 
     def __init__(
         self,
@@ -108,6 +116,8 @@ class Api(object):
         )
         self._current_run_id = None
         self._file_stream_api = None
+        self._upload_sessions = {}
+        self._upload_sessions_lock = threading.Lock()
         # This Retry class is initialized once for each Api instance, so this
         # defaults to retrying 1 million times per process or 7 days
         self.upload_file_retry = normalize_exceptions(
@@ -1189,6 +1199,9 @@ class Api(object):
     def upload_file(self, url, file, callback=None, extra_headers={}):
         """Uploads a file to W&B with failure resumption
 
+        Files larger than WANDB_UPLOAD_PART_SIZE bytes are uploaded in parts,
+        see _upload_file_parts.
+
         Args:
             url (str): The url to download
             file (str): The path to the file you want to upload
@@ -1204,23 +1217,192 @@ class Api(object):
         if progress.len == 0:
             raise CommError("%s is an empty file" % file.name)
         try:
-            response = requests.put(url, data=progress, headers=extra_headers)
-            response.raise_for_status()
+            if self.use_upload_parts(progress.len):
+                response = self._upload_file_parts(
+                    url, file.name, progress.len, callback, extra_headers
+                )
+            if response is None:
+                response = self._upload_session(url).put(
+                    url, data=progress, headers=extra_headers
+                )
+                response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error("upload_file exception {} {}".format(url, e))
-            status_code = e.response.status_code if e.response != None else 0
             # We need to rewind the file for the next retry (the file passed in is seeked to 0)
             progress.rewind()
             # Retry errors from cloud storage or local network issues
-            if status_code in (308, 408, 409, 429, 500, 502, 503, 504) or isinstance(
-                e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
-            ):
+            if self._upload_error_is_transient(e):
                 util.sentry_reraise(retry.TransientException(exc=e))
             else:
                 util.sentry_reraise(e)
 
         return response
 
+    def _upload_error_is_transient(self, e):
+        status_code = e.response.status_code if e.response != None else 0
+        return status_code in (308, 408, 409, 429, 500, 502, 503, 504) or isinstance(
+            e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+        )
+
+    def use_upload_parts(self, size):
+        """Whether a file of size bytes is uploaded in parts"""
+        part_size = env.get_upload_part_size(env=self._environ)
+        return bool(part_size) and size > part_size
+
+    def _upload_part_size(self):
+        # parts of a resumable upload must be multiples of 256 KiB, except the last
+        align = self.UPLOAD_PART_ALIGN
+        return -(-env.get_upload_part_size(env=self._environ) // align) * align
+
+    def _upload_state_path(self, url, path, size, part_size):
+        # Signed urls change between attempts, the object they point to doesn't
+        key = "\n".join(
+            [
+                url.split("?")[0],
+                os.path.abspath(path),
+                str(size),
+                str(os.path.getmtime(path)),
+                str(part_size),
+            ]
+        )
+        return os.path.join(
+            self.default_settings.get("_sync_dir") or wandb_dir(),
+            "uploads",
+            hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json",
+        )
+
+    def _upload_file_parts(self, url, path, size, callback=None, extra_headers={}):
+        """Uploads a file in parts through a resumable upload session
+
+        The session is started with a POST to url, then each part of
+        WANDB_UPLOAD_PART_SIZE bytes is PUT to the session with a Content-Range
+        header and retried on its own.  The session url is recorded in a state
+        file in the run directory, so an upload that fails or is interrupted
+        asks the storage how much it has and sends the rest.
+
+        Returns:
+            The requests library response object of the last part, or None if
+            url won't start a resumable session and the file has to be PUT whole
+        """
+        part_size = self._upload_part_size()
+        state_path = self._upload_state_path(url, path, size, part_size)
+        session = self._upload_session(url)
+        session_url = None
+        if os.path.exists(state_path):
+            try:
+                with open(state_path) as f:
+                    session_url = json.load(f)["session_url"]
+            except (IOError, ValueError, KeyError, TypeError):
+                logger.warning("Ignoring invalid upload state %s", state_path)
+        offset = None
+        if session_url:
+            offset, response = self._upload_session_offset(session, session_url, size)
+        if offset is None:
+            # no session yet, or it expired
+            headers = dict(extra_headers)
+            headers.update({"x-goog-resumable": "start", "Content-Length": "0"})
+            response = session.post(url, headers=headers, allow_redirects=False)
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                if self._upload_error_is_transient(e):
+                    raise
+                # the signed url doesn't allow starting a resumable session
+                logger.info("Resumable upload of %s rejected: %s", path, e)
+                return None
+            session_url = response.headers["Location"]
+            util.mkdir_exists_ok(os.path.dirname(state_path))
+            with open(state_path, "w") as f:
+                json.dump({"session_url": session_url}, f)
+            offset = 0
+        uploaded = [offset]
+
+        def progress(bites):
+            uploaded[0] += bites
+            if callback:
+                callback(bites, uploaded[0])
+
+        attempt = 0
+        while offset < size:
+            length = min(part_size, size - offset)
+            headers = {
+                "Content-Range": "bytes %d-%d/%d" % (offset, offset + length - 1, size)
+            }
+            data = PartProgress(
+                path, offset, length, callback=lambda bites, _: progress(bites)
+            )
+            try:
+                response = session.put(
+                    session_url, data=data, headers=headers, allow_redirects=False
+                )
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                progress(-data.bytes_read)
+                if (
+                    attempt >= self.UPLOAD_PART_RETRIES
+                    or not self._upload_error_is_transient(e)
+                ):
+                    raise
+                logger.info("Retrying part at %s of %s: %s", offset, path, e)
+                time.sleep(self.UPLOAD_PART_RETRY_SLEEP * 2 ** attempt)
+                attempt += 1
+                continue
+            finally:
+                data.close()
+            attempt = 0
+            # the storage may keep less than a whole part, resend the rest
+            committed = self._upload_committed(response, size)
+            if committed < offset + data.bytes_read:
+                progress(committed - offset - data.bytes_read)
+            offset = committed
+        os.remove(state_path)
+        return response
+
+    def _upload_session_offset(self, session, session_url, size):
+        """Asks the storage how many bytes of a resumable upload it has
+
+        Returns:
+            The number of bytes, or None when the session is gone, and the
+            requests library response object
+        """
+        response = session.put(
+            session_url,
+            headers={"Content-Length": "0", "Content-Range": "bytes */%i" % size},
+            allow_redirects=False,
+        )
+        if response.status_code in (404, 410):
+            return None, response
+        response.raise_for_status()
+        return self._upload_committed(response, size), response
+
+    def _upload_committed(self, response, size):
+        # 308 Resume Incomplete carries the range the storage has so far,
+        # anything else means the upload is complete
+        if response.status_code != 308:
+            return size
+        committed = response.headers.get("Range")
+        if not committed:
+            return 0
+        return int(committed.split("-")[-1]) + 1
+
+    def _upload_session(self, url):
+        """Returns the session shared by all uploads to the host of url
+
+        Reusing pooled connections saves a TCP and TLS handshake per file.
+        """
+        host = six.moves.urllib.parse.urlparse(url).netloc
+        with self._upload_sessions_lock:
+            session = self._upload_sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.UPLOAD_POOL_MAXSIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._upload_sessions[host] = session
+        return session
+
     @normalize_exceptions
     def register_agent(self, host, sweep_id=None, project_name=None, entity=None):
         """Register a new agent
@@ -1455,7 +1637,7 @@ class Api(object):
     def file_current(self, fname, md5):
         """Checksum a file and compare the md5 with the known md5
         """
-        return os.path.isfile(fname) and util.md5_file(fname) == md5
+        return os.path.isfile(fname) and digest_cache.md5_file_b64(fname) == md5
 
     @normalize_exceptions
     def pull(self, project, run=None, entity=None):
@@ -1626,6 +1808,37 @@ class Api(object):
             return response["useArtifact"]["artifact"]
         return None
 
+    def artifact_manifest_json(self, artifact_id):
+        """Fetch the manifest of an artifact
+
+        Args:
+            artifact_id (str): The id of the artifact
+
+        Returns:
+            The contents of its wandb_manifest.json, or None if it has none
+        """
+        query = gql(
+            """
+        query ArtifactManifestByID($artifactID: ID!) {
+            artifact(id: $artifactID) {
+                currentManifest {
+                    id
+                    file {
+                        id
+                        directUrl
+                    }
+                }
+            }
+        }
+        """
+        )
+        response = self.gql(query, variable_values={"artifactID": artifact_id})
+        artifact = response["artifact"]
+        if not artifact or not artifact["currentManifest"]:
+            return None
+        _, resp = self.download_file(artifact["currentManifest"]["file"]["directUrl"])
+        return resp.json()
+
     def create_artifact_type(
         self, artifact_type_name, entity_name=None, project_name=None, description=None
     ):
@@ -56,6 +56,12 @@ class RecordLoopThread(ExceptionThread):
             try:
                 record = self._input_record_q.get(timeout=1)
             except queue.Empty:
+                self._debounce()
                 continue
             self._process(record)
+            self._debounce()
         self._finish()
+
+    def _debounce(self):
+        """Hook called between records and on idle timeouts."""
+        pass
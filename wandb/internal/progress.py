@@ -58,3 +58,37 @@ class Progress(object):
         return bites
 
     next = __next__
+
+
+class PartProgress(object):
+    """Progress of reading one byte range of a file, for part uploads"""
+
+    def __init__(self, path, offset, length, callback=None):
+        self.file = open(path, "rb")
+        self.file.seek(offset)
+        if callback is None:
+
+            def callback(bites, total):
+                return (bites, total)
+
+        self.callback = callback
+        self.bytes_read = 0
+        self.len = length
+
+    def read(self, size=-1):
+        remaining = self.len - self.bytes_read
+        if size < 0 or size > remaining:
+            size = remaining
+        bites = self.file.read(size)
+        if not bites and remaining:
+            raise CommError(
+                "File {} size shrank while it was being uploaded.".format(
+                    self.file.name
+                )
+            )
+        self.bytes_read += len(bites)
+        self.callback(len(bites), self.bytes_read)
+        return bites
+
+    def close(self):
+        self.file.close()
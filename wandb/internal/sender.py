@@ -15,7 +15,7 @@ import wandb
 from wandb import util
 from wandb.filesync.dir_watcher import DirWatcher
 from wandb.interface import interface
-from wandb.lib import config_util, filenames, proto_util
+from wandb.lib import config_util, filenames, proto_util, redirect
 from wandb.lib.git import GitRepo
 from wandb.proto import wandb_internal_pb2  # type: ignore
 
@@ -33,8 +33,12 @@ logger = logging.getLogger(__name__)
 
 
 class SendManager(object):
+
+    # minimum number of seconds between rewrites of the full summary
+    SUMMARY_FLUSH_SECONDS = 5
+
     def __init__(
-        self, settings, record_q, result_q, interface,
+        self, settings, record_q, result_q, interface, environ=os.environ,
     ):
         self._settings = settings
         self._record_q = record_q
@@ -44,6 +48,8 @@ class SendManager(object):
         self._fs = None
         self._pusher = None
         self._dir_watcher = None
+        # counters of the file stream, once the run is finished
+        self.file_stream_stats = None
 
         # State updated by login
         self._entity = None
@@ -70,7 +76,7 @@ class SendManager(object):
         # State added when run_exit is complete
         self._exit_result = None
 
-        self._api = internal_api.Api(default_settings=settings)
+        self._api = internal_api.Api(default_settings=settings, environ=environ)
         self._api_settings = dict()
 
         # TODO(jhr): do something better, why do we need to send full lines?
@@ -78,6 +84,11 @@ class SendManager(object):
 
         self._exit_code = 0
 
+        # consolidated summary, updated from summary deltas sent by the handler
+        self._consolidated_summary = dict()
+        self._summary_dirty = False
+        self._summary_flush_time = 0
+
     def send(self, record):
         record_type = record.WhichOneof("record_type")
         assert record_type
@@ -190,8 +201,8 @@ class SendManager(object):
             # NOTE: this is handled in handler.py:handle_request_defer()
             pass
         elif state == defer.FLUSH_SUM:
-            # NOTE: this is handled in handler.py:handle_request_defer()
-            pass
+            # NOTE: the final summary is sent by handler.py:handle_request_defer()
+            self._flush_summary()
         elif state == defer.FLUSH_DIR:
             if self._dir_watcher:
                 self._dir_watcher.finish()
@@ -203,6 +214,7 @@ class SendManager(object):
             if self._fs:
                 # TODO(jhr): now is a good time to output pending output lines
                 self._fs.finish(self._exit_code)
+                self.file_stream_stats = self._fs.stats()
                 self._fs = None
         elif state == defer.FLUSH_FINAL:
             self._interface.publish_final()
@@ -486,17 +498,50 @@ class SendManager(object):
         history_dict = proto_util.dict_from_proto_list(history.item)
         self._save_history(history_dict)
 
+    def send_history_batch(self, records):
+        """Sends the rows of consecutive history records in one push."""
+        if not self._fs:
+            return
+        rows = [proto_util.json_from_proto_list(r.history.item) for r in records]
+        self._fs.push_many(filenames.HISTORY_FNAME, rows)
+
     def send_summary(self, data):
-        summary_dict = proto_util.dict_from_proto_list(data.summary.update)
-        json_summary = json.dumps(summary_dict)
+        summary = data.summary
+        for item in summary.update:
+            self._consolidated_summary[item.key] = json.loads(item.value_json)
+        for item in summary.remove:
+            self._consolidated_summary.pop(item.key, None)
+        self._summary_dirty = True
+        if time.time() - self._summary_flush_time >= self.SUMMARY_FLUSH_SECONDS:
+            self._flush_summary()
+
+    def _flush_summary(self):
+        """Write the consolidated summary to disk and push it to the file stream.
+
+        Summary records only carry the keys that changed, so the full summary
+        is serialized here at most every SUMMARY_FLUSH_SECONDS (see debounce())
+        and when the run is finishing.
+        """
+        if not self._summary_dirty:
+            return
+        self._summary_dirty = False
+        self._summary_flush_time = time.time()
+        json_summary = json.dumps(self._consolidated_summary)
         if self._fs:
             self._fs.push(filenames.SUMMARY_FNAME, json_summary)
-        # TODO(jhr): we should only write this at the end of the script
         summary_path = os.path.join(self._settings.files_dir, filenames.SUMMARY_FNAME)
         with open(summary_path, "w") as f:
             f.write(json_summary)
         self._save_file(filenames.SUMMARY_FNAME)
 
+    def debounce(self):
+        """Called periodically by the sender thread to flush coalesced state."""
+        if (
+            self._summary_dirty
+            and time.time() - self._summary_flush_time >= self.SUMMARY_FLUSH_SECONDS
+        ):
+            self._flush_summary()
+
     def send_stats(self, data):
         stats = data.stats
         if stats.stats_type != wandb_internal_pb2.StatsRecord.StatsType.SYSTEM:
@@ -524,22 +569,17 @@ class SendManager(object):
         if out.output_type == wandb_internal_pb2.OutputRecord.OutputType.STDERR:
             stream = "stderr"
             prepend = "ERROR "
-        line = out.line
-        if not line.endswith("\n"):
-            self._partial_output.setdefault(stream, "")
-            self._partial_output[stream] += line
-            # TODO(jhr): how do we make sure this gets flushed?
-            # we might need this for other stuff like telemetry
-        else:
-            # TODO(jhr): use time from timestamp proto
-            # TODO(jhr): do we need to make sure we write full lines?
-            # seems to be some issues with line breaks
-            cur_time = time.time()
-            timestamp = datetime.utcfromtimestamp(cur_time).isoformat() + " "
-            prev_str = self._partial_output.get(stream, "")
-            line = u"{}{}{}{}".format(prepend, timestamp, prev_str, line)
-            self._fs.push(filenames.OUTPUT_FNAME, line)
-            self._partial_output[stream] = ""
+        line = self._partial_output.pop(stream, "") + out.line
+        # an unfinished line is pushed as it is so far and again with what
+        # follows it, the file stream rewrites it in place until it's done
+        partial = line.rpartition("\n")[2]
+        if partial:
+            self._partial_output[stream] = redirect.erase_carriage_returns(partial)
+        # TODO(jhr): use time from timestamp proto
+        cur_time = time.time()
+        timestamp = datetime.utcfromtimestamp(cur_time).isoformat() + " "
+        line = u"{}{}{}".format(prepend, timestamp, line)
+        self._fs.push(filenames.OUTPUT_FNAME, line)
 
     def send_config(self, data):
         cfg = data.config
@@ -574,12 +614,24 @@ class SendManager(object):
 
     def send_artifact(self, data):
         artifact = data.artifact
+        manifest_file_path = None
+        if artifact.manifest.manifest_file_path:
+            # relative to the directory of the .wandb file being sent
+            manifest_file_path = os.path.join(
+                self._settings._sync_dir, artifact.manifest.manifest_file_path
+            )
+            if not os.path.exists(manifest_file_path):
+                raise Exception(
+                    "Manifest file of artifact %s is missing: %s"
+                    % (artifact.name, manifest_file_path)
+                )
         saver = artifacts.ArtifactSaver(
             api=self._api,
             digest=artifact.digest,
             manifest_json=artifacts._manifest_json_from_proto(artifact.manifest),
             file_pusher=self._pusher,
             is_user_created=artifact.user_created,
+            manifest_file_path=manifest_file_path,
         )
 
         metadata = json.loads(artifact.metadata) if artifact.metadata else None
@@ -594,6 +646,7 @@ class SendManager(object):
 
     def finish(self):
         logger.info("shutting down sender")
+        self._flush_summary()
         # if self._tb_watcher:
         #     self._tb_watcher.finish()
         if self._dir_watcher:
@@ -605,4 +658,5 @@ class SendManager(object):
             self._pusher = None
         if self._fs:
             self._fs.finish(self._exit_code)
+            self.file_stream_stats = self._fs.stats()
             self._fs = None
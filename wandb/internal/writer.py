@@ -21,7 +21,10 @@ class WriteManager(object):
         self._ds = None
 
     def open(self):
-        self._ds = datastore.DataStore()
+        self._ds = datastore.DataStore(
+            flush_seconds=self._settings._sync_flush_seconds,
+            flush_records=self._settings._sync_flush_records,
+        )
         self._ds.open_for_write(self._settings.sync_file)
 
     def write(self, record):
@@ -31,8 +34,17 @@ class WriteManager(object):
         record_type = record.WhichOneof("record_type")
         assert record_type
 
+        if record_type == "request":
+            # defer states commit the records written before them
+            self._ds.flush(fsync=bool(self._settings._sync_fsync))
+            return
+
         self._ds.write(record)
 
+    def debounce(self):
+        if self._ds:
+            self._ds.debounce()
+
     def finish(self):
         if self._ds:
             self._ds.close()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Persistent cache of file digests.
+
+Hashing every file of a large artifact each time it is logged is slow, so md5
+digests are kept in a sqlite database in the wandb cache directory.  An entry is
+only used while the path, size, mtime and inode of the file all still match the
+ones it was computed for.  Files modified in the last few seconds are never
+cached, since a second write within the mtime resolution of the filesystem
+would go unnoticed.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from wandb import env
+from wandb.interface.artifacts import md5_file_b64 as _md5_file_b64
+
+try:
+    import sqlite3
+except ImportError:  # some python builds ship without sqlite
+    sqlite3 = None
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+RACY_SECONDS = 2.0
+# new digests are written in batches
+FLUSH_ENTRIES = 1000
+FLUSH_SECONDS = 1.0
+
+
+def _stat_key(st):
+    mtime_ns = getattr(st, "st_mtime_ns", None)
+    if mtime_ns is None:
+        mtime_ns = int(st.st_mtime * 1e9)
+    return st.st_size, mtime_ns, st.st_ino
+
+
+class DigestCache(object):
+    """md5 digests of files, keyed by (path, size, mtime, inode)."""
+
+    def __init__(self, db_path):
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._pending = {}
+        self._last_flush = time.time()
+
+    def _connect(self):
+        # sqlite connections can't be used across fork()
+        if self._db is not None and self._pid == os.getpid():
+            return self._db
+        self._pid = os.getpid()
+        self._db = None
+        self._pending = {}
+        try:
+            self._db = self._open()
+        except sqlite3.DatabaseError as e:
+            logger.warning("Recreating digest cache %s: %s", self._db_path, e)
+            try:
+                os.remove(self._db_path)
+                self._db = self._open()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Digest cache disabled: %s", e)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Digest cache disabled: %s", e)
+        return self._db
+
+    def _open(self):
+        dirname = os.path.dirname(self._db_path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        db = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+        # losing the last few entries in a crash only costs rehashing them
+        db.execute("PRAGMA synchronous=OFF")
+        if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            db.execute("DROP TABLE IF EXISTS digests")
+            db.execute("PRAGMA user_version=%d" % SCHEMA_VERSION)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS digests (path TEXT PRIMARY KEY, "
+            "size INTEGER, mtime_ns INTEGER, inode INTEGER, md5 TEXT)"
+        )
+        db.commit()
+        return db
+
+    def _execute(self, sql, args=(), commit=False):
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                if commit:
+                    self._flush(db)
+                rows = db.execute(sql, args).fetchall()
+                if commit:
+                    db.commit()
+                return rows
+            except sqlite3.Error as e:
+                logger.warning("Digest cache query failed: %s", e)
+                return None
+
+    def _flush(self, db):
+        if self._pending:
+            rows = list(self._pending.values())
+            self._pending = {}
+            db.executemany(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?)", rows
+            )
+            db.commit()
+        self._last_flush = time.time()
+
+    def flush(self):
+        """Write new digests to the database."""
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                self._pending = {}
+                return
+            try:
+                self._flush(db)
+            except sqlite3.Error as e:
+                logger.warning("Digest cache write failed: %s", e)
+
+    def _lookup(self, path):
+        with self._lock:
+            row = self._pending.get(path)
+        if row is not None:
+            return row[1:]
+        rows = self._execute(
+            "SELECT size, mtime_ns, inode, md5 FROM digests WHERE path = ?", (path,)
+        )
+        return rows[0] if rows else None
+
+    def _store(self, row):
+        with self._lock:
+            self._pending[row[0]] = row
+            full = len(self._pending) >= FLUSH_ENTRIES
+            due = time.time() - self._last_flush > FLUSH_SECONDS
+        if full or due:
+            self.flush()
+
+    def get(self, path, st):
+        """Return the cached digest of path, or None if st doesn't match it."""
+        row = self._lookup(os.path.abspath(path))
+        if row and tuple(row[:3]) == _stat_key(st):
+            return row[3]
+        return None
+
+    def put(self, path, st, digest):
+        """Cache the digest of path, computed from the file as it was at st."""
+        # the file may have changed while it was hashed
+        key = _stat_key(st)
+        unchanged = _stat_key(os.stat(path)) == key
+        if unchanged and time.time() - st.st_mtime > RACY_SECONDS:
+            self._store((os.path.abspath(path),) + key + (digest,))
+
+    def md5_file_b64(self, path):
+        """Return the base64 md5 of path, hashing it only if it changed."""
+        st = os.stat(path)
+        digest = self.get(path, st)
+        if digest is None:
+            digest = _md5_file_b64(path)
+            self.put(path, st, digest)
+        return digest
+
+    def invalidate(self, path=None):
+        """Forget the digest of path, every file below it if it's a directory,
+        or every digest if path is None."""
+        if path is None:
+            with self._lock:
+                self._pending = {}
+            self._execute("DELETE FROM digests", commit=True)
+            return
+        path = os.path.abspath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+        self._execute(
+            "DELETE FROM digests WHERE path = ? OR substr(path, 1, ?) = ?",
+            (path, len(prefix), prefix),
+            commit=True,
+        )
+
+
+class _NoDigestCache(object):
+    def get(self, path, st):
+        return None
+
+    def put(self, path, st, digest):
+        pass
+
+    def md5_file_b64(self, path):
+        return _md5_file_b64(path)
+
+    def flush(self):
+        pass
+
+    def invalidate(self, path=None):
+        pass
+
+
+_digest_cache = None
+
+
+def get_digest_cache():
+    global _digest_cache
+    if _digest_cache is None:
+        if sqlite3 is None:
+            _digest_cache = _NoDigestCache()
+        else:
+            _digest_cache = DigestCache(os.path.join(env.get_cache_dir(), "digests.db"))
+            atexit.register(_digest_cache.flush)
+    return _digest_cache
+
+
+def md5_file_b64(path):
+    return get_digest_cache().md5_file_b64(path)
+
+
+def invalidate(path=None):
+    get_digest_cache().invalidate(path)
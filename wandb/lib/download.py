@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""Resumable file downloads.
+
+A file is downloaded to a ".part" file next to its destination and renamed
+into place once it's complete, so an interrupted download never leaves a
+truncated file behind.  The next download of the file resumes where the last
+one stopped with an HTTP Range request.  Large files are downloaded in several
+ranges at once.  Files downloaded in one piece are checked against their md5
+as they are written, files downloaded in ranges once they are complete.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from wandb.lib import filesystem, hashing
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+MIN_CHUNK_BYTES = 64 * 1024
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+# files at least this large are downloaded in ranges
+RANGE_MIN_BYTES = 64 * 1024 * 1024
+RANGE_BYTES = 16 * 1024 * 1024
+RANGE_CONCURRENCY = 4
+RETRIES = 3
+RETRY_SLEEP = 1.0
+PART_SUFFIX = ".part"
+
+
+class _NoRangeSupport(Exception):
+    pass
+
+
+class _IncompleteRange(Exception):
+    pass
+
+
+_TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+    _IncompleteRange,
+)
+
+
+def chunk_size(size):
+    """Returns the read size for a file of size bytes, larger for larger files."""
+    if not size:
+        return MIN_CHUNK_BYTES
+    return max(MIN_CHUNK_BYTES, min(MAX_CHUNK_BYTES, size // 16))
+
+
+def download_file(
+    session, url, path, size=None, md5=None, check_response=None, **kwargs
+):
+    """Downloads url to path.
+
+    Arguments:
+        session: the requests.Session to download with.
+        url: the url of the file.
+        path: where to write the file, it's replaced once it's complete.
+        size: the size of the file, if it's known.
+        md5: the base64 md5 of the file, a mismatch raises ValueError.
+        check_response: called with the first response before anything is
+            written, it may raise to stop the download.
+        kwargs: passed to session.get, e.g. auth.
+
+    Returns:
+        path
+    """
+    part_path = path + PART_SUFFIX
+    state_path = part_path + ".json"
+    f = _open_part(part_path)
+    try:
+        if os.path.isfile(path) and (size is None or os.path.getsize(path) == size):
+            # someone else finished it while we waited
+            if not os.fstat(f.fileno()).st_size:
+                os.remove(part_path)
+            return path
+
+        written = digest = None
+        if size is not None and size >= RANGE_MIN_BYTES:
+            try:
+                _download_ranges(
+                    session, url, part_path, state_path, size, check_response, kwargs
+                )
+                written = size
+            except _NoRangeSupport:
+                logger.info("%s doesn't support ranges, downloading it whole", url)
+                check_response = None
+                f.seek(0)
+                f.truncate()
+                _remove(state_path)
+        if written is None:
+            written, hasher = _download_stream(
+                session, url, f, size, check_response, kwargs
+            )
+            digest = base64.b64encode(hasher.digest()).decode("ascii")
+        elif md5 is not None:
+            digest = hashing.md5_file_b64(part_path, size)
+
+        if size is not None and written != size:
+            raise ValueError(
+                "Size mismatch for url %s: expected %s bytes but got %s"
+                % (url, size, written)
+            )
+        if md5 is not None and digest != md5:
+            raise ValueError(
+                "Digest mismatch for url %s: expected %s but found %s"
+                % (url, md5, digest)
+            )
+        if fcntl is None:
+            # windows can't rename open files, and there is no lock to hold
+            f.close()
+        filesystem.replace_file(part_path, path)
+        _remove(state_path)
+        return path
+    except ValueError:
+        # a bad file can't be resumed
+        _remove(part_path)
+        _remove(state_path)
+        raise
+    finally:
+        f.close()
+
+
+def _open_part(part_path):
+    """Opens the part file, waiting for any other download of it to finish."""
+    flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    while True:
+        fd = os.open(part_path, flags, 0o644)
+        if fcntl is None:
+            return os.fdopen(fd, "r+b")
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            # the download we waited for renamed the file we opened
+            if os.fstat(fd).st_ino == os.stat(part_path).st_ino:
+                return os.fdopen(fd, "r+b")
+        except OSError:
+            pass
+        os.close(fd)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _retry_sleep(attempt, url, e):
+    if attempt >= RETRIES:
+        raise e
+    logger.info("Retrying download of %s: %s", url, e)
+    time.sleep(RETRY_SLEEP * 2 ** attempt)
+
+
+def _download_stream(session, url, f, size, check_response, kwargs):
+    """Downloads url into f in one piece, resuming after the bytes already in f.
+
+    Returns:
+        The size of the file and a hashlib md5 of its contents
+    """
+    hasher = hashlib.md5()
+    f.seek(0)
+    offset = 0
+    while True:
+        data = f.read(MAX_CHUNK_BYTES)
+        if not data:
+            break
+        hasher.update(data)
+        offset += len(data)
+    if size is not None and offset > size:
+        hasher = hashlib.md5()
+        offset = 0
+        f.seek(0)
+        f.truncate()
+    if size is not None and offset == size:
+        return offset, hasher
+
+    attempt = 0
+    while True:
+        headers = {"Range": "bytes=%d-" % offset} if offset else {}
+        try:
+            response = session.get(url, stream=True, headers=headers, **kwargs)
+            try:
+                response.raise_for_status()
+                if check_response is not None:
+                    check_response(response)
+                    check_response = None
+                if offset and response.status_code != 206:
+                    # the server ignored the range, start over
+                    hasher = hashlib.md5()
+                    offset = 0
+                    f.seek(0)
+                    f.truncate()
+                f.seek(offset)
+                for data in response.iter_content(chunk_size=chunk_size(size)):
+                    f.write(data)
+                    hasher.update(data)
+                    offset += len(data)
+            finally:
+                response.close()
+            break
+        except _TRANSIENT_ERRORS as e:
+            _retry_sleep(attempt, url, e)
+            attempt += 1
+    f.flush()
+    return offset, hasher
+
+
+def _download_range(
+    session, url, part_path, start, length, size, check_response, kwargs
+):
+    """Downloads one range of url into its place in the part file, with retries."""
+    headers = {"Range": "bytes=%d-%d" % (start, start + length - 1)}
+    attempt = 0
+    while True:
+        try:
+            response = session.get(url, stream=True, headers=headers, **kwargs)
+            try:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise _NoRangeSupport()
+                check_response(response)
+                written = 0
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for data in response.iter_content(chunk_size=chunk_size(size)):
+                        f.write(data[: length - written])
+                        written += len(data)
+            finally:
+                response.close()
+            if written < length:
+                raise _IncompleteRange(
+                    "Range %d-%d of %s is incomplete" % (start, start + length, url)
+                )
+            return
+        except _TRANSIENT_ERRORS as e:
+            _retry_sleep(attempt, url, e)
+            attempt += 1
+
+
+def _download_ranges(session, url, part_path, state_path, size, check_response, kwargs):
+    """Downloads url into the part file in ranges, several at a time.
+
+    Finished ranges are recorded in a state file next to the part file, a
+    download that is interrupted resumes with the ranges that are missing.
+    """
+    from multiprocessing.pool import ThreadPool
+
+    ranges = [
+        (start, min(RANGE_BYTES, size - start)) for start in range(0, size, RANGE_BYTES)
+    ]
+    done = set()
+    if os.path.exists(state_path):
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            if state["size"] == size:
+                done = set(state["ranges"]) & set(start for start, _ in ranges)
+        except (IOError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring invalid download state %s", state_path)
+    if os.path.getsize(part_path) != size:
+        with open(part_path, "r+b") as f:
+            f.truncate(size)
+    todo = [r for r in ranges if r[0] not in done]
+    lock = threading.Lock()
+    checked = [check_response is None]
+    failed = threading.Event()
+
+    def check_once(response):
+        with lock:
+            if not checked[0]:
+                check_response(response)
+                checked[0] = True
+
+    def download_range(r):
+        start, length = r
+        if failed.is_set():
+            return
+        _download_range(
+            session, url, part_path, start, length, size, check_once, kwargs
+        )
+        with lock:
+            done.add(start)
+            with open(state_path, "w") as f:
+                json.dump({"size": size, "ranges": sorted(done)}, f)
+
+    pool = ThreadPool(min(RANGE_CONCURRENCY, len(todo)) or 1)
+    try:
+        for _ in pool.imap_unordered(download_range, todo):
+            pass
+    except Exception:
+        # let the ranges in flight finish, so they are recorded
+        failed.set()
+        raise
+    finally:
+        pool.close()
+        pool.join()
@@ -1,5 +1,8 @@
 import errno
 import os
+import shutil
+import stat
+import threading
 
 
 def _safe_makedirs(dir_name):
@@ -12,3 +15,88 @@ def _safe_makedirs(dir_name):
         raise Exception("not dir")
     if not os.access(dir_name, os.W_OK):
         raise Exception("cant write: {}".format(dir_name))
+
+
+# ioctl(dst, FICLONE, src) makes dst share the data blocks of src on copy on
+# write filesystems like btrfs and xfs, see ioctl_ficlone(2)
+_FICLONE = 0x40049409
+
+LINK_MODES = ("copy", "reflink", "hardlink")
+
+
+def _reflink(src, dst):
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            import fcntl
+
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return "reflink"
+        except (ImportError, IOError, OSError):
+            pass
+        copy_file_range = getattr(os, "copy_file_range", None)
+        if copy_file_range is not None:
+            # copies inside the kernel, or on the server for NFS and SMB
+            try:
+                while copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+                return "copy_file_range"
+            except OSError:
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+        return "copy"
+
+
+def replace_file(src, dst):
+    """Renames src to dst, replacing dst if it exists."""
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(src, dst)
+        return
+    # python 2
+    if os.name == "nt" and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+def copy_file(src, dst, mode="reflink", preserve_stat=False, read_only=False):
+    """Copy src to dst as cheaply as mode allows, returns the method used.
+
+    "hardlink" links dst to src when they are on the same filesystem, so both
+    names refer to one file: writing to either changes the other, and so does
+    changing its permissions.  Only use it when src isn't modified in place,
+    read_only takes the write permissions off a linked file so it can't be
+    changed through dst either.  "reflink" clones src where the filesystem
+    supports it, otherwise copies it in the kernel.  Both fall back to a
+    regular copy, which is what "copy" always does.  dst is replaced
+    atomically.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError("Invalid link mode %s, must be one of %s" % (mode, LINK_MODES))
+    tmp = "%s.tmp%d-%d" % (dst, os.getpid(), threading.current_thread().ident)
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(src, tmp)
+                if read_only:
+                    writable = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+                    os.chmod(tmp, stat.S_IMODE(os.stat(tmp).st_mode) & ~writable)
+                replace_file(tmp, dst)
+                return "hardlink"
+            except OSError:
+                # never write through a link to src
+                if os.path.lexists(tmp):
+                    os.remove(tmp)
+        if mode == "copy":
+            shutil.copyfile(src, tmp)
+            method = "copy"
+        else:
+            method = _reflink(src, tmp)
+        if preserve_stat:
+            shutil.copystat(src, tmp)
+        replace_file(tmp, dst)
+        return method
+    finally:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Parallel file hashing.
+
+Large files are hashed by a thread pool reading big buffers, hashlib releases
+the GIL while it digests them so the threads use as many cores as the disks
+can feed.  Hashing many small files is dominated by per-file python overhead
+under the GIL, so those are handed to a process pool in batches.  Digests of
+unchanged files come from the digest cache and aren't recomputed.
+"""
+
+import base64
+import hashlib
+import multiprocessing
+from multiprocessing.pool import Pool, ThreadPool
+import os
+import stat
+import time
+
+from wandb.lib import digest_cache
+
+
+READ_BUFFER_BYTES = 1024 * 1024
+# files below this size count as small
+SMALL_FILE_BYTES = 1024 * 1024
+# a process pool is only worth starting for at least this many small files
+PROCESS_MIN_FILES = 2000
+PROCESS_BATCH_FILES = 256
+MAX_WORKERS = 32
+
+
+def md5_file_b64(path, size=None):
+    hash_md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        if size is not None and size < READ_BUFFER_BYTES:
+            hash_md5.update(f.read())
+        else:
+            buf = bytearray(READ_BUFFER_BYTES)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hash_md5.update(view[:n])
+    return base64.b64encode(hash_md5.digest()).decode("ascii")
+
+
+def _md5_files_b64(files):
+    return [md5_file_b64(path, size) for path, size in files]
+
+
+def walk_files(root):
+    """Yield (path, stat) for every file below root, following symlinks."""
+    scandir = getattr(os, "scandir", None)
+    if scandir is None:  # python 2
+        for dirpath, _, filenames in os.walk(root, followlinks=True):
+            for fname in filenames:
+                path = os.path.join(dirpath, fname)
+                yield path, os.stat(path)
+        return
+    stack = [root]
+    while stack:
+        dirs = []
+        for entry in scandir(stack.pop()):
+            try:
+                st = entry.stat()
+            except OSError:  # a broken symlink
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                dirs.append(entry.path)
+            elif stat.S_ISREG(st.st_mode):
+                yield entry.path, st
+        stack.extend(reversed(dirs))
+
+
+def _start_method():
+    get_start_method = getattr(multiprocessing, "get_start_method", None)
+    if get_start_method is None:  # python 2
+        return "fork" if os.name == "posix" else "spawn"
+    # allow_none keeps the start method unset, the program can still set it
+    method = get_start_method(allow_none=True)
+    return method or multiprocessing.get_all_start_methods()[0]
+
+
+def _context():
+    # pools made without a context would fix the default start method
+    get_context = getattr(multiprocessing, "get_context", None)
+    return get_context(_start_method()) if get_context else multiprocessing
+
+
+class _ThreadPool(ThreadPool):
+    def __init__(self, processes):
+        if hasattr(multiprocessing, "get_context"):
+            Pool.__init__(self, processes, context=_context())
+        else:
+            ThreadPool.__init__(self, processes)
+
+
+def _cpu_count():
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+class FileHasher(object):
+    """Hash many files at once.
+
+    Arguments:
+        workers: threads or processes to use, defaults to the number of cpus.
+        use_processes: None picks a process pool for many small files, False
+            always uses threads.
+    """
+
+    def __init__(self, workers=None, use_processes=None):
+        self._workers = workers or min(_cpu_count(), MAX_WORKERS)
+        self._use_processes = use_processes
+        self.bytes_hashed = 0
+        self.seconds = 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_hashed / self.seconds if self.seconds else 0.0
+
+    def md5_files_b64(self, files):
+        """Return {path: base64 md5} for a list of (path, stat) pairs."""
+        start = time.time()
+        cache = digest_cache.get_digest_cache()
+        digests = {}
+        small, large = [], []
+        for path, st in files:
+            digest = cache.get(path, st)
+            if digest is not None:
+                digests[path] = digest
+            elif st.st_size < SMALL_FILE_BYTES:
+                small.append((path, st))
+            else:
+                large.append((path, st))
+
+        batches = []
+        if self._processes_for(len(small)):
+            for i in range(0, len(small), PROCESS_BATCH_FILES):
+                batches.append(small[i : i + PROCESS_BATCH_FILES])  # noqa: E203
+            small = []
+        # largest files first, so one big file doesn't finish last
+        large.sort(key=lambda f: -f[1].st_size)
+        todo = large + small
+
+        pool = process_pool = None
+        try:
+            if batches:
+                # forked before the hashing threads start
+                process_pool = _context().Pool(min(self._workers, len(batches)))
+            pool = _ThreadPool(max(1, min(self._workers, len(todo))))
+            results = pool.imap_unordered(
+                lambda f: (f, md5_file_b64(f[0], f[1].st_size)), todo, chunksize=16
+            )
+            if batches:
+                batch_results = process_pool.imap(
+                    _md5_files_b64, [[(p, st.st_size) for p, st in b] for b in batches]
+                )
+                for batch, batch_digests in zip(batches, batch_results):
+                    for (path, st), digest in zip(batch, batch_digests):
+                        self._add(cache, digests, path, st, digest)
+            for (path, st), digest in results:
+                self._add(cache, digests, path, st, digest)
+        finally:
+            if pool is not None:
+                pool.terminate()
+            if process_pool is not None:
+                process_pool.terminate()
+        cache.flush()
+        self.seconds += time.time() - start
+        return digests
+
+    def _processes_for(self, num_small):
+        if self._use_processes is not None:
+            return self._use_processes
+        if num_small < PROCESS_MIN_FILES or self._workers < 2:
+            return False
+        # spawned workers would rerun scripts without a __main__ guard
+        return _start_method() == "fork"
+
+    def _add(self, cache, digests, path, st, digest):
+        cache.put(path, st, digest)
+        digests[path] = digest
+        self.bytes_hashed += st.st_size
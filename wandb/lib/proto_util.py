@@ -1,4 +1,5 @@
 import json
+from json.encoder import encode_basestring_ascii
 
 
 def dict_from_proto_list(obj_list):
@@ -6,3 +7,16 @@ def dict_from_proto_list(obj_list):
     for item in obj_list:
         d[item.key] = json.loads(item.value_json)
     return d
+
+
+def json_from_proto_list(obj_list):
+    """Returns the json of dict_from_proto_list, without decoding the values."""
+    keys = [item.key for item in obj_list]
+    if len(set(keys)) == len(keys):
+        data = "{%s}" % ", ".join(
+            "%s: %s" % (encode_basestring_ascii(item.key), item.value_json)
+            for item in obj_list
+        )
+        if "\n" not in data:
+            return data
+    return json.dumps(dict_from_proto_list(obj_list))
@@ -3,12 +3,15 @@
 util/redirect.
 """
 
+import codecs
 import io
 import logging
 import os
 import sys
 import threading
 
+import six
+
 
 logger = logging.getLogger("wandb")
 
@@ -135,6 +138,139 @@ def _pipe_relay(stopped, fd, name, cb, tee, output_writer):
     logger.info("relay done done: %s", name)
 
 
+def erase_carriage_returns(line):
+    """Return what a terminal shows for a line rewritten with carriage returns.
+
+    A trailing carriage return is kept, it either overwrites the line with the
+    next write or is the first half of a CRLF line ending.
+    """
+    return line[line.rfind("\r", 0, len(line) - 1) + 1 :]  # noqa: E203
+
+
+class OutputCoalescer(object):
+    """Console callback wrapper that batches output into time windows.
+
+    Output is buffered in arrival order and passed on to cb every window
+    seconds as whole lines, with lines rewritten by carriage returns (progress
+    bars) collapsed to their final state.  An unfinished line is passed on as
+    it is whenever it changed since the last window, and what follows it on
+    the same stream starts with a carriage return so it replaces it.  If
+    max_bytes_per_second is set, lines over the budget of a window are dropped
+    and replaced by a single summary line.
+    """
+
+    WINDOW_SECONDS = 0.5
+
+    def __init__(self, cb, window, max_bytes_per_second=None):
+        self._cb = cb
+        self._window = window
+        self._budget = (
+            int(max_bytes_per_second * window) if max_bytes_per_second else None
+        )
+        self._lock = threading.Lock()
+        # [name, text] of whole lines, consecutive output of a stream merged
+        self._lines = []
+        self._partial = {}
+        # the unfinished line of each stream as it was last passed on
+        self._sent_partial = {}
+        self._decoders = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop)
+        self._thread.name = "OutputCoalescer"
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __call__(self, name, data):
+        if isinstance(data, six.binary_type):
+            # the pipe relay can split multi-byte characters between reads
+            decoder = self._decoders.get(name)
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                self._decoders[name] = decoder
+            data = decoder.decode(data)
+        with self._lock:
+            head, sep, tail = (self._partial.get(name, "") + data).rpartition("\n")
+            if sep:
+                if self._lines and self._lines[-1][0] == name:
+                    self._lines[-1][1] += head + sep
+                else:
+                    self._lines.append([name, head + sep])
+            if "\r" in tail:
+                # only the last rewrite of an unfinished line can still show up
+                tail = erase_carriage_returns(tail)
+            self._partial[name] = tail
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self._window):
+            self.flush()
+
+    def flush(self, final=False):
+        with self._lock:
+            pending = self._lines
+            self._lines = []
+            partial = {}
+            for name, text in self._partial.items():
+                if text and text != self._sent_partial.get(name):
+                    partial[name] = text
+            if final:
+                self._partial = {}
+        budget = self._budget
+        for name, text in pending:
+            lines = [line + "\n" for line in text.split("\n")]
+            lines[-1] = lines[-1][:-1]
+            lines = [
+                erase_carriage_returns(line.replace("\r\n", "\n"))
+                if "\r" in line
+                else line
+                for line in lines
+                if line
+            ]
+            if budget is not None:
+                lines, budget = self._limit(lines, budget)
+            self._send(name, "".join(lines))
+        for name in sorted(partial):
+            text = partial[name]
+            if budget is not None:
+                if len(text) > budget:
+                    continue
+                budget -= len(text)
+            self._send(name, text)
+            self._sent_partial[name] = text
+
+    def _send(self, name, text):
+        if not text:
+            return
+        if name in self._sent_partial:
+            # replaces the unfinished line passed on before
+            del self._sent_partial[name]
+            text = "\r" + text
+        try:
+            self._cb(name, text)
+        except Exception:
+            logger.exception("problem in output coalescer")
+
+    def _limit(self, lines, budget):
+        kept = []
+        for i, line in enumerate(lines):
+            if len(line) > budget:
+                dropped = lines[i:]
+                kept.append(
+                    "wandb: dropped {} lines ({} bytes) of console output over the rate limit\n".format(
+                        len(dropped), sum(len(line) for line in dropped)
+                    )
+                )
+                return kept, 0
+            kept.append(line)
+            budget -= len(line)
+        return kept, budget
+
+    def stop(self):
+        """Flush all buffered output, including unfinished lines."""
+        self._stopped.set()
+        self._thread.join()
+        self.flush(final=True)
+
+
 class Redirect(object):
     def __init__(self, src, dest, unbuffered=False, tee=False):
         self._installed = False
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""Shared memory ring buffer transport.
+
+RingBufferQueue is a drop-in replacement for the multiprocessing.Queue used to
+pass records from the user process to the internal process.  Records are
+serialized once in the user process and copied as length prefixed frames into a
+single producer / single consumer ring buffer living in shared memory, so there
+is no pickling and no feeder thread.
+
+The shared region starts with two 64-bit counters: the total number of bytes
+ever read (head) and written (tail).  The producer only ever updates tail and
+the consumer only ever updates head, so no cross process lock is needed.  The
+counters are published with plain stores, which is only safe where the
+hardware keeps stores in order, so the ring buffer is limited to x86.  The
+pid of the consumer follows the counters, so a producer waiting for room
+notices when the consumer died.
+"""
+
+import ctypes
+import logging
+import os
+import platform
+import struct
+import threading
+import time
+
+import psutil  # type: ignore
+from six.moves import queue
+import wandb
+from wandb.proto import wandb_internal_pb2  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+_INDEX = struct.Struct("<QQ")
+_HEADER = struct.Struct("<QQQ")
+_FRAME = struct.Struct("<IB")
+# machines that don't reorder stores, see the module docstring
+_X86_MACHINES = ("x86_64", "amd64", "i386", "i686", "x86")
+
+_FRAME_RECORD = 0
+_FRAME_RECORD_BATCH = 1
+
+_POLL_MIN_SECONDS = 0.0001
+_POLL_MAX_SECONDS = 0.005
+# gets between checks of the fallback queue while the ring buffer is busy
+_FALLBACK_POLL_GETS = 64
+
+
+class RingBufferQueue(object):
+    """Queue-like SPSC ring buffer of serialized records in shared memory.
+
+    Only the process that created the queue writes to the ring buffer.  The
+    internal process publishes records to itself through a private in-process
+    queue.  Any other process, like a forked child of the user process, puts
+    its records on a multiprocessing.Queue.  get() drains all three.
+    """
+
+    DEFAULT_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, ctx, size=None):
+        if platform.machine().lower() not in _X86_MACHINES:
+            raise RuntimeError(
+                "Shared memory ring buffer needs x86, not %s" % platform.machine()
+            )
+        self._size = size or self.DEFAULT_SIZE
+        self._shm = ctx.RawArray(ctypes.c_char, _HEADER.size + self._size)
+        self._producer_pid = os.getpid()
+        self._fallback_q = ctx.Queue()
+        self._init_local()
+
+    def _init_local(self):
+        self._pid = os.getpid()
+        self._buf = memoryview(self._shm).cast("B")
+        self._data = self._buf[_HEADER.size :]  # noqa: E203
+        self._put_lock = threading.Lock()
+        self._local_q = queue.Queue()
+        self._gets = 0
+        self._consumer = False
+
+    def __getstate__(self):
+        return dict(
+            _size=self._size,
+            _shm=self._shm,
+            _producer_pid=self._producer_pid,
+            _fallback_q=self._fallback_q,
+        )
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_local()
+
+    def _check_pid(self):
+        # memoryviews and locks are not valid across fork()
+        if self._pid != os.getpid():
+            self._init_local()
+
+    def _get_index(self):
+        return _INDEX.unpack_from(self._buf, 0)
+
+    def _set_head(self, head):
+        struct.pack_into("<Q", self._buf, 0, head)
+
+    def _set_tail(self, tail):
+        struct.pack_into("<Q", self._buf, 8, tail)
+
+    def _check_consumer(self):
+        pid = struct.unpack_from("<Q", self._buf, 16)[0]
+        if not pid:
+            return  # nothing has read from the ring buffer yet
+        try:
+            alive = psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            alive = False
+        if not alive:
+            raise Exception("The wandb backend process has shutdown")
+
+    def _copy_in(self, pos, data):
+        pos %= self._size
+        first = min(len(data), self._size - pos)
+        self._data[pos : pos + first] = data[:first]  # noqa: E203
+        if first < len(data):
+            self._data[: len(data) - first] = data[first:]
+
+    def _copy_out(self, pos, length):
+        pos %= self._size
+        first = min(length, self._size - pos)
+        if first == length:
+            return self._data[pos : pos + length].tobytes()  # noqa: E203
+        return b"".join(
+            (
+                self._data[pos : pos + first].tobytes(),  # noqa: E203
+                self._data[: length - first],
+            )
+        )
+
+    def put(self, record, block=True, timeout=None):
+        self._check_pid()
+        if self._pid != self._producer_pid:
+            if wandb._IS_INTERNAL_PROCESS:
+                self._local_q.put(record)
+            else:
+                self._fallback_q.put(record, block, timeout)
+            return
+        frame_type = _FRAME_RECORD
+        if isinstance(record, wandb_internal_pb2.RecordBatch):
+            frame_type = _FRAME_RECORD_BATCH
+        payload = record.SerializeToString()
+        frame = memoryview(_FRAME.pack(len(payload), frame_type) + payload)
+        deadline = None
+        if not block:
+            deadline = time.time()
+        elif timeout is not None:
+            deadline = time.time() + timeout
+        with self._put_lock:
+            self._write(frame, deadline)
+
+    def _write(self, frame, deadline=None):
+        # a frame is only started once the ring buffer has room for all of
+        # it, so a put that gives up leaves nothing behind.  Frames larger
+        # than the ring buffer are then written in pieces as the consumer
+        # catches up.
+        need = min(len(frame), self._size)
+        delay = _POLL_MIN_SECONDS
+        while frame:
+            head, tail = self._get_index()
+            free = self._size - (tail - head)
+            if free < need:
+                if deadline is not None and time.time() >= deadline:
+                    raise queue.Full
+                if delay == _POLL_MAX_SECONDS:
+                    self._check_consumer()
+                time.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX_SECONDS)
+                continue
+            delay = _POLL_MIN_SECONDS
+            chunk = frame[:free]
+            self._copy_in(tail, chunk)
+            self._set_tail(tail + len(chunk))
+            frame = frame[len(chunk) :]  # noqa: E203
+            need = 1
+            deadline = None
+
+    def _read(self, start, length):
+        """Read length bytes at start, waiting for a producer still writing."""
+        parts = []
+        delay = _POLL_MIN_SECONDS
+        while length:
+            head, tail = self._get_index()
+            avail = tail - start
+            if not avail:
+                time.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX_SECONDS)
+                continue
+            delay = _POLL_MIN_SECONDS
+            n = min(avail, length)
+            parts.append(self._copy_out(start, n))
+            start += n
+            length -= n
+            self._set_head(start)
+        return b"".join(parts)
+
+    def _get_frame(self):
+        head, tail = self._get_index()
+        avail = tail - head
+        if avail < _FRAME.size:
+            return None
+        length, frame_type = _FRAME.unpack(self._copy_out(head, _FRAME.size))
+        start = head + _FRAME.size
+        if _FRAME.size + length <= avail:
+            payload = self._copy_out(start, length)
+            self._set_head(start + length)
+        elif _FRAME.size + length > self._size:
+            # frame can never fit, consume it as it streams in
+            self._set_head(start)
+            payload = self._read(start, length)
+        else:
+            return None
+        if frame_type == _FRAME_RECORD_BATCH:
+            record = wandb_internal_pb2.RecordBatch()
+        else:
+            record = wandb_internal_pb2.Record()
+        record.ParseFromString(payload)
+        return record
+
+    def get(self, block=True, timeout=None):
+        self._check_pid()
+        if not self._consumer:
+            struct.pack_into("<Q", self._buf, 16, os.getpid())
+            self._consumer = True
+        deadline = None if timeout is None else time.time() + timeout
+        delay = _POLL_MIN_SECONDS
+        while True:
+            try:
+                return self._local_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._gets += 1
+            record = self._get_frame()
+            if record is None or self._gets % _FALLBACK_POLL_GETS == 0:
+                try:
+                    fallback = self._fallback_q.get_nowait()
+                except queue.Empty:
+                    pass
+                else:
+                    if record is not None:
+                        self._local_q.put(record)
+                    return fallback
+            if record is not None:
+                return record
+            if not block or (deadline is not None and time.time() >= deadline):
+                raise queue.Empty
+            time.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self):
+        head, tail = self._get_index()
+        return head == tail and self._local_q.empty() and self._fallback_q.empty()
+
+    def close(self):
+        self._fallback_q.close()
@@ -1,8 +1,10 @@
 # File is generated by: tox -e codemod
+import atexit
+import json
 import re
 import os
+import threading
 import time
-import shutil
 import requests
 from six.moves.urllib.parse import urlparse, quote
 
@@ -10,11 +12,17 @@ from wandb.compat import tempfile as compat_tempfile
 from wandb import env
 from wandb.interface.artifacts import *
 from wandb.internal.progress import Progress
+from wandb.lib import digest_cache, download, filesystem, hashing
 from wandb.apis import InternalApi
 from wandb.errors.error import CommError
 from wandb import util
 from wandb.errors.term import termwarn, termlog
 
+try:
+    import sqlite3
+except ImportError:  # some python builds ship without sqlite
+    sqlite3 = None
+
 # This makes the first sleep 1s, and then doubles it up to total times,
 # which makes for ~18 hours.
 _REQUEST_RETRY_STRATEGY = requests.packages.urllib3.util.retry.Retry(
@@ -28,27 +36,200 @@ _REQUEST_POOL_CONNECTIONS = 64
 _REQUEST_POOL_MAXSIZE = 64
 
 
-class ArtifactsCache(object):
+class _ArtifactsCacheIndex(object):
+    """Size and last access time of every object in the artifacts cache.
+
+    Kept in a sqlite database next to the objects, which several processes can
+    use at once.  Access times are written in batches.
+    """
+
+    FLUSH_ENTRIES = 1000
+    FLUSH_SECONDS = 1.0
+
     def __init__(self, cache_dir):
         self._cache_dir = cache_dir
+        self._db_path = os.path.join(cache_dir, "index.db")
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._pending = {}
+        self._last_flush = time.time()
+
+    def _connect(self):
+        # sqlite connections can't be used across fork()
+        if self._db is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._pending = {}
+            self._db = sqlite3.connect(
+                self._db_path, timeout=60, check_same_thread=False
+            )
+            self._db.execute("PRAGMA synchronous=OFF")
+            new = not self._db.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'objects'"
+            ).fetchall()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS objects "
+                "(path TEXT PRIMARY KEY, size INTEGER, atime REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS atime ON objects (atime)")
+            if new:
+                self._import_objects()
+            self._db.commit()
+        return self._db
+
+    def _import_objects(self):
+        # caches written before there was an index
+        rows = []
+        for dirpath, _, filenames in os.walk(os.path.join(self._cache_dir, "obj")):
+            for fname in filenames:
+                path = os.path.join(dirpath, fname)
+                st = os.stat(path)
+                rows.append(
+                    (
+                        os.path.relpath(path, self._cache_dir),
+                        st.st_size,
+                        max(st.st_atime, st.st_mtime),
+                    )
+                )
+        self._db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?)", rows)
+
+    def _flush(self, db):
+        if self._pending:
+            rows = [(k,) + v for k, v in self._pending.items()]
+            self._pending = {}
+            db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?)", rows)
+            db.commit()
+        self._last_flush = time.time()
+
+    def flush(self):
+        with self._lock:
+            self._flush(self._connect())
+
+    def touch(self, path, size):
+        with self._lock:
+            self._connect()
+            self._pending[os.path.relpath(path, self._cache_dir)] = (size, time.time())
+            due = (
+                len(self._pending) >= self.FLUSH_ENTRIES
+                or time.time() - self._last_flush > self.FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def total_size(self):
+        with self._lock:
+            db = self._connect()
+            self._flush(db)
+            return db.execute("SELECT SUM(size) FROM objects").fetchone()[0] or 0
+
+    def evict(self, target_size, min_age):
+        """Delete least recently used objects down to target_size bytes.
+
+        Objects used or written in the last min_age seconds are kept.  Returns
+        the number of bytes reclaimed.
+        """
+        with self._lock:
+            db = self._connect()
+            self._flush(db)
+            # one process evicts at a time
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                total = db.execute("SELECT SUM(size) FROM objects").fetchone()[0] or 0
+                cutoff = time.time() - min_age
+                reclaimed = 0
+                evicted = []
+                for path, size in db.execute(
+                    "SELECT path, size FROM objects WHERE atime < ? ORDER BY atime",
+                    (cutoff,),
+                ):
+                    if total - reclaimed <= target_size:
+                        break
+                    full_path = os.path.join(self._cache_dir, path)
+                    try:
+                        if os.path.getmtime(full_path) >= cutoff:
+                            continue  # still being written
+                        os.remove(full_path)
+                    except OSError:
+                        pass
+                    evicted.append((path,))
+                    reclaimed += size
+                db.executemany("DELETE FROM objects WHERE path = ?", evicted)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        return reclaimed
+
+
+class ArtifactsCache(object):
+    # after going over max_size the cache is cleaned up to this fraction of it
+    CLEANUP_FRACTION = 0.9
+    # objects accessed this recently may still be in use
+    MIN_EVICT_AGE_SECONDS = 10 * 60
+
+    def __init__(self, cache_dir, max_size=None, link_mode=None):
+        self._cache_dir = cache_dir
+        self.link_mode = link_mode or "reflink"
         util.mkdir_exists_ok(self._cache_dir)
         self._md5_obj_dir = os.path.join(self._cache_dir, "obj", "md5")
         self._etag_obj_dir = os.path.join(self._cache_dir, "obj", "etag")
+        self._max_size = max_size
+        self._index = _ArtifactsCacheIndex(self._cache_dir) if sqlite3 else None
+        self._added_bytes = 0
 
     def check_md5_obj_path(self, b64_md5, size):
         hex_md5 = util.bytes_to_hex(base64.b64decode(b64_md5))
         path = os.path.join(self._cache_dir, "obj", "md5", hex_md5[:2], hex_md5[2:])
-        if os.path.isfile(path) and os.path.getsize(path) == size:
-            return path, True
-        util.mkdir_exists_ok(os.path.dirname(path))
-        return path, False
+        return self._check_obj_path(path, size)
 
     def check_etag_obj_path(self, etag, size):
         path = os.path.join(self._cache_dir, "obj", "etag", etag[:2], etag[2:])
-        if os.path.isfile(path) and os.path.getsize(path) == size:
-            return path, True
-        util.mkdir_exists_ok(os.path.dirname(path))
-        return path, False
+        return self._check_obj_path(path, size)
+
+    def _check_obj_path(self, path, size):
+        hit = os.path.isfile(path) and os.path.getsize(path) == size
+        if not hit:
+            util.mkdir_exists_ok(os.path.dirname(path))
+        if self._index:
+            try:
+                self._index.touch(path, size)
+                if not hit:
+                    self._maybe_cleanup(size)
+            except (sqlite3.Error, OSError) as e:
+                termwarn("Artifacts cache index disabled: %s" % e)
+                self._index = None
+        return path, hit
+
+    def add_file(self, local_path, path):
+        """Populate the object at path, from check_*_obj_path, with local_path."""
+        # never hardlink files the cache doesn't own, editing them would
+        # change the cached object
+        mode = "reflink" if self.link_mode == "hardlink" else self.link_mode
+        filesystem.copy_file(local_path, path, mode)
+
+    def _maybe_cleanup(self, new_bytes):
+        if not self._max_size:
+            return
+        # checking the total takes a query, only do it every few percent
+        self._added_bytes += new_bytes or 0
+        if self._added_bytes < self._max_size * (1 - self.CLEANUP_FRACTION) / 4:
+            return
+        self._added_bytes = 0
+        if self._index.total_size() > self._max_size:
+            self.cleanup(int(self._max_size * self.CLEANUP_FRACTION))
+
+    def size(self):
+        """Total bytes of the objects in the cache."""
+        return self._index.total_size() if self._index else 0
+
+    def cleanup(self, target_size, min_age=None):
+        """Evict least recently used objects until the cache holds at most
+        target_size bytes, returns the number of bytes reclaimed."""
+        if not self._index:
+            return 0
+        if min_age is None:
+            min_age = self.MIN_EVICT_AGE_SECONDS
+        return self._index.evict(target_size, min_age)
 
 
 _artifacts_cache = None
@@ -58,7 +239,14 @@ def get_artifacts_cache():
     global _artifacts_cache
     if _artifacts_cache is None:
         cache_dir = os.path.join(env.get_cache_dir(), "artifacts")
-        _artifacts_cache = ArtifactsCache(cache_dir)
+        max_size = env.get_artifact_cache_max_size()
+        if max_size is not None:
+            max_size = util.from_human_size(max_size)
+        _artifacts_cache = ArtifactsCache(
+            cache_dir, max_size=max_size, link_mode=env.get_artifact_cache_link()
+        )
+        if _artifacts_cache._index:
+            atexit.register(_artifacts_cache._index.flush)
     return _artifacts_cache
 
 
@@ -146,7 +334,7 @@ class Artifact(object):
         entry = ArtifactManifestEntry(
             name,
             None,
-            digest=md5_file_b64(local_path),
+            digest=digest_cache.md5_file_b64(local_path),
             size=os.path.getsize(local_path),
             local_path=local_path,
         )
@@ -164,36 +352,36 @@ class Artifact(object):
         )
         start_time = time.time()
 
-        paths = []
-        for dirpath, _, filenames in os.walk(local_path, followlinks=True):
-            for fname in filenames:
-                physical_path = os.path.join(dirpath, fname)
+        files = list(hashing.walk_files(local_path))
+        hasher = hashing.FileHasher()
+        digests = hasher.md5_files_b64(files)
+        prefix = os.path.join(local_path, "")
+        for physical_path, st in files:
+            # walk_files paths all start with local_path, slicing is much
+            # faster than relpath on large trees
+            if physical_path.startswith(prefix):
+                logical_path = physical_path[len(prefix) :]
+            else:
                 logical_path = os.path.relpath(physical_path, start=local_path)
-                if name is not None:
-                    logical_path = os.path.join(name, logical_path)
-                paths.append((logical_path, physical_path))
-
-        def add_manifest_file(log_phy_path):
-            logical_path, physical_path = log_phy_path
+            if name is not None:
+                logical_path = os.path.join(name, logical_path)
             self._manifest.add_entry(
                 ArtifactManifestEntry(
                     logical_path,
                     None,
-                    digest=md5_file_b64(physical_path),
-                    size=os.path.getsize(physical_path),
+                    digest=digests[physical_path],
+                    size=st.st_size,
                     local_path=physical_path,
                 )
             )
 
-        import multiprocessing.dummy  # this uses threads
-
-        NUM_THREADS = 8
-        pool = multiprocessing.dummy.Pool(NUM_THREADS)
-        pool.map(add_manifest_file, paths)
-        pool.close()
-        pool.join()
-
-        termlog("Done. %.1fs" % (time.time() - start_time), prefix=False)
+        rate = ""
+        if hasher.bytes_hashed:
+            rate = " (hashed %s at %s/s)" % (
+                util.sizeof_fmt(hasher.bytes_hashed),
+                util.sizeof_fmt(hasher.bytes_per_second),
+            )
+        termlog("Done. %.1fs%s" % (time.time() - start_time, rate), prefix=False)
 
     def add_reference(self, uri, name=None, checksum=True, max_objects=None):
         url = urlparse(uri)
@@ -245,7 +433,7 @@ class Artifact(object):
                     entry.digest, entry.size
                 )
                 if not hit:
-                    shutil.copyfile(local_path, cache_path)
+                    self._cache.add_file(local_path, cache_path)
                 entry.local_path = cache_path
 
             for entry in self._manifest.entries.values():
@@ -271,15 +459,7 @@ class ArtifactManifestV1(ArtifactManifest):
             raise ValueError('Failed to find storage policy "%s"' % storage_policy_name)
 
         entries = {
-            name: ArtifactManifestEntry(
-                path=name,
-                digest=val["digest"],
-                birth_artifact_id=val.get("birthArtifactID"),
-                ref=val.get("ref"),
-                size=val.get("size"),
-                extra=val.get("extra"),
-                local_path=val.get("local_path"),
-            )
+            name: cls._entry_from_json(name, val)
             for name, val in manifest_json["contents"].items()
         }
 
@@ -287,6 +467,43 @@ class ArtifactManifestV1(ArtifactManifest):
             artifact, storage_policy_cls.from_config(storage_policy_config), entries
         )
 
+    @classmethod
+    def read_contents(cls, path):
+        """Yields the entries of a contents file written by write_contents."""
+        with open(path) as f:
+            for line in f:
+                val = json.loads(line)
+                yield cls._entry_from_json(val["path"], val)
+
+    @staticmethod
+    def _entry_from_json(name, val):
+        return ArtifactManifestEntry(
+            path=name,
+            digest=val["digest"],
+            birth_artifact_id=val.get("birthArtifactID"),
+            ref=val.get("ref"),
+            size=val.get("size"),
+            extra=val.get("extra"),
+            local_path=val.get("local_path"),
+        )
+
+    @staticmethod
+    def _entry_json(entry, include_local=False):
+        json_entry = {
+            "digest": entry.digest,
+        }
+        if entry.birth_artifact_id:
+            json_entry["birthArtifactID"] = entry.birth_artifact_id
+        if entry.ref:
+            json_entry["ref"] = entry.ref
+        if entry.extra:
+            json_entry["extra"] = entry.extra
+        if entry.size is not None:
+            json_entry["size"] = entry.size
+        if include_local and entry.local_path:
+            json_entry["local_path"] = entry.local_path
+        return json_entry
+
     def __init__(self, artifact, storage_policy, entries=None):
         super(ArtifactManifestV1, self).__init__(
             artifact, storage_policy, entries=entries
@@ -302,25 +519,46 @@ class ArtifactManifestV1(ArtifactManifest):
         """
         contents = {}
         for entry in sorted(self.entries.values(), key=lambda k: k.path):
-            json_entry = {
-                "digest": entry.digest,
-            }
-            if entry.birth_artifact_id:
-                json_entry["birthArtifactID"] = entry.birth_artifact_id
-            if entry.ref:
-                json_entry["ref"] = entry.ref
-            if entry.extra:
-                json_entry["extra"] = entry.extra
-            if entry.size is not None:
-                json_entry["size"] = entry.size
-            contents[entry.path] = json_entry
+            contents[entry.path] = self._entry_json(entry)
+        manifest_json = self._header_json()
+        manifest_json["contents"] = contents
+        return manifest_json
+
+    def _header_json(self):
         return {
             "version": self.__class__.version(),
             "storagePolicy": self.storage_policy.name(),
             "storagePolicyConfig": self.storage_policy.config() or {},
-            "contents": contents,
         }
 
+    def write_manifest_json(self, fp, entries=None):
+        """Writes the JSON of to_manifest_json to fp one entry at a time.
+
+        Arguments:
+            fp: a text file object.
+            entries: an iterable of entries sorted by path, which defaults to
+                the entries of this manifest.
+        """
+        if entries is None:
+            entries = sorted(self.entries.values(), key=lambda k: k.path)
+        header = json.dumps(self._header_json())
+        fp.write(header[:-1] + ', "contents": {')
+        separator = "\n"
+        for entry in entries:
+            fp.write(separator + json.dumps(entry.path) + ": ")
+            fp.write(json.dumps(self._entry_json(entry)))
+            separator = ",\n"
+        fp.write("\n}}\n")
+
+    def write_contents(self, fp):
+        """Writes the entries to fp as json lines sorted by path, with their
+        local paths, so they can be read back one at a time with read_contents.
+        """
+        for entry in sorted(self.entries.values(), key=lambda k: k.path):
+            val = self._entry_json(entry, include_local=True)
+            val["path"] = entry.path
+            fp.write(json.dumps(val) + "\n")
+
     def digest(self):
         hasher = hashlib.md5()
         hasher.update("wandb-artifact-manifest-v1\n".encode())
@@ -406,17 +644,14 @@ class WandbStoragePolicy(StoragePolicy):
         if hit:
             return path
 
-        response = self._session.get(
+        return download.download_file(
+            self._session,
             self._file_url(self._api, artifact.entity, manifest_entry),
+            path,
+            size=manifest_entry.size,
+            md5=manifest_entry.digest,
             auth=("api", self._api.api_key),
-            stream=True,
         )
-        response.raise_for_status()
-
-        with open(path, "wb") as file:
-            for data in response.iter_content(chunk_size=16 * 1024):
-                file.write(data)
-        return path
 
     def store_reference(
         self, artifact, path, name=None, checksum=True, max_objects=None
@@ -452,7 +687,7 @@ class WandbStoragePolicy(StoragePolicy):
         # write-through cache
         cache_path, hit = self._cache.check_md5_obj_path(entry.digest, entry.size)
         if not hit:
-            shutil.copyfile(entry.local_path, cache_path)
+            self._cache.add_file(entry.local_path, cache_path)
 
         resp = preparer.prepare(
             lambda: {
@@ -465,18 +700,26 @@ class WandbStoragePolicy(StoragePolicy):
         entry.birth_artifact_id = resp.birth_artifact_id
         exists = resp.upload_url is None
         if not exists:
+            headers = {
+                header.split(":", 1)[0]: header.split(":", 1)[1]
+                for header in (resp.upload_headers or {})
+            }
             with open(entry.local_path, "rb") as file:
-                # This fails if we don't send the first byte before the signed URL
-                # expires.
-                r = self._session.put(
-                    resp.upload_url,
-                    headers={
-                        header.split(":", 1)[0]: header.split(":", 1)[1]
-                        for header in (resp.upload_headers or {})
-                    },
-                    data=Progress(file, callback=progress_callback),
-                )
-                r.raise_for_status()
+                if self._api.use_upload_parts(entry.size):
+                    # Parts are retried on their own, and the upload resumes
+                    # from the parts already sent
+                    self._api.upload_file_retry(
+                        resp.upload_url, file, progress_callback, extra_headers=headers,
+                    )
+                else:
+                    # This fails if we don't send the first byte before the signed URL
+                    # expires.
+                    r = self._session.put(
+                        resp.upload_url,
+                        headers=headers,
+                        data=Progress(file, callback=progress_callback),
+                    )
+                    r.raise_for_status()
         return exists
 
 
@@ -635,7 +878,7 @@ class LocalFileHandler(StorageHandler):
         if hit:
             return path
 
-        md5 = md5_file_b64(local_path)
+        md5 = digest_cache.md5_file_b64(local_path)
         if md5 != manifest_entry.digest:
             raise ValueError(
                 "Local file reference: Digest mismatch for path %s: expected %s but found %s"
@@ -643,7 +886,7 @@ class LocalFileHandler(StorageHandler):
             )
 
         util.mkdir_exists_ok(os.path.dirname(path))
-        shutil.copy(local_path, path)
+        self._cache.add_file(local_path, path)
         return path
 
     def store_path(self, artifact, path, name=None, checksum=True, max_objects=None):
@@ -678,7 +921,7 @@ class LocalFileHandler(StorageHandler):
                         os.path.basename(sub_path),
                         os.path.join(path, sub_path),
                         size=os.path.getsize(sub_path),
-                        digest=md5_file_b64(sub_path),
+                        digest=digest_cache.md5_file_b64(sub_path),
                     )
                     entries.append(entry)
             termlog("Done. %.1fs" % (time.time() - start_time), prefix=False)
@@ -688,7 +931,7 @@ class LocalFileHandler(StorageHandler):
                 name,
                 path,
                 size=os.path.getsize(local_path),
-                digest=md5_file_b64(local_path),
+                digest=digest_cache.md5_file_b64(local_path),
             )
             entries.append(entry)
         else:
@@ -1051,21 +1294,22 @@ class HTTPHandler(StorageHandler):
         if hit:
             return path
 
-        response = self._session.get(manifest_entry.ref, stream=True)
-        response.raise_for_status()
-
-        digest, size, extra = self._entry_from_headers(response.headers)
-        digest = digest or path
-        if manifest_entry.digest != digest:
-            raise ValueError(
-                "Digest mismatch for url %s: expected %s but found %s"
-                % (manifest_entry.ref, manifest_entry.digest, digest)
-            )
+        def check_response(response):
+            digest, size, extra = self._entry_from_headers(response.headers)
+            digest = digest or path
+            if manifest_entry.digest != digest:
+                raise ValueError(
+                    "Digest mismatch for url %s: expected %s but found %s"
+                    % (manifest_entry.ref, manifest_entry.digest, digest)
+                )
 
-        with open(path, "wb") as file:
-            for data in response.iter_content(chunk_size=16 * 1024):
-                file.write(data)
-        return path
+        return download.download_file(
+            self._session,
+            manifest_entry.ref,
+            path,
+            size=manifest_entry.size,
+            check_response=check_response,
+        )
 
     def store_path(self, artifact, path, name=None, checksum=True, max_objects=None):
         name = name or os.path.basename(path)
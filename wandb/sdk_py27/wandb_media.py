@@ -0,0 +1,103 @@
+# File is generated by: tox -e codemod
+# -*- coding: utf-8 -*-
+"""Media pipeline - Encode logged media off the training thread.
+
+History rows containing media objects (images, videos, ...) are handed to a
+pool of workers that encode and hash the media files.  Rows are published in
+the order they were logged once all of their media are ready.
+
+"""
+
+import logging
+import threading
+
+from six.moves import queue
+import wandb
+from wandb import data_types
+
+logger = logging.getLogger("wandb")
+
+
+def _deferred_media(value, found):
+    if isinstance(value, data_types.Media):
+        if value._is_encoding_deferred():
+            found.append(value)
+        if isinstance(value, data_types.Image):
+            for child in (value._boxes or {}).values():
+                _deferred_media(child, found)
+            for child in (value._masks or {}).values():
+                _deferred_media(child, found)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _deferred_media(v, found)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _deferred_media(v, found)
+    return found
+
+
+class MediaPipeline(object):
+    """Encode media in a worker pool and publish history rows in order.
+
+    Arguments:
+        publish: callable(row, step) called from the pipeline thread once all
+            media in the row are encoded.
+        workers: size of the worker pool.
+        executor: "thread" or "process".
+        mp_context: multiprocessing module or context used for process pools.
+        max_pending: rows waiting on encoding before submit() blocks.
+    """
+
+    MAX_PENDING = 64
+
+    def __init__(
+        self, publish, workers, executor=None, mp_context=None, max_pending=None
+    ):
+        self._publish = publish
+        if executor == "process":
+            self._pool = mp_context.Pool(workers)
+        else:
+            from multiprocessing.pool import ThreadPool
+
+            self._pool = ThreadPool(workers)
+        self._pending = queue.Queue(maxsize=max_pending or self.MAX_PENDING)
+        self._thread = threading.Thread(target=self._publish_loop)
+        self._thread.name = "MediaPipelineThread"
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, row, step):
+        """Queue a history row, blocking while too many rows are pending."""
+        results = []
+        for media in _deferred_media(row, []):
+            encode_fn, args, path, _ = media._encoder
+            results.append(
+                (
+                    media,
+                    self._pool.apply_async(
+                        data_types._encode_media_file, (encode_fn, args, path)
+                    ),
+                )
+            )
+        self._pending.put((row, step, results))
+
+    def _publish_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            row, step, results = item
+            try:
+                for media, result in results:
+                    media._encode(sha256=result.get())
+                self._publish(row, step)
+            except Exception as e:
+                logger.error("Problem logging media for step %s", step, exc_info=e)
+                wandb.termerror("Unable to log media for step {}: {}".format(step, e))
+
+    def join(self):
+        """Publish all pending rows and shut down the workers."""
+        self._pending.put(None)
+        self._thread.join()
+        self._pool.close()
+        self._pool.join()
@@ -28,7 +28,10 @@ from six.moves.urllib.parse import quote as url_quote
 import wandb
 from wandb import trigger
 from wandb.apis import internal, public
-from wandb.data_types import _datatypes_set_callback
+from wandb.data_types import (
+    _datatypes_set_callback,
+    _datatypes_set_deferred_encoding,
+)
 from wandb.errors import Error
 from wandb.interface.summary_record import SummaryRecord
 from wandb.lib import (
@@ -50,6 +53,7 @@ from wandb.viz import (
 
 from . import wandb_config
 from . import wandb_history
+from . import wandb_media
 from . import wandb_summary
 
 if wandb.TYPE_CHECKING:  # type: ignore
@@ -257,6 +261,7 @@ class Run(RunBase):
         self._settings = settings
         self._wl = None
         self._reporter = None
+        self._media_pipeline = None
         self._data = dict()
 
         self._entity = None
@@ -273,6 +278,7 @@ class Run(RunBase):
         self._hooks = None
         self._teardown_hooks = []
         self._redirect_cb = None
+        self._output_coalescer = None
         self._out_redir = None
         self._err_redir = None
         self.stdout_redirector = None
@@ -634,7 +640,10 @@ class Run(RunBase):
         if visualize_persist_config:
             self._config_callback(data=self._config._as_dict())
 
-        self._backend.interface.publish_history(row, step)
+        if self._media_pipeline:
+            self._media_pipeline.submit(row, step)
+        else:
+            self._backend.interface.publish_history(row, step)
 
     def _console_callback(self, name, data):
         # logger.info("console callback: %s, %s", name, data)
@@ -650,6 +659,14 @@ class Run(RunBase):
 
     def _set_backend(self, backend):
         self._backend = backend
+        if self._settings._media_workers:
+            self._media_pipeline = wandb_media.MediaPipeline(
+                publish=backend.interface.publish_history,
+                workers=self._settings._media_workers,
+                executor=self._settings._media_executor,
+                mp_context=self._wl._multiprocessing if self._wl else None,
+            )
+            _datatypes_set_deferred_encoding(True)
 
     def _set_reporter(self, reporter):
         self._reporter = reporter
@@ -1289,6 +1306,16 @@ class Run(RunBase):
         if self._use_redirect:
             # setup fake callback
             self._redirect_cb = self._console_callback
+            window = self._settings._console_window
+            if window is None:
+                window = redirect.OutputCoalescer.WINDOW_SECONDS
+            if window:
+                self._output_coalescer = redirect.OutputCoalescer(
+                    self._console_callback,
+                    window=window,
+                    max_bytes_per_second=self._settings._console_max_bytes_per_second,
+                )
+                self._redirect_cb = self._output_coalescer
 
         output_log_path = os.path.join(self.dir, filenames.OUTPUT_FNAME)
         self._output_writer = WriteSerializingFile(open(output_log_path, "wb"))
@@ -1296,6 +1323,9 @@ class Run(RunBase):
 
     def _console_stop(self):
         self._restore()
+        if self._output_coalescer:
+            self._output_coalescer.stop()
+            self._output_coalescer = None
         if self._output_writer:
             self._output_writer.close()
             self._output_writer = None
@@ -1390,6 +1420,10 @@ class Run(RunBase):
 
         # make sure all uncommitted history is flushed
         self.history._flush()
+        if self._media_pipeline:
+            self._media_pipeline.join()
+            self._media_pipeline = None
+            _datatypes_set_deferred_encoding(False)
 
         self._console_stop()  # TODO: there's a race here with jupyter console logging
         pid = self._backend._internal_pid
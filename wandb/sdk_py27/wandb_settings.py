@@ -334,6 +334,17 @@ class Settings(object):
         summary_warnings=None,
         _internal_queue_timeout=2,
         _internal_check_process=8,
+        _internal_batch_size=None,  # records per batch sent to internal process
+        _internal_batch_seconds=None,
+        _internal_transport=None,  # "queue" (default) or "shm"
+        _internal_shm_size=None,
+        _media_workers=None,  # encode logged media in a worker pool
+        _media_executor=None,  # "thread" (default) or "process"
+        _console_window=None,  # seconds of console output per record, 0 disables
+        _console_max_bytes_per_second=None,
+        _sync_flush_seconds=1.0,  # group commit policy of the .wandb file
+        _sync_flush_records=None,
+        _sync_fsync=None,  # fsync the .wandb file on defer states
         _disable_meta=None,
         _disable_stats=None,
         _jupyter_path=None,
@@ -524,6 +535,18 @@ class Settings(object):
             return
         return _error_choices(value, choices)
 
+    def _validate__internal_transport(self, value):
+        choices = {"queue", "shm"}
+        if value in choices:
+            return
+        return _error_choices(value, choices)
+
+    def _validate__media_executor(self, value):
+        choices = {"thread", "process"}
+        if value in choices:
+            return
+        return _error_choices(value, choices)
+
     def _validate_problem(self, value):
         choices = {"fatal", "warn", "silent"}
         if value in choices:
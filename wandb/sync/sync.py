@@ -6,6 +6,8 @@ from __future__ import print_function
 
 import datetime
 import fnmatch
+import logging
+import multiprocessing
 import os
 import sys
 import threading
@@ -15,6 +17,7 @@ from six.moves import queue
 from six.moves.urllib.parse import quote as url_quote
 import wandb
 from wandb.interface import interface
+from wandb.internal import artifacts
 from wandb.internal import datastore
 from wandb.internal import sender
 from wandb.internal import settings_static
@@ -23,6 +26,14 @@ from wandb.util import check_and_warn_old
 
 WANDB_SUFFIX = ".wandb"
 SYNCED_SUFFIX = ".synced"
+RETRY_SLEEP = 2.0
+# records the reader thread parses ahead are handed over in batches
+REPLAY_BATCH_RECORDS = 256
+REPLAY_QUEUE_BATCHES = 64
+# consecutive history records sent with one file stream push
+HISTORY_BATCH_RECORDS = 1000
+
+logger = logging.getLogger(__name__)
 
 
 class _LocalRun(object):
@@ -49,11 +60,28 @@ class SyncThread(threading.Thread):
         verbose=None,
         mark_synced=None,
         app_url=None,
+        view_type=None,
+        view_last=None,
+        progress=None,
+        parallel=None,
+        use_processes=None,
+        retries=0,
+        skip_synced=None,
     ):
         threading.Thread.__init__(self)
         # mark this process as internal
         wandb._IS_INTERNAL_PROCESS = True
-        self._sync_list = sync_list
+        if isinstance(sync_list, queue.Queue):
+            self._sync_queue = sync_list
+        else:
+            self._sync_queue = queue.Queue()
+            for sync_item in sync_list:
+                self._sync_queue.put(sync_item)
+        self._progress = progress or _SyncProgress(self._sync_queue.qsize())
+        self._parallel = parallel
+        self._use_processes = use_processes
+        self._retries = retries
+        self._skip_synced = skip_synced
         self._project = project
         self._entity = entity
         self._run_id = run_id
@@ -61,110 +89,342 @@ class SyncThread(threading.Thread):
         self._verbose = verbose
         self._mark_synced = mark_synced
         self._app_url = app_url
+        self._view_type = view_type
+        self._view_last = view_last
+        # what a process needs to sync a run like this thread would
+        self._process_kwargs = dict(
+            project=project,
+            entity=entity,
+            run_id=run_id,
+            view=view,
+            verbose=verbose,
+            mark_synced=mark_synced,
+            app_url=app_url,
+            view_type=view_type,
+            view_last=view_last,
+            parallel=parallel,
+        )
+
+    def _records(self, reader):
+        if not self._view or not (self._view_type or self._view_last):
+            for _, data in reader.records(recover=True):
+                yield data
+            return
+        entries = reader.index()
+        if self._view_type:
+            entries = [e for e in entries if e.record_type == self._view_type]
+        if self._view_last:
+            entries = entries[-self._view_last :]  # noqa: E203
+        for entry in entries:
+            yield reader.read(entry.offset)
+
+    def _parse_records(self, reader, parsed_q, stop):
+        try:
+            batch = []
+            for data in self._records(reader):
+                pb = wandb_internal_pb2.Record()
+                pb.ParseFromString(data)
+                batch.append(pb)
+                if len(batch) >= REPLAY_BATCH_RECORDS:
+                    parsed_q.put(batch)
+                    batch = []
+                    if stop.is_set():
+                        return
+            parsed_q.put(batch)
+            parsed_q.put(None)
+        except Exception as e:
+            logger.exception("Error reading records")
+            parsed_q.put(e)
+
+    def _parsed_records(self, reader):
+        """Yields the records of reader, parsed ahead by a reader thread."""
+        parsed_q = queue.Queue(maxsize=REPLAY_QUEUE_BATCHES)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._parse_records, args=(reader, parsed_q, stop)
+        )
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                batch = parsed_q.get()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                for pb in batch:
+                    yield pb
+        finally:
+            # the reader can only be closed once the thread is done with it
+            stop.set()
+            while thread.is_alive():
+                try:
+                    parsed_q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
 
     def run(self):
-        for sync_item in self._sync_list:
-            if os.path.isdir(sync_item):
-                files = os.listdir(sync_item)
-                filtered_files = list(filter(lambda f: f.endswith(WANDB_SUFFIX), files))
-                if check_and_warn_old(files) or len(filtered_files) != 1:
-                    print("Skipping directory: {}".format(sync_item))
-                    continue
-                sync_item = os.path.join(sync_item, filtered_files[0])
-            dirname = os.path.dirname(sync_item)
-            files_dir = os.path.join(dirname, "files")
-            sd = dict(
-                files_dir=files_dir,
-                _start_time=0,
-                git_remote=None,
-                resume=None,
-                program=None,
-                ignore_globs=(),
-                run_id=None,
-                entity=None,
-                project=None,
-                run_group=None,
-                job_type=None,
-                run_tags=None,
-                run_name=None,
-                run_notes=None,
-                save_code=None,
+        while True:
+            try:
+                sync_item = self._sync_queue.get(block=False)
+            except queue.Empty:
+                return
+            sync_file = self._find_sync_file(sync_item)
+            if sync_file is None:
+                self._progress.skipped(sync_item)
+                continue
+            attempt = 0
+            while True:
+                try:
+                    if self._use_processes:
+                        self._sync_in_process(sync_file)
+                    else:
+                        self.sync_file(sync_file)
+                except Exception as e:
+                    logger.info("Error syncing %s", sync_file, exc_info=True)
+                    if attempt < self._retries:
+                        attempt += 1
+                        self._progress.print(
+                            "Error syncing {}: {}, retrying.".format(sync_file, e)
+                        )
+                        time.sleep(RETRY_SLEEP * attempt)
+                        continue
+                    self._progress.failed(sync_file, e)
+                else:
+                    self._progress.synced(sync_file)
+                break
+
+    def _find_sync_file(self, sync_item):
+        """Returns the .wandb file to sync for sync_item, or None to skip it."""
+        if os.path.isdir(sync_item):
+            files = os.listdir(sync_item)
+            filtered_files = list(filter(lambda f: f.endswith(WANDB_SUFFIX), files))
+            if check_and_warn_old(files) or len(filtered_files) != 1:
+                self._progress.print("Skipping directory: {}".format(sync_item))
+                return None
+            sync_item = os.path.join(sync_item, filtered_files[0])
+        if (
+            self._skip_synced
+            and not self._view
+            and os.path.exists("{}{}".format(sync_item, SYNCED_SUFFIX))
+        ):
+            self._progress.print("Skipping synced run: {}".format(sync_item))
+            return None
+        return sync_item
+
+    def _sync_in_process(self, sync_file):
+        # a fresh interpreter, forking would copy the locks other workers hold
+        get_context = getattr(multiprocessing, "get_context", None)
+        context = get_context("spawn") if get_context else multiprocessing
+        process = context.Process(
+            target=_sync_process, args=(self._process_kwargs, sync_file)
+        )
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise Exception("sync process exited with code {}".format(process.exitcode))
+
+    def sync_file(self, sync_item):
+        """Sends the records of one .wandb file, in order."""
+        start_time = time.time()
+        dirname = os.path.dirname(sync_item)
+        files_dir = os.path.join(dirname, "files")
+        sd = dict(
+            files_dir=files_dir,
+            _start_time=0,
+            git_remote=None,
+            resume=None,
+            program=None,
+            ignore_globs=(),
+            run_id=None,
+            entity=None,
+            project=None,
+            run_group=None,
+            job_type=None,
+            run_tags=None,
+            run_name=None,
+            run_notes=None,
+            save_code=None,
+            email=None,
+            _sync_dir=dirname,
+        )
+        settings = settings_static.SettingsStatic(sd)
+        record_q = queue.Queue()
+        result_q = queue.Queue()
+        publish_interface = interface.BackendSender(record_q=record_q)
+        sm = sender.SendManager(
+            settings=settings,
+            record_q=record_q,
+            result_q=result_q,
+            interface=publish_interface,
+            # the project and entity of the run are kept in the environment,
+            # each run synced at once needs its own
+            environ=dict(os.environ),
+        )
+        reader = datastore.DataStoreReader(sync_item)
+        records = self._parsed_records(reader)
+        try:
+            num_records, num_history = self._send_records(
+                sm, records, record_q, result_q
+            )
+        finally:
+            records.close()
+            reader.close()
+            # stop the threads of the run, a retry starts its own
+            sm.finish()
+        if reader.lost_records:
+            self._progress.print(
+                "Skipped {} damaged bytes of {}, "
+                "at least {} records were lost.".format(
+                    reader.skipped_bytes, sync_item, reader.lost_records
+                )
             )
-            settings = settings_static.SettingsStatic(sd)
-            record_q = queue.Queue()
-            result_q = queue.Queue()
-            publish_interface = interface.BackendSender(record_q=record_q)
-            sm = sender.SendManager(
-                settings=settings,
-                record_q=record_q,
-                result_q=result_q,
-                interface=publish_interface,
+        if self._mark_synced and not self._view:
+            synced_file = "{}{}".format(sync_item, SYNCED_SUFFIX)
+            with open(synced_file, "w"):
+                pass
+            artifacts.remove_manifest_files(dirname)
+        if not self._parallel:
+            print("done.")
+        if not self._view:
+            elapsed = max(time.time() - start_time, 1e-6)
+            self._progress.print(
+                "Replayed {} records ({} history rows, {:.1f}MB) of {} in {:.1f}s, "
+                "{:.0f} records/s, {} file stream posts".format(
+                    num_records,
+                    num_history,
+                    reader.size / 1024.0 / 1024,
+                    sync_item,
+                    elapsed,
+                    num_records / elapsed,
+                    (sm.file_stream_stats or {}).get("posts", 0),
+                )
             )
-            ds = datastore.DataStore()
-            ds.open_for_scan(sync_item)
 
-            # save exit for final send
-            exit_pb = None
-            shown = False
+    def _send_records(self, sm, records, record_q, result_q):
+        """Sends parsed records, history in batches, returns what was sent."""
+        # save exit for final send
+        exit_pb = None
+        shown = False
+        history = []
+        num_records = num_history = 0
 
-            while True:
-                data = ds.scan_data()
-                if data is None:
-                    break
-                pb = wandb_internal_pb2.Record()
-                pb.ParseFromString(data)
-                record_type = pb.WhichOneof("record_type")
-                if self._view:
-                    if self._verbose:
-                        print("Record:", pb)
+        for pb in records:
+            num_records += 1
+            record_type = pb.WhichOneof("record_type")
+            if self._view:
+                if self._verbose:
+                    print("Record:", pb)
+                else:
+                    print("Record:", record_type)
+                continue
+            if record_type == "history":
+                history.append(pb)
+                num_history += 1
+                if len(history) >= HISTORY_BATCH_RECORDS:
+                    sm.send_history_batch(history)
+                    history = []
+                continue
+            if history:
+                sm.send_history_batch(history)
+                history = []
+            if record_type == "run":
+                if self._run_id:
+                    pb.run.run_id = self._run_id
+                if self._project:
+                    pb.run.project = self._project
+                if self._entity:
+                    pb.run.entity = self._entity
+                pb.control.req_resp = True
+            elif record_type == "exit":
+                exit_pb = pb
+                continue
+            elif record_type == "final":
+                assert exit_pb, "final seen without exit"
+                pb = exit_pb
+                exit_pb = None
+            sm.send(pb)
+            # send any records that were added in previous send
+            while not record_q.empty():
+                data = record_q.get(block=True)
+                sm.send(data)
+
+            if pb.control.req_resp:
+                result = result_q.get(block=True)
+                result_type = result.WhichOneof("result_type")
+                if not shown and result_type == "run_result":
+                    r = result.run_result.run
+                    # TODO(jhr): hardcode until we have settings in sync
+                    url = "{}/{}/{}/runs/{}".format(
+                        self._app_url,
+                        url_quote(r.entity),
+                        url_quote(r.project),
+                        url_quote(r.run_id),
+                    )
+                    if self._parallel:
+                        self._progress.print("Syncing: %s" % url)
                     else:
-                        print("Record:", record_type)
-                    continue
-                if record_type == "run":
-                    if self._run_id:
-                        pb.run.run_id = self._run_id
-                    if self._project:
-                        pb.run.project = self._project
-                    if self._entity:
-                        pb.run.entity = self._entity
-                    pb.control.req_resp = True
-                elif record_type == "exit":
-                    exit_pb = pb
-                    continue
-                elif record_type == "final":
-                    assert exit_pb, "final seen without exit"
-                    pb = exit_pb
-                    exit_pb = None
-                sm.send(pb)
-                # send any records that were added in previous send
-                while not record_q.empty():
-                    data = record_q.get(block=True)
-                    sm.send(data)
-
-                if pb.control.req_resp:
-                    result = result_q.get(block=True)
-                    result_type = result.WhichOneof("result_type")
-                    if not shown and result_type == "run_result":
-                        r = result.run_result.run
-                        # TODO(jhr): hardcode until we have settings in sync
-                        url = "{}/{}/{}/runs/{}".format(
-                            self._app_url,
-                            url_quote(r.entity),
-                            url_quote(r.project),
-                            url_quote(r.run_id),
-                        )
                         print("Syncing: %s ..." % url, end="")
                         sys.stdout.flush()
-                        shown = True
-            sm.finish()
-            if self._mark_synced and not self._view:
-                synced_file = "{}{}".format(sync_item, SYNCED_SUFFIX)
-                with open(synced_file, "w"):
-                    pass
-            print("done.")
+                    shown = True
+        if history:
+            sm.send_history_batch(history)
+        return num_records, num_history
+
+
+def _sync_process(kwargs, sync_file):
+    SyncThread([], **kwargs).sync_file(sync_file)
+
+
+class _SyncProgress(object):
+    """Counts the runs a SyncManager's workers synced and reports them."""
+
+    def __init__(self, total, parallel=None):
+        self.total = total
+        self.num_synced = 0
+        self.num_skipped = 0
+        self.failures = []
+        self._parallel = parallel
+        self._lock = threading.Lock()
+
+    @property
+    def num_done(self):
+        return self.num_synced + self.num_skipped + len(self.failures)
+
+    def print(self, message):
+        with self._lock:
+            print(message)
+            sys.stdout.flush()
+
+    def _report(self, message):
+        if self._parallel:
+            self.print("[{}/{}] {}".format(self.num_done, self.total, message))
+
+    def synced(self, sync_file):
+        with self._lock:
+            self.num_synced += 1
+        self._report("Synced {}".format(sync_file))
+
+    def skipped(self, sync_item):
+        with self._lock:
+            self.num_skipped += 1
+
+    def failed(self, sync_file, error):
+        with self._lock:
+            self.failures.append((sync_file, error))
+        if self._parallel:
+            self._report("Failed to sync {}: {}".format(sync_file, error))
+        else:
+            self.print("Failed to sync {}: {}".format(sync_file, error))
 
 
 class SyncManager:
+    """Syncs runs with a pool of workers.
+
+    Every run is synced by one worker, so its records are sent in order.
+    A run that fails is retried, and doesn't stop the others.
+    """
+
     def __init__(
         self,
         project=None,
@@ -174,9 +434,16 @@ class SyncManager:
         app_url=None,
         view=None,
         verbose=None,
+        view_type=None,
+        view_last=None,
+        workers=None,
+        use_processes=None,
+        retries=0,
+        skip_synced=None,
     ):
         self._sync_list = []
-        self._thread = None
+        self._threads = []
+        self._progress = None
         self._project = project
         self._entity = entity
         self._run_id = run_id
@@ -184,29 +451,67 @@ class SyncManager:
         self._app_url = app_url
         self._view = view
         self._verbose = verbose
+        self._view_type = view_type
+        self._view_last = view_last
+        self._workers = workers or 1
+        self._use_processes = use_processes
+        self._retries = retries
+        self._skip_synced = skip_synced
+
+    @property
+    def failures(self):
+        """(sync file, error) for every run that couldn't be synced."""
+        return self._progress.failures if self._progress else []
 
     def status(self):
-        pass
+        if not self._progress:
+            return None
+        return "{}/{} runs done, {} synced, {} skipped, {} failed".format(
+            self._progress.num_done,
+            self._progress.total,
+            self._progress.num_synced,
+            self._progress.num_skipped,
+            len(self._progress.failures),
+        )
 
     def add(self, p):
         self._sync_list.append(str(p))
 
     def start(self):
-        # create a thread for each file?
-        self._thread = SyncThread(
-            sync_list=self._sync_list,
-            project=self._project,
-            entity=self._entity,
-            run_id=self._run_id,
-            view=self._view,
-            verbose=self._verbose,
-            mark_synced=self._mark_synced,
-            app_url=self._app_url,
-        )
-        self._thread.start()
+        sync_queue = queue.Queue()
+        for sync_item in self._sync_list:
+            sync_queue.put(sync_item)
+        # records of runs viewed at once would be interleaved
+        workers = 1 if self._view else min(self._workers, len(self._sync_list))
+        parallel = workers > 1
+        self._progress = _SyncProgress(len(self._sync_list), parallel=parallel)
+        if parallel:
+            self._progress.print(
+                "Syncing {} runs with {} workers".format(len(self._sync_list), workers)
+            )
+        for _ in range(max(workers, 1)):
+            thread = SyncThread(
+                sync_list=sync_queue,
+                project=self._project,
+                entity=self._entity,
+                run_id=self._run_id,
+                view=self._view,
+                verbose=self._verbose,
+                mark_synced=self._mark_synced,
+                app_url=self._app_url,
+                view_type=self._view_type,
+                view_last=self._view_last,
+                progress=self._progress,
+                parallel=parallel,
+                use_processes=self._use_processes,
+                retries=self._retries,
+                skip_synced=self._skip_synced,
+            )
+            thread.start()
+            self._threads.append(thread)
 
     def is_done(self):
-        return not self._thread.isAlive()
+        return not any(thread.is_alive() for thread in self._threads)
 
     def poll(self):
         time.sleep(1)
@@ -629,7 +629,7 @@ def request_with_retry(func, *args, **kwargs):
                 # returns them when there are infrastructure issues. If retrying
                 # some request winds up being problematic, we'll change the
                 # back end to indicate that it shouldn't be retried.
-                if e.response.status_code in {400, 403, 404, 409}:
+                if e.response.status_code in {400, 403, 404, 409, 415}:
                     return e
 
             if retry_count == max_retries:
@@ -898,6 +898,15 @@ def sizeof_fmt(num, suffix='B'):
     return "%.1f%s%s" % (num, 'Yi', suffix)
 
 
+def from_human_size(size):
+    """Parse a size like "500MB", "10GiB" or "1024" into bytes (units are powers of 1024)"""
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*([kmgtpe]?)(?:i?b)?\s*$", str(size), re.I)
+    if not match:
+        raise ValueError("Invalid size: %s" % size)
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** " kmgtpe".index(unit.lower() or " "))
+
+
 def auto_project_name(program):
     # if we're in git, set project name to git repo name + relative path within repo
     root_dir = GitRepo().root_dir